@@ -1,5 +1,17 @@
-from subprocess import call
+import argparse
+import importlib
 import os
+import sys
+import threading
+
+# These are the beam modules in the beam_types folder for each menu number
+BEAM_MODULES = {1: "simply_supported_beam",
+                2: "cantilever_beam",
+                3: "overhanging_beam",
+                4: "continuous_beam"}
+
+# These are the slow imports that every beam module needs
+HEAVY_MODULES = ["numpy", "sympy", "scipy.integrate", "matplotlib.pyplot"]
 
 # Pre: Accepts nothing.
 # Post: This clears the console when called.
@@ -8,42 +20,78 @@ def clear_console():
 
 # Pre: Accepts nothing.
 # Post: This prints the introduction to allow the user to select the beam they need.
-#       Will only accept whole numbers between [1, 3]
+#       Will only accept whole numbers between [1, 4]
 def introduction():
     print("1 - Simply Supported Beam")
     print("2 - Cantilever Beam")
     print("3 - Overhanging Beam")
+    print("4 - Continuous Beam")
     print()
     while True:
         try:
             inputted_number = float(input("Hello, please pick the beam required for "
                                           "your situation by typing the necessary number: "))
-            if inputted_number.is_integer() and 0 <= inputted_number <= 3:
+            if inputted_number.is_integer() and 0 <= inputted_number <= 4:
                 return int(inputted_number)
             else:
-                print("Invalid input. Please choose from these three options"
+                print("Invalid input. Please choose from these four options"
                       " and input a whole number.")
         except ValueError:
             print("Invalid input. Please input only a number.")
 
 
+# Pre: Accepts nothing.
+# Post: This imports the heavy modules on a background thread and returns the thread. The
+#       imports happen while the user is reading the menu, so the beam module is ready
+#       (almost) right away once a beam is picked.
+def preload_modules():
+    def import_heavy_modules():
+        for module_name in HEAVY_MODULES:
+            importlib.import_module(module_name)
+
+    preload_thread = threading.Thread(target=import_heavy_modules, daemon=True)
+    preload_thread.start()
+    return preload_thread
+
+
+# Pre: Accepts inputted_number
+# Post: This imports the beam module that matches the number and returns it. The beam_types
+#       folder is added to the import path so the modules import the same way they do when
+#       they are run as scripts.
+def import_beam_module(inputted_number):
+    beam_types_directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'beam_types')
+    if beam_types_directory not in sys.path:
+        sys.path.insert(0, beam_types_directory)
+
+    # 0 was always accepted by introduction() and opened the overhanging beam
+    beam_module_name = BEAM_MODULES.get(inputted_number, BEAM_MODULES[3])
+    return importlib.import_module(beam_module_name)
+
+
 # Pre: Accepts inputted_number
-# Post: This accepts the number that the user inputs and opens the corresponding file
+# Post: This accepts the number that the user inputs and runs the corresponding beam in this
+#       same Python process, so nothing has to be imported a second time.
 def open_py_file(inputted_number):
     clear_console()
-    script_directory = os.path.dirname(os.path.abspath(__file__))
-    beam_type = ""
-    if inputted_number == 1:
-        beam_type = "simply_supported_beam.py"
-    elif inputted_number == 2:
-        beam_type = "cantilever_beam.py"
-    else:
-        beam_type = "overhanging_beam.py"
-    script_path = os.path.join(script_directory, 'beam_types', beam_type)
-    call(["python", script_path])
-
-
-def main():
+    beam_module = import_beam_module(inputted_number)
+    beam_module.main([])
+
+
+# Pre: Accepts a list of command line arguments (sys.argv is used when it is None)
+# Post: This returns the parsed arguments.
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="Picks the beam type to generate the load, "
+                                                 "axial, shear, and moment diagrams for.")
+    parser.add_argument('--preload', action='store_true',
+                        help="import numpy, sympy, scipy, and matplotlib in the background "
+                             "while the menu is shown")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    arguments = parse_arguments(argv)
+    if arguments.preload:
+        preload_modules()
     inputted_number = introduction()
     open_py_file(inputted_number)
 
@@ -0,0 +1,1470 @@
+# This is the part of the beam scripts that is the same for every beam type. It reads and
+# checks the input, prepares the distributed loads, compiles the loads and reactions into
+# singularity function tables, samples the diagrams and finds their extrema exactly, finds the
+# elastic curve from an EI, and plots, summarizes, and exports the results. Each beam script
+# solves the reactions of its own supports and imports everything else from here.
+
+import json
+import math
+import os
+
+import numpy as np
+import sympy as sp
+# matplotlib and scipy.integrate are imported inside the functions that use them, so the
+# reactions and diagram values can be computed without loading them.
+
+import stage_timing
+
+
+# Pre: Accepts nothing. Only accepts either the string "metric" or the string "imperial"
+# Post: This prompts the user to input what unit system they will be using
+def unit_system_type():
+    while True:
+        unit_system = input('Please input the unit system you need '
+                            '(Enter "metric" or "imperial"): ').strip().lower()
+        if unit_system not in ["metric", "imperial"]:
+            print("Invalid input. Please try again.")
+        else:
+            return unit_system
+
+
+# Pre: Accepts nothing. Only accepts positive numbers and will reprompt the user if
+#      they enter anything else
+# Post: This prompts the user to input the length of the beam and then returns the length as a
+# #     float value.
+def beam_length():
+    print()
+    while True:
+        try:
+            inputted_length = float(input("Please input the length of the beam: "))
+            if inputted_length <= 0:
+                print("Invalid input. Length must be a positive number.")
+            else:
+                return inputted_length
+        except ValueError:
+            print("Invalid input. Please input only a number.")
+
+
+# Pre: Takes in inputted_length. It only accepts positive numbers or nothing and reprompts the
+#      user if they input anything else.
+# Post: This prompts the user for the flexural rigidity EI of the beam. It returns the EI as
+#       one piece along the whole beam (see stiffness_definition), or None if the user skips
+#       it, in which case the slope and deflection diagrams are not made.
+def section_stiffness(inputted_length):
+    print()
+    while True:
+        user_input = input("Please input the flexural rigidity EI of the beam "
+                           "(press enter to skip the slope and deflection diagrams): ").strip()
+        if user_input == "":
+            return None
+        try:
+            stiffness = float(user_input)
+            if stiffness <= 0:
+                print("Invalid input. EI must be a positive number.")
+            else:
+                return [{'start': 0.0, 'end': inputted_length, 'EI': stiffness}]
+        except ValueError:
+            print("Invalid input. Please input only a number.")
+
+
+# Pre: Accepts the text of a distributed load function and its starting and ending location
+# Post: This converts the text into a sympy expression and checks that it is a valid function
+#       that can be evaluated on the interval. A ValueError is raised if it is not.
+def parse_distributed_function(user_function_input, start_location, end_location):
+    x = sp.symbols('x')
+    user_function = sp.sympify(user_function_input)
+
+    # Check if the function is a valid expression and can be evaluated
+    if not isinstance(user_function, (sp.Basic, float, int)):
+        raise ValueError
+
+    # Attempt to evaluate the function at some points to see if it's graphable
+    test_point = (start_location + end_location) / 2
+    evaluated_function = user_function.evalf(subs={x: test_point})
+
+    # Ensure the evaluated function is a number
+    if not isinstance(evaluated_function, (float, int, sp.Float, sp.Integer)):
+        raise ValueError
+
+    return user_function
+
+
+# Pre: Accepts a value from a beam definition file and the name of the value
+# Post: This converts the value into a float. A ValueError naming the value is raised if it is
+#       not a number.
+def definition_number(value, name):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name}: Invalid input. Please input only a number.") from None
+
+
+# Pre: Accepts a list of point forces or moments from a beam definition file, the name of the
+#      list, and inputted_length
+# Post: This checks every entry the same way the prompts do and returns the list of
+#       dictionaries with a location and magnitude.
+def point_definitions(entries, name, inputted_length):
+    points = []
+    for index, entry in enumerate(entries):
+        entry_name = f"{name}[{index}]"
+        if not isinstance(entry, dict):
+            raise ValueError(f"{entry_name} must have a location and a magnitude")
+        location = definition_number(entry.get('location'), f"{entry_name} location")
+        if not (0 <= location <= inputted_length):
+            raise ValueError(f"{entry_name}: The location is not in the range of the beam.")
+        magnitude = definition_number(entry.get('magnitude'), f"{entry_name} magnitude")
+        point = {"location": location, "magnitude": magnitude}
+        if 'case' in entry:
+            point['case'] = str(entry['case'])
+        points.append(point)
+
+    return points
+
+
+# Pre: Accepts the "axle_train" of a beam definition file and inputted_length
+# Post: This checks the axle train and returns it as a dictionary. It has a list of "axles",
+#       each with its "offset" behind the first axle and its "magnitude" (the same signs as the
+#       vertical forces), and optionally a "lane_load" with the "magnitude" (the same signs as
+#       distributed loads) and "length" of a uniform load that follows the first axle, and the
+#       "step" the train moves by. A ValueError is raised if anything is invalid.
+def axle_train_definition(train, inputted_length):
+    if not isinstance(train, dict) or not train.get('axles'):
+        raise ValueError('axle_train must be an object with a list of "axles"')
+
+    axles = []
+    for index, axle in enumerate(train['axles']):
+        axle_name = f"axle_train axles[{index}]"
+        if not isinstance(axle, dict):
+            raise ValueError(f"{axle_name} must have an offset and a magnitude")
+        offset = definition_number(axle.get('offset'), f"{axle_name} offset")
+        if offset < 0:
+            raise ValueError(f"{axle_name}: The offset cannot be negative.")
+        magnitude = definition_number(axle.get('magnitude'), f"{axle_name} magnitude")
+        axles.append({'offset': offset, 'magnitude': magnitude})
+
+    lane_load = train.get('lane_load')
+    if lane_load is not None:
+        if not isinstance(lane_load, dict):
+            raise ValueError("axle_train lane_load must have a magnitude and a length")
+        lane_load = {'magnitude': definition_number(lane_load.get('magnitude'),
+                                                    "axle_train lane_load magnitude"),
+                     'length': definition_number(lane_load.get('length'),
+                                                 "axle_train lane_load length")}
+        if lane_load['length'] <= 0:
+            raise ValueError("axle_train lane_load: The length must be a positive number.")
+
+    step = definition_number(train.get('step', inputted_length / 1000), "axle_train step")
+    if step <= 0:
+        raise ValueError("axle_train step: The step must be a positive number.")
+
+    return {'axles': axles, 'lane_load': lane_load, 'step': step}
+
+
+# Pre: Accepts the "EI" of a beam definition file and inputted_length
+# Post: This checks the flexural rigidity of the beam and returns it as a list of pieces, each
+#       with a "start", "end", and "EI". A single number is one piece along the whole beam. A
+#       list of pieces must go from 0 to inputted_length in order without gaps and every EI
+#       must be positive. A ValueError that explains the problem is raised if it is not.
+def stiffness_definition(stiffness, inputted_length):
+    if not isinstance(stiffness, list):
+        value = definition_number(stiffness, "EI")
+        if value <= 0:
+            raise ValueError("EI: Invalid input. EI must be a positive number.")
+        return [{'start': 0.0, 'end': inputted_length, 'EI': value}]
+
+    pieces = []
+    position = 0.0
+    for index, piece in enumerate(stiffness):
+        piece_name = f"EI[{index}]"
+        if not isinstance(piece, dict):
+            raise ValueError(f"{piece_name} must have a start, end, and EI")
+        start_location = definition_number(piece.get('start'), f"{piece_name} start")
+        end_location = definition_number(piece.get('end'), f"{piece_name} end")
+        value = definition_number(piece.get('EI'), f"{piece_name} EI")
+        if start_location != position:
+            raise ValueError(f"{piece_name}: The piece must start where the last one ended "
+                             f"(at {position}).")
+        if not (start_location < end_location <= inputted_length):
+            raise ValueError(f"{piece_name}: The location is not in the range of the beam or "
+                             f"is before the starting location.")
+        if value <= 0:
+            raise ValueError(f"{piece_name}: Invalid input. EI must be a positive number.")
+        pieces.append({'start': start_location, 'end': end_location, 'EI': value})
+        position = end_location
+
+    if position != inputted_length:
+        raise ValueError("EI: The pieces must cover the whole beam.")
+    return pieces
+
+
+# Pre: Accepts the "combinations" of a beam definition file and the load cases of the beam
+# Post: This checks every load combination and returns a dictionary with the factor of each
+#       load case for every combination name (for example {"1.2D + 1.6L": {"D": 1.2, "L": 1.6}}).
+#       A ValueError is raised if a factor is not a number or names a case with no loads.
+def combination_definitions(combinations, load_cases):
+    if not isinstance(combinations, dict) or not combinations:
+        raise ValueError("combinations must be an object with the factors of each combination")
+
+    checked_combinations = {}
+    for name, factors in combinations.items():
+        if not isinstance(factors, dict) or not factors:
+            raise ValueError(f"combinations {name} must have a factor for each load case")
+        checked_combinations[name] = {}
+        for case, factor in factors.items():
+            if case not in load_cases:
+                raise ValueError(f"combinations {name}: No loads are in the case {case}.")
+            checked_combinations[name][case] = definition_number(
+                factor, f"combinations {name} {case}")
+
+    return checked_combinations
+
+
+# Pre: Accepts h_forces, v_forces, moments, and dist_loads
+# Post: This returns the names of the load cases of the loads in the order they first appear.
+#       Loads without a case are in the 'default' case.
+def beam_load_cases(h_forces, v_forces, moments, dist_loads):
+    load_cases = []
+    for load in h_forces + v_forces + moments + dist_loads:
+        case = load.get('case', 'default')
+        if case not in load_cases:
+            load_cases.append(case)
+    return load_cases
+
+
+# Pre: Accepts the path of a beam definition file. Files ending in .toml are read as TOML
+#      and every other file is read as JSON.
+# Post: This reads the file and returns its contents as a dictionary. Each beam script checks
+#       it with its own validate_beam_definition (see load_beam_definition).
+def read_beam_definition(file_path):
+    if file_path.lower().endswith('.toml'):
+        try:
+            import tomllib
+        except ImportError:
+            raise ValueError("Reading TOML beam definition files needs Python 3.11 "
+                             "or newer.") from None
+        with open(file_path, 'rb') as beam_file:
+            return tomllib.load(beam_file)
+    with open(file_path) as beam_file:
+        return json.load(beam_file)
+
+
+# Pre: Accepts a sympy expression in terms of x
+# Post: This turns the expression into a numpy function that always returns an array with the
+#       same shape as its input (lambdify returns a plain number for constant expressions).
+def compile_function(expression):
+    compiled = sp.lambdify(sp.symbols('x'), expression, modules='numpy')
+
+    def compiled_function(x_values):
+        x_values = np.asarray(x_values, dtype=float)
+        return np.asarray(compiled(x_values), dtype=float) + np.zeros_like(x_values)
+
+    return compiled_function
+
+
+# Pre: Accepts a sympy expression in terms of x and the interval it will be used on
+# Post: This returns a numpy function for the symbolic antiderivative of the expression and the
+#       antiderivative itself. (None, None) is returned if sympy cannot integrate it or if the
+#       antiderivative cannot be evaluated at the ends of the interval.
+def closed_form_antiderivative(expression, start, end):
+    antiderivative_expr = sp.integrate(expression, sp.symbols('x'))
+    if antiderivative_expr.has(sp.Integral):
+        return None, None
+
+    antiderivative = compile_function(antiderivative_expr)
+    with np.errstate(all='ignore'):
+        try:
+            end_values = antiderivative(np.array([start, end]))
+        except (TypeError, ValueError, ZeroDivisionError):
+            return None, None
+    if not np.all(np.isfinite(end_values)):
+        return None, None
+    return antiderivative, antiderivative_expr
+
+
+# Pre: Accepts a compiled load function and the start of its interval
+# Post: This is the numeric fallback for closed_form_antiderivative. It integrates the
+#       function between neighbouring x values with quad and adds up the pieces, so the
+#       antiderivative is 0 at the start of the load.
+def numeric_antiderivative(load_function, start):
+    from scipy import integrate
+
+    def antiderivative(x_values):
+        x_values = np.asarray(x_values, dtype=float)
+        unique_x, inverse = np.unique(x_values, return_inverse=True)
+        lower_limits = np.concatenate(([start], unique_x[:-1]))
+        pieces = [integrate.quad(load_function, lower, upper)[0]
+                  for lower, upper in zip(lower_limits, unique_x)]
+        return np.cumsum(pieces)[inverse].reshape(x_values.shape)
+
+    return antiderivative
+
+
+# Pre: Accepts a distributed load dictionary with a start, end, and function
+# Post: This compiles the load function and finds its antiderivative, the antiderivative of
+#       x * w(x), the resultant force, and the first moment about the left end of the beam once.
+#       The results are cached on the load under 'prepared' so the reaction solve, shear,
+#       moment, and scaling all reuse them. They are rebuilt if the function of the load has
+#       been changed since.
+def prepare_load(load):
+    prepared = load.get('prepared')
+    if prepared is not None and prepared['expression'] == load['function']:
+        return prepared
+
+    x = sp.symbols('x')
+    start = load['start']
+    end = load['end']
+    load_function = compile_function(load['function'])
+
+    antiderivative, antiderivative_expr = closed_form_antiderivative(load['function'],
+                                                                     start, end)
+    if antiderivative is None:
+        antiderivative = numeric_antiderivative(load_function, start)
+    resultant = float(antiderivative(end) - antiderivative(start))
+
+    first_moment_antiderivative, first_moment_expr = closed_form_antiderivative(
+        load['function'] * x, start, end)
+    if first_moment_antiderivative is None:
+        first_moment_antiderivative = numeric_antiderivative(
+            lambda s: s * load_function(s), start)
+    first_moment = float(first_moment_antiderivative(end) - first_moment_antiderivative(start))
+
+    load['prepared'] = {'expression': load['function'],
+                        'function': load_function,
+                        'antiderivative': antiderivative,
+                        'first_moment_antiderivative': first_moment_antiderivative,
+                        'antiderivative_expression': antiderivative_expr,
+                        'first_moment_expression': first_moment_expr,
+                        'resultant': resultant,
+                        'first_moment': first_moment}
+    # 'prepared' is a dictionary that stores everything that is calculated from the
+    # function of the load so it only needs to be done once.
+    return load['prepared']
+
+
+# Pre: Accepts a distributed load dictionary with a start, end, and function
+# Post: This returns the prepared values of the load as plain numbers, lists, and strings so
+#       they can be stored with the results of the beam. The antiderivatives are written as the
+#       srepr of their sympy expressions, or None when they are integrated numerically.
+def prepared_load_record(load):
+    prepared = prepare_load(load)
+    terms = load_singularity_terms(load)
+    return {'antiderivative': None if prepared['antiderivative_expression'] is None
+            else sp.srepr(prepared['antiderivative_expression']),
+            'first_moment_antiderivative': None if prepared['first_moment_expression'] is None
+            else sp.srepr(prepared['first_moment_expression']),
+            'resultant': prepared['resultant'],
+            'first_moment': prepared['first_moment'],
+            'singularity_terms': None if terms is None else [term.tolist() for term in terms]}
+
+
+# Pre: Accepts a distributed load dictionary and a record of it from prepared_load_record
+# Post: This rebuilds the prepared values of the load from the record, so a beam read back from
+#       the result cache is plotted and exported without integrating its loads again. Only the
+#       functions are compiled. It returns the prepared values like prepare_load.
+def restore_prepared_load(load, record):
+    start = load['start']
+    load_function = compile_function(load['function'])
+    antiderivatives = {}
+    for name, expression_name, integrand in [
+            ('antiderivative', 'antiderivative_expression', load_function),
+            ('first_moment_antiderivative', 'first_moment_expression',
+             lambda s: s * load_function(s))]:
+        if record[name] is None:
+            antiderivatives[expression_name] = None
+            antiderivatives[name] = numeric_antiderivative(integrand, start)
+        else:
+            antiderivatives[expression_name] = sp.sympify(record[name])
+            antiderivatives[name] = compile_function(antiderivatives[expression_name])
+
+    terms = record['singularity_terms']
+    load['prepared'] = dict(antiderivatives,
+                            expression=load['function'],
+                            function=load_function,
+                            resultant=record['resultant'],
+                            first_moment=record['first_moment'],
+                            singularity_terms=None if terms is None else (
+                                np.array(terms[0], dtype=float), np.array(terms[1], dtype=int),
+                                np.array(terms[2], dtype=float)))
+    return load['prepared']
+
+
+# Pre: Accepts dist_loads
+# Post: This is the load preparation stage. It prepares every distributed load before the
+#       reaction forces are solved and returns the same list.
+def prepare_loads(dist_loads):
+    for load in dist_loads:
+        prepare_load(load)
+    return dist_loads
+
+
+# Pre: Accepts a number
+# Post: This converts the number into an exact sympy number for the exact reaction solve.
+#       Decimals such as 0.1 become the fraction 1/10 instead of the closest float.
+def exact_number(value):
+    return sp.nsimplify(value, rational=True)
+
+
+# Pre: Accepts a distributed load dictionary with a start, end, and function
+# Post: This finds the exact resultant force and first moment of the load with sympy and caches
+#       them with the rest of the prepared values. If sympy cannot integrate the function, the
+#       prepared float values are converted to fractions instead.
+def exact_load_integrals(load):
+    prepared = prepare_load(load)
+    if 'exact_resultant' not in prepared:
+        x = sp.symbols('x')
+        function = sp.nsimplify(load['function'], rational=True)
+        limits = (x, exact_number(load['start']), exact_number(load['end']))
+
+        exact_resultant = sp.integrate(function, limits)
+        if exact_resultant.has(sp.Integral):
+            exact_resultant = exact_number(prepared['resultant'])
+        exact_first_moment = sp.integrate(function * x, limits)
+        if exact_first_moment.has(sp.Integral):
+            exact_first_moment = exact_number(prepared['first_moment'])
+
+        prepared['exact_resultant'] = exact_resultant
+        prepared['exact_first_moment'] = exact_first_moment
+
+    return {'resultant': prepared['exact_resultant'],
+            'first_moment': prepared['exact_first_moment']}
+
+
+# Pre: Accepts a distributed load dictionary with a start, end, and function
+# Post: This writes a polynomial load as singularity (Macaulay) terms of the moment, where each
+#       term is coefficient * <x - location>^order and <x - a>^n is (x - a)^n past a and 0
+#       before it. The polynomial is expanded around the start of the load and a copy expanded
+#       around the end is subtracted so the load stops there. Integrating -w(x) twice raises each
+#       order by 2. The terms are cached on the prepared load as (locations, orders,
+#       coefficients) arrays, or None if the function is not a polynomial.
+def load_singularity_terms(load):
+    prepared = prepare_load(load)
+    if 'singularity_terms' not in prepared:
+        x = sp.symbols('x')
+        u = sp.symbols('u')
+        prepared['singularity_terms'] = None
+        if load['function'].is_polynomial(x):
+            locations = []
+            orders = []
+            coefficients = []
+            for location, sign in [(load['start'], -1.0), (load['end'], 1.0)]:
+                expansion = sp.Poly(sp.expand(load['function'].subs(x, u + location)), u)
+                for power, coefficient in enumerate(reversed(expansion.all_coeffs())):
+                    locations.append(float(location))
+                    orders.append(power + 2)
+                    coefficients.append(sign * float(coefficient) / ((power + 1) * (power + 2)))
+            prepared['singularity_terms'] = (np.array(locations), np.array(orders),
+                                             np.array(coefficients))
+    return prepared['singularity_terms']
+
+
+# Pre: Accepts the locations, orders, and coefficients of singularity terms
+# Post: This adds the terms up into one polynomial for each interval between the term locations,
+#       written in powers of (x - start of the interval). A term C<x - a>^p is expanded with the
+#       binomial theorem as C((x - b) + (b - a))^p for every interval start b at or past a. The
+#       returned table has the interval starts and a row of coefficients (lowest power first)
+#       for each interval. The first row is for positions before every term and is all zeros.
+def singularity_table(locations, orders, coefficients):
+    breakpoints = np.unique(locations)
+    degree = int(np.max(orders, initial=0))
+    shifts = breakpoints[:, np.newaxis] - locations
+    active = shifts >= 0
+
+    table_coefficients = np.zeros((len(breakpoints) + 1, degree + 1))
+    for power in range(degree + 1):
+        has_power = orders >= power
+        binomials = np.array([math.comb(int(order), power) if order >= power else 0
+                              for order in orders])
+        exponents = np.where(has_power, orders - power, 0)
+        terms = np.where(active & has_power,
+                         coefficients * binomials * np.where(active, shifts, 0.0) ** exponents,
+                         0.0)
+        table_coefficients[1:, power] = terms.sum(axis=1)
+
+    return {'breakpoints': breakpoints,
+            'starts': np.concatenate(([0.0], breakpoints)),
+            'coefficients': table_coefficients}
+
+
+# Pre: Accepts a table from singularity_table
+# Post: This returns the table of the derivative. Each interval's polynomial is differentiated
+#       term by term, so steps (like point moments in the moment table) drop out.
+def differentiate_table(table):
+    coefficients = table['coefficients']
+    powers = np.arange(1, coefficients.shape[1])
+    derivative = coefficients[:, 1:] * powers
+    if derivative.shape[1] == 0:
+        derivative = np.zeros((coefficients.shape[0], 1))
+    return {'breakpoints': table['breakpoints'],
+            'starts': table['starts'],
+            'coefficients': derivative}
+
+
+# Pre: Accepts a table from singularity_table, an array of positions, and whether the value
+#      just to the left of each position is wanted
+# Post: This finds the interval of every position with searchsorted and evaluates its polynomial
+#       with Horner's method, so each position costs the same however many loads there are. A
+#       position on a breakpoint belongs to the interval that starts there (x >= location)
+#       unless left is True, where the interval that ends there is used instead.
+def evaluate_table(table, x_values, left=False):
+    index = np.searchsorted(table['breakpoints'], x_values, side='left' if left else 'right')
+    offsets = x_values - table['starts'][index]
+    coefficients = table['coefficients']
+
+    values = coefficients[index, -1]
+    for power in range(coefficients.shape[1] - 2, -1, -1):
+        values = values * offsets + coefficients[index, power]
+    return values
+
+
+# Pre: Accepts total_v_forces, moments, dist_loads, and optionally total_h_forces
+# Post: This compiles the beam into singularity function terms. Each vertical force F at a is
+#       the moment term F<x - a>^1, each point moment m is -m<x - a>^0, and polynomial loads
+#       come from load_singularity_terms. The terms are turned into piecewise polynomial tables
+#       for the moment, the shear (its derivative), and the axial force (a -H<x - a>^0 step for
+#       each horizontal force). Loads that are not polynomials are kept in 'other_loads' and
+#       use their antiderivatives instead. The returned dictionary is what singularity_axial,
+#       singularity_shear, and singularity_moment evaluate.
+def singularity_model(total_v_forces, moments, dist_loads, total_h_forces=()):
+    locations = [[float(force['location']) for force in total_v_forces],
+                 [float(moment['location']) for moment in moments]]
+    orders = [[1] * len(total_v_forces), [0] * len(moments)]
+    coefficients = [[float(force['magnitude']) for force in total_v_forces],
+                    [-float(moment['magnitude']) for moment in moments]]
+
+    other_loads = []
+    for load in dist_loads:
+        terms = load_singularity_terms(load)
+        if terms is None:
+            other_loads.append(load)
+        else:
+            locations.append(terms[0])
+            orders.append(terms[1])
+            coefficients.append(terms[2])
+
+    moment_table = singularity_table(np.concatenate(locations).astype(float),
+                                     np.concatenate(orders).astype(int),
+                                     np.concatenate(coefficients).astype(float))
+    axial_table = singularity_table(
+        np.array([float(force['location']) for force in total_h_forces]),
+        np.zeros(len(total_h_forces), dtype=int),
+        np.array([-float(force['magnitude']) for force in total_h_forces]))
+
+    return {'moment': moment_table,
+            'shear': differentiate_table(moment_table),
+            'axial': axial_table,
+            'other_loads': other_loads}
+
+
+# Pre: Accepts a model from singularity_model, variable x, and left
+# Post: This evaluates the axial force at all points of x
+def singularity_axial(model, x, left=False):
+    N = evaluate_table(model['axial'], np.asarray(x, dtype=float), left)
+    if N.ndim == 0:
+        return float(N)
+    return N
+
+
+# Pre: Accepts a model from singularity_model, variable x, and left
+# Post: This evaluates the shear force at all points of x as the sum of the shear terms. Loads
+#       that are not polynomials are integrated from the start of the load up to x with their
+#       antiderivatives. Clipping x to the interval gives 0 before the load starts and the full
+#       load after it ends.
+def singularity_shear(model, x, left=False):
+    x_values = np.asarray(x, dtype=float)
+    V = evaluate_table(model['shear'], x_values, left)
+
+    for load in model['other_loads']:
+        antiderivative = prepare_load(load)['antiderivative']
+        clipped_x = np.clip(x_values, load['start'], load['end'])
+        V -= antiderivative(clipped_x) - antiderivative(load['start'])
+
+    if V.ndim == 0:
+        return float(V)
+    return V
+
+
+# Pre: Accepts a model from singularity_model, variable x, and left
+# Post: This evaluates the moment at all points of x as the sum of the moment terms. A load that
+#       is not a polynomial adds the integral of -w(t) * (x - t) from its start up to x, which is
+#       x times the antiderivative of w minus the antiderivative of t * w(t).
+def singularity_moment(model, x, left=False):
+    x_values = np.asarray(x, dtype=float)
+    M = evaluate_table(model['moment'], x_values, left)
+
+    for load in model['other_loads']:
+        prepared = prepare_load(load)
+        antiderivative = prepared['antiderivative']
+        clipped_x = np.clip(x_values, load['start'], load['end'])
+        resultant = antiderivative(clipped_x) - antiderivative(load['start'])
+        first_moment = (prepared['first_moment_antiderivative'](clipped_x)
+                        - prepared['first_moment_antiderivative'](load['start']))
+        M -= x_values * resultant - first_moment
+
+    if M.ndim == 0:
+        return float(M)
+    return M
+
+
+# Pre: Accepts variable x (a single position or an array of positions) and total_h_forces.
+#      left=True gives the value just to the left of x, which is different at a point force.
+# Post: This calculates the axial force at all points of x so that it can be plotted
+def axial_force_at_point(x, total_h_forces, left=False):
+    return singularity_axial(singularity_model([], [], [], total_h_forces), x, left)
+
+
+# Pre: Accepts variable x (a single position or an array of positions), total_v_forces,
+#      and dist_loads. left=True gives the value just to the left of x.
+# Post: This calculates the shear force at all points of x so that it can be plotted. The
+#       forces and polynomial loads are compiled into singularity terms, so a whole array of
+#       positions is handled with a few numpy operations.
+def shear_force_at_point(x, total_v_forces, dist_loads, left=False):
+    # This was the previous version to handle constant functions only. I kept it
+    # as it is easy to understand and it can be a reference
+    # for load in dist_loads:
+    #     if load['start'] <= x <= load['end']:
+    #         V += -load['function'] * (x - load['start'])
+    #     elif x > load['end']:
+    #         V += -load['function'] * (load['end'] - load['start'])
+    return singularity_shear(singularity_model(total_v_forces, [], dist_loads), x, left)
+
+
+# Pre: Accepts variable x (a single position or an array of positions), total_v_forces,
+#      moments, and dist_loads. left=True gives the value just to the left of x.
+# Post: This calculates the moment at all points of x. Each vertical force adds
+#       force * (x - location) past its location, each point moment is subtracted past its
+#       location, and each distributed load adds the integral of -w(t) * (x - t) up to x.
+#       See singularity_moment.
+def moment_at_point(x, total_v_forces, moments, dist_loads, left=False):
+    return singularity_moment(singularity_model(total_v_forces, moments, dist_loads), x, left)
+
+
+# Pre: Accepts inputted_length and the locations where the diagram can jump or bend
+#      (point forces, point moments, and the starts and ends of distributed loads)
+# Post: This returns the sorted breakpoints of the diagram. The ends of the beam are always
+#       breakpoints and locations off the beam are left out.
+def diagram_breakpoints(inputted_length, event_locations):
+    breakpoints = [0.0, float(inputted_length)]
+    for location in event_locations:
+        if 0 <= location <= inputted_length:
+            breakpoints.append(float(location))
+    return np.unique(breakpoints)
+
+
+# Pre: Accepts inputted_length, the event locations for diagram_breakpoints, and the number of
+#      evenly spaced points in each piece between the breakpoints
+# Post: This returns the x values of the pieces and which of them take the value just to their
+#       left. Every breakpoint is in the x values twice, first for the value just to its left
+#       (the end of the piece before it) and then for the value at it (the start of the piece
+#       after it), so jumps become exact vertical lines. The value to the left of x = 0 is 0
+#       since nothing acts before the beam starts.
+def breakpoint_grid(inputted_length, event_locations, points_per_piece):
+    breakpoints = diagram_breakpoints(inputted_length, event_locations)
+
+    x_pieces = [breakpoints[:1]]
+    left_pieces = [np.array([True])]
+    for start, end in zip(breakpoints[:-1], breakpoints[1:]):
+        x_pieces.append(np.linspace(start, end, points_per_piece))
+        left_piece = np.zeros(points_per_piece, dtype=bool)
+        left_piece[-1] = True
+        left_pieces.append(left_piece)
+    x_pieces.append(breakpoints[-1:])
+    left_pieces.append(np.array([False]))
+
+    return np.concatenate(x_pieces), np.concatenate(left_pieces)
+
+
+# Pre: Accepts a function that evaluates a diagram (it takes an array of positions and a left
+#      keyword), an array of positions, and which of them take the value just to their left
+# Post: This evaluates the diagram at every position from the side that was asked for
+def evaluate_sides(evaluate, x_values, left):
+    return np.where(left, evaluate(x_values, left=True), evaluate(x_values))
+
+
+# Pre: Accepts a function that evaluates the diagram (it takes an array of positions and a
+#      left keyword), inputted_length, the event locations for diagram_breakpoints, the
+#      relative tolerance, the number of points that each piece starts with, and how many
+#      times a piece can be halved
+# Post: This samples the diagram piece by piece between the breakpoints. Every breakpoint is
+#       sampled twice, first with the value just to its left and then with the value at it, so
+#       jumps are drawn as exact vertical lines. Inside a piece the diagram is smooth, so the
+#       midpoint of each interval is checked against the straight line between its ends and the
+#       interval is only halved where the curve bends away from that line by more than the
+#       tolerance (relative to the largest value of the diagram). Straight pieces stay at the
+#       starting points. This returns the x values and the diagram values at them.
+def adaptive_samples(evaluate, inputted_length, event_locations, tolerance=1e-4,
+                     initial_points=9, max_depth=12):
+    x_values, left = breakpoint_grid(inputted_length, event_locations, initial_points)
+    y_values = evaluate_sides(evaluate, x_values, left)
+
+    scale = max(np.max(np.abs(y_values)), 1.0)
+    # The intervals between the two samples of a breakpoint have no width and are never halved
+    check = np.diff(x_values) > 0
+    for _ in range(max_depth):
+        if not np.any(check):
+            break
+        index = np.nonzero(check)[0]
+        midpoints = (x_values[index] + x_values[index + 1]) / 2
+        midpoint_values = np.atleast_1d(evaluate(midpoints))
+        chord_values = (y_values[index] + y_values[index + 1]) / 2
+        halve = np.abs(midpoint_values - chord_values) > tolerance * scale
+        if not np.any(halve):
+            break
+
+        x_values = np.insert(x_values, index[halve] + 1, midpoints[halve])
+        y_values = np.insert(y_values, index[halve] + 1, midpoint_values[halve])
+
+        # Only the two halves of an interval that was just halved are checked again
+        new_points = np.zeros(len(x_values), dtype=bool)
+        new_points[index[halve] + 1 + np.arange(np.count_nonzero(halve))] = True
+        check = new_points[:-1] | new_points[1:]
+
+    return x_values, y_values
+
+
+# Pre: Accepts variable x (a single position or an array of positions) and dist_loads
+# Post: This adds up the distributed loads acting at all points of x. The shear force changes
+#       at the rate -w(x), so this is used to find where the shear force turns around.
+def distributed_load_at_point(x, dist_loads):
+    x_values = np.asarray(x, dtype=float)
+    w = np.zeros_like(x_values)
+    for load in dist_loads:
+        inside = (x_values >= load['start']) & (x_values <= load['end'])
+        w += np.where(inside, prepare_load(load)['function'](x_values), 0.0)
+
+    if w.ndim == 0:
+        return float(w)
+    return w
+
+
+# Pre: Accepts the derivative of a diagram, the start and end of a piece of the diagram, and
+#      how many points to check the piece with
+# Post: This finds where the derivative is 0 inside the piece. The derivative is checked at
+#       evenly spaced points and every sign change is narrowed down with brentq, so each root is
+#       exact to floating point. Roots on the ends of the piece are left out since the ends are
+#       checked on their own.
+def derivative_roots(derivative, start, end, points=65):
+    from scipy import optimize
+
+    x_values = np.linspace(start, end, points)
+    # The ends are moved inside the piece so that a jump at either end is not seen
+    edge = (end - start) * 1e-9
+    x_values[0] += edge
+    x_values[-1] -= edge
+    slopes = np.atleast_1d(derivative(x_values))
+
+    roots = list(x_values[1:-1][slopes[1:-1] == 0])
+    for index in np.nonzero(slopes[:-1] * slopes[1:] < 0)[0]:
+        roots.append(optimize.brentq(derivative, x_values[index], x_values[index + 1],
+                                     xtol=1e-14 * max(abs(end), 1.0)))
+    return sorted(roots)
+
+
+# Pre: Accepts a function that evaluates the diagram (it takes an array of positions and a
+#      left keyword), its derivative inside the pieces (None if the diagram is constant between
+#      the breakpoints), inputted_length, and the event locations for diagram_breakpoints
+# Post: This finds every local maximum and minimum of the diagram exactly. Between the
+#       breakpoints the diagram can only turn around where its derivative is 0, so the diagram
+#       is monotonic between the points that are checked: the value on each side of every
+#       breakpoint and every root of the derivative. Going along these points in order, each
+#       point where the diagram changes direction is a local extremum, and so are both ends of
+#       the beam. Each extremum is a dictionary with its location, value, and type ('max',
+#       'min', or 'constant' if the whole diagram is flat).
+def diagram_extrema(evaluate, derivative, inputted_length, event_locations):
+    breakpoints = diagram_breakpoints(inputted_length, event_locations)
+
+    locations = []
+    for start, end in zip(breakpoints[:-1], breakpoints[1:]):
+        locations.append((start, False))
+        if derivative is not None:
+            locations += [(root, False) for root in derivative_roots(derivative, start, end)]
+        locations.append((end, True))
+    values = [float(np.atleast_1d(evaluate(np.array([location]), left=left))[0])
+              for location, left in locations]
+
+    # Runs of equal values (like a piece of a constant diagram) are checked as one point at the
+    # start of the run
+    scale = max(max(abs(value) for value in values), 1.0)
+    points = [(locations[0][0], values[0])]
+    for (location, _), value in zip(locations[1:], values[1:]):
+        if abs(value - points[-1][1]) > 1e-12 * scale:
+            points.append((location, value))
+
+    if len(points) == 1:
+        return [{'location': float(points[0][0]), 'value': points[0][1], 'type': 'constant'}]
+
+    extrema = []
+    for index, (location, value) in enumerate(points):
+        neighbours = [points[i][1] for i in (index - 1, index + 1) if 0 <= i < len(points)]
+        if all(value > neighbour for neighbour in neighbours):
+            extrema.append({'location': float(location), 'value': value, 'type': 'max'})
+        elif all(value < neighbour for neighbour in neighbours):
+            extrema.append({'location': float(location), 'value': value, 'type': 'min'})
+    return extrema
+
+
+# Pre: Accepts the list from diagram_extrema
+# Post: Finds the extremum with the maximum absolute value and returns its location and value
+def find_max_abs(extrema):
+    largest = max(extrema, key=lambda extremum: abs(extremum['value']))
+    return largest['location'], largest['value']
+
+
+# Pre: Accepts inputted_length and total_h_forces
+# Post: This samples the axial force along the beam and returns a dictionary with the x values,
+#       the axial force at each of them, and the location and value of the max |force|.
+#       Nothing here needs matplotlib so it can be used without plotting.
+def sample_axial_diagram(inputted_length, total_h_forces):
+    model = singularity_model([], [], [], total_h_forces)
+    events = [force['location'] for force in total_h_forces]
+    # The axial force is constant between the horizontal forces, so only the jumps are needed
+    x_values, y_values = adaptive_samples(
+        lambda x, left=False: singularity_axial(model, x, left),
+        inputted_length, events, initial_points=2)
+    extrema = diagram_extrema(
+        lambda x, left=False: singularity_axial(model, x, left), None,
+        inputted_length, events)
+
+    max_x, max_y = find_max_abs(extrema)
+    return {'x_values': x_values, 'values': y_values, 'max_location': max_x, 'max_value': max_y,
+            'extrema': extrema}
+
+
+# Pre: Accepts total_v_forces, moments, and dist_loads
+# Post: This returns every location where the shear or moment diagram can jump or bend
+def shear_moment_events(total_v_forces, moments, dist_loads):
+    event_locations = [force['location'] for force in total_v_forces]
+    event_locations += [moment['location'] for moment in moments]
+    for load in dist_loads:
+        event_locations += [load['start'], load['end']]
+    return event_locations
+
+
+# Pre: Accepts inputted_length, total_v_forces, and dist_loads
+# Post: This samples the shear force along the beam and returns a dictionary in the same form
+#       as sample_axial_diagram.
+def sample_shear_diagram(inputted_length, total_v_forces, dist_loads):
+    model = singularity_model(total_v_forces, [], dist_loads)
+    events = shear_moment_events(total_v_forces, [], dist_loads)
+    x_values, y_values = adaptive_samples(
+        lambda x, left=False: singularity_shear(model, x, left), inputted_length, events)
+    # The shear force turns around where the distributed load is 0
+    extrema = diagram_extrema(
+        lambda x, left=False: singularity_shear(model, x, left),
+        lambda x: -distributed_load_at_point(x, dist_loads),
+        inputted_length, events)
+
+    max_x, max_y = find_max_abs(extrema)
+    return {'x_values': x_values, 'values': y_values, 'max_location': max_x, 'max_value': max_y,
+            'extrema': extrema}
+
+
+# Pre: Accepts inputted_length, total_v_forces, moments, and dist_loads
+# Post: This samples the bending moment along the beam and returns a dictionary in the same form
+#       as sample_axial_diagram.
+def sample_moment_diagram(inputted_length, total_v_forces, moments, dist_loads):
+    model = singularity_model(total_v_forces, moments, dist_loads)
+    events = shear_moment_events(total_v_forces, moments, dist_loads)
+    x_values, y_values = adaptive_samples(
+        lambda x, left=False: singularity_moment(model, x, left), inputted_length, events)
+    # The moment turns around where the shear force is 0
+    extrema = diagram_extrema(
+        lambda x, left=False: singularity_moment(model, x, left),
+        lambda x: singularity_shear(model, x),
+        inputted_length, events)
+
+    max_x, max_y = find_max_abs(extrema)
+    return {'x_values': x_values, 'values': y_values, 'max_location': max_x, 'max_value': max_y,
+            'extrema': extrema}
+
+
+# Pre: Accepts variable x (a single position or an array of positions) and the pieces from
+#      stiffness_definition
+# Post: This returns the EI of the piece that each position is in
+def stiffness_at_point(x, stiffness):
+    piece_ends = np.array([piece['end'] for piece in stiffness[:-1]], dtype=float)
+    stiffness_values = np.array([piece['EI'] for piece in stiffness], dtype=float)
+    return stiffness_values[np.searchsorted(piece_ends, x, side='right')]
+
+
+# Pre: Accepts the elastic curve from elastic_curve and arrays of the starts and ends of
+#      intervals that are each inside one piece of the curve
+# Post: This integrates the curvature M / EI over every interval at once with Gauss-Legendre
+#       quadrature. It returns the change of slope over each interval and the change of
+#       deflection that the curvature adds to it (the integral of (end - t) * M(t) / EI(t)), which
+#       are exact for polynomial moments of up to degree 9.
+def curvature_integrals(curve, starts, ends):
+    widths = (ends - starts)[:, np.newaxis]
+    positions = starts[:, np.newaxis] + widths * (curve['nodes'] + 1) / 2
+    weights = widths * curve['weights'] / 2
+    curvature = (singularity_moment(curve['model'], positions.ravel()).reshape(positions.shape)
+                 / stiffness_at_point(positions, curve['stiffness']))
+    slope_steps = np.sum(weights * curvature, axis=1)
+    deflection_steps = np.sum(weights * (ends[:, np.newaxis] - positions) * curvature, axis=1)
+    return slope_steps, deflection_steps
+
+
+# Pre: Accepts a model from singularity_model, the pieces from stiffness_definition,
+#      inputted_length, the locations where the moment can jump or bend, and the number of
+#      points in each piece between the breakpoints
+# Post: This integrates M / EI twice along the beam. The slope and deflection are found at the
+#       points of every piece by adding up the integrals of curvature_integrals, so the whole
+#       grid takes a few numpy operations. This is the curve with a slope and deflection of 0 at
+#       x = 0. The supports of each beam type set the 'rotation' (the slope at x = 0) and the
+#       'offset' (the deflection at x = 0) afterwards (see support_curve).
+def elastic_curve(model, stiffness, inputted_length, event_locations, points_per_piece=33):
+    stiffness_locations = [piece['start'] for piece in stiffness]
+    breakpoints = diagram_breakpoints(inputted_length,
+                                      list(event_locations) + stiffness_locations)
+    x_values = np.unique(np.concatenate([np.linspace(start, end, points_per_piece)
+                                         for start, end in zip(breakpoints[:-1],
+                                                               breakpoints[1:])]))
+    nodes, weights = np.polynomial.legendre.leggauss(5)
+    curve = {'model': model, 'stiffness': stiffness, 'nodes': nodes, 'weights': weights,
+             'x_values': x_values, 'rotation': 0.0, 'offset': 0.0}
+
+    slope_steps, deflection_steps = curvature_integrals(curve, x_values[:-1], x_values[1:])
+    slope_values = np.concatenate(([0.0], np.cumsum(slope_steps)))
+    deflection_values = np.concatenate((
+        [0.0], np.cumsum(slope_values[:-1] * np.diff(x_values) + deflection_steps)))
+    curve['slope_values'] = slope_values
+    curve['deflection_values'] = deflection_values
+    return curve
+
+
+# Pre: Accepts an elastic curve from elastic_curve, variable x, and left
+# Post: This evaluates the slope at all points of x. The curvature is integrated from the grid
+#       point before each position up to it, so the slope is exact between the grid points too.
+#       The slope is continuous, so left does not change it.
+def curve_slope(curve, x, left=False):
+    x_values = np.atleast_1d(np.asarray(x, dtype=float))
+    grid = curve['x_values']
+    index = np.clip(np.searchsorted(grid, x_values, side='right') - 1, 0, len(grid) - 2)
+    slope_steps, _ = curvature_integrals(curve, grid[index], x_values)
+    slope = curve['slope_values'][index] + slope_steps + curve['rotation']
+
+    if np.ndim(x) == 0:
+        return float(slope[0])
+    return slope
+
+
+# Pre: Accepts an elastic curve from elastic_curve, variable x, and left
+# Post: This evaluates the deflection at all points of x in the same way as curve_slope
+def curve_deflection(curve, x, left=False):
+    x_values = np.atleast_1d(np.asarray(x, dtype=float))
+    grid = curve['x_values']
+    index = np.clip(np.searchsorted(grid, x_values, side='right') - 1, 0, len(grid) - 2)
+    _, deflection_steps = curvature_integrals(curve, grid[index], x_values)
+    deflection = (curve['deflection_values'][index]
+                  + curve['slope_values'][index] * (x_values - grid[index]) + deflection_steps
+                  + curve['rotation'] * x_values + curve['offset'])
+
+    if np.ndim(x) == 0:
+        return float(deflection[0])
+    return deflection
+
+
+# Pre: Accepts inputted_length, an elastic curve with its supports set, and the event
+#      locations of the moment
+# Post: This samples the slope along the beam and returns a dictionary in the same form as
+#       sample_axial_diagram.
+def sample_slope_diagram(inputted_length, curve, event_locations):
+    event_locations = (list(event_locations)
+                       + [piece['start'] for piece in curve['stiffness']])
+    # The slope is usually much smaller than 1, so it is sampled relative to its largest
+    # value on the grid of the curve for the tolerance of adaptive_samples to mean the same
+    scale = np.max(np.abs(curve_slope(curve, curve['x_values']))) or 1.0
+    x_values, y_values = adaptive_samples(
+        lambda x, left=False: curve_slope(curve, x, left) / scale, inputted_length,
+        event_locations)
+    y_values = y_values * scale
+    # The slope turns around where the moment is 0
+    extrema = diagram_extrema(
+        lambda x, left=False: curve_slope(curve, x, left),
+        lambda x: (singularity_moment(curve['model'], x)
+                   / stiffness_at_point(x, curve['stiffness'])),
+        inputted_length, event_locations)
+
+    max_x, max_y = find_max_abs(extrema)
+    return {'x_values': x_values, 'values': y_values, 'max_location': max_x, 'max_value': max_y,
+            'extrema': extrema}
+
+
+# Pre: Accepts inputted_length, an elastic curve with its supports set, and the event
+#      locations of the moment
+# Post: This samples the deflection along the beam and returns a dictionary in the same form
+#       as sample_axial_diagram.
+def sample_deflection_diagram(inputted_length, curve, event_locations):
+    event_locations = (list(event_locations)
+                       + [piece['start'] for piece in curve['stiffness']])
+    # This is sampled relative to its largest value like the slope
+    scale = np.max(np.abs(curve_deflection(curve, curve['x_values']))) or 1.0
+    x_values, y_values = adaptive_samples(
+        lambda x, left=False: curve_deflection(curve, x, left) / scale, inputted_length,
+        event_locations)
+    y_values = y_values * scale
+    # The deflection turns around where the slope is 0
+    extrema = diagram_extrema(
+        lambda x, left=False: curve_deflection(curve, x, left),
+        lambda x: curve_slope(curve, x), inputted_length, event_locations)
+
+    max_x, max_y = find_max_abs(extrema)
+    return {'x_values': x_values, 'values': y_values, 'max_location': max_x, 'max_value': max_y,
+            'extrema': extrema}
+
+
+# Pre: Accepts inputted_length, stiffness, unit_system, and the samples of the slope from
+#      sample_slope_diagram
+# Post: This plots the slope diagram. It uses matplotlib for the graph.
+def slope_diagram(ax, inputted_length, stiffness, unit_system, samples):
+    length_unit = 'm' if unit_system == 'metric' else 'ft'
+
+    x_values = samples['x_values']
+    slope_values = samples['values']
+
+    # This plots a vertical line where the EI of the beam changes
+    for piece in stiffness[1:]:
+        ax.axvline(x=piece['start'], linestyle='--', color='purple',
+                   label=f"EI changes at {piece['start']} {length_unit}")
+
+    # The maximum absolute value and its corresponding x value
+    max_x = samples['max_location']
+    max_y = samples['max_value']
+
+    # Determine the vertical offset direction based on y position relative to the center
+    y_range = np.max(slope_values) - np.min(slope_values)
+    y_center = np.min(slope_values) + y_range / 2
+    distance_above = abs((max_y * 1.5) - y_center)
+    distance_below = abs((max_y / 1.5) - y_center)
+    if distance_below < distance_above:
+        # Place annotation below the point
+        xytext = (max_x, max_y / 1.5)
+    else:
+        # Place annotation above the point
+        xytext = (max_x, max_y * 1.5)
+
+    # Label the maximum absolute value
+    ax.annotate(f'Max |Slope|: {abs(max_y):.4g} rad\nat '
+                f'x = {max_x:.2f} {length_unit}',
+                xy=(max_x, max_y),
+                xytext=xytext,
+                arrowprops=dict(facecolor='red', shrink=0.05),
+                fontsize=12, color='red',
+                horizontalalignment='center')
+
+    # Plot the slope function
+    ax.axhline(y=0, color='k', linestyle='--')
+    ax.plot(x_values, slope_values, label="Slope Diagram", color='c')
+    ax.set_title("Slope Diagram")
+    ax.set_xlabel(f"Position ({length_unit})")
+    ax.set_ylabel("Slope (rad)")
+    ax.legend(prop={'size': 8})
+    ax.grid(True)
+
+
+# Pre: Accepts inputted_length, stiffness, unit_system, and the samples of the deflection from
+#      sample_deflection_diagram
+# Post: This plots the deflection diagram and labels the max |deflection| the same way the
+#       max |moment| is labeled. It uses matplotlib for the graph.
+def deflection_diagram(ax, inputted_length, stiffness, unit_system, samples):
+    length_unit = 'm' if unit_system == 'metric' else 'ft'
+    stiffness_unit = 'N*m^2' if unit_system == 'metric' else 'lb*ft^2'
+
+    x_values = samples['x_values']
+    deflection_values = samples['values']
+
+    # This plots a vertical line where the EI of the beam changes
+    for piece in stiffness[1:]:
+        ax.axvline(x=piece['start'], linestyle='--', color='purple',
+                   label=f"EI changes at {piece['start']} {length_unit}")
+
+    # The maximum absolute value and its corresponding x value
+    max_x = samples['max_location']
+    max_y = samples['max_value']
+
+    # Determine the vertical offset direction based on y position relative to the center
+    y_range = np.max(deflection_values) - np.min(deflection_values)
+    y_center = np.min(deflection_values) + y_range / 2
+    distance_above = abs((max_y * 1.5) - y_center)
+    distance_below = abs((max_y / 1.5) - y_center)
+    if distance_below < distance_above:
+        # Place annotation below the point
+        xytext = (max_x, max_y / 1.5)
+    else:
+        # Place annotation above the point
+        xytext = (max_x, max_y * 1.5)
+
+    # Label the maximum absolute value
+    ax.annotate(f'Max |Deflection|: {abs(max_y):.4g} {length_unit}\nat '
+                f'x = {max_x:.2f} {length_unit}',
+                xy=(max_x, max_y),
+                xytext=xytext,
+                arrowprops=dict(facecolor='red', shrink=0.05),
+                fontsize=12, color='red',
+                horizontalalignment='center')
+
+    # Plot the deflection function
+    ax.axhline(y=0, color='k', linestyle='--')
+    ax.plot(x_values, deflection_values, color='m',
+            label=f"Deflection Diagram (EI in {stiffness_unit})")
+    ax.set_title("Deflection Diagram")
+    ax.set_xlabel(f"Position ({length_unit})")
+    ax.set_ylabel(f"Deflection ({length_unit})")
+    ax.legend(prop={'size': 8})
+    ax.grid(True)
+
+
+# Pre: Accepts a distributed load dictionary with a start, end, and function and a factor
+# Post: This returns a copy of the load with its function times the factor. The prepared values
+#       of the load (and its singularity terms) are scaled along with it instead of being
+#       calculated again for the scaled function.
+def scale_load(load, scaling_factor):
+    prepared = prepare_load(load)
+    terms = load_singularity_terms(load)
+    scaled_load = load.copy()
+    scaled_load['function'] = load['function'] * scaling_factor
+    scaled_load['prepared'] = {
+        'expression': scaled_load['function'],
+        'function': lambda x_values, func=prepared['function']:
+            scaling_factor * func(x_values),
+        'antiderivative': lambda x_values, func=prepared['antiderivative']:
+            scaling_factor * func(x_values),
+        'first_moment_antiderivative':
+            lambda x_values, func=prepared['first_moment_antiderivative']:
+            scaling_factor * func(x_values),
+        'resultant': scaling_factor * prepared['resultant'],
+        'first_moment': scaling_factor * prepared['first_moment'],
+        'singularity_terms': None if terms is None else (terms[0], terms[1],
+                                                         scaling_factor * terms[2])}
+    return scaled_load
+
+
+# Pre: Accepts dist_loads and a variable indicating our desired range for graphing the functions
+#      We want the functions to be between [-2,2] in the y direction
+# Post: Finds the max value that any function reaches and scales all the functions down accordingly
+#       so that all the functions ranges are between [-2,2] while keeping relative heights
+#       the same
+def scale_functions(dist_loads, target_max=2):
+    max_values = []
+
+    if dist_loads == []:
+        scaled_loads = []
+        return scaled_loads
+
+    # Calculate max value for each function within the given interval
+    for load in dist_loads:
+        start = load['start']
+        end = load['end']
+        func = prepare_load(load)['function']
+        x_vals = np.linspace(start, end, 100)
+        y_vals = func(x_vals)
+        max_value = max(y_vals)
+
+        max_values.append(max_value)
+
+    global_max = max(max_values)
+    scaling_factor = target_max / global_max
+
+    # Create a new list with scaled functions
+    scaled_loads = [scale_load(load, scaling_factor) for load in dist_loads]
+
+    return scaled_loads
+
+
+# Pre: Accepts a beam dictionary and the name of a load case
+# Post: This returns a copy of the beam with only the loads of that case
+def case_beam(beam, case):
+    loads_in_case = dict(beam)
+    for name in ['h_forces', 'v_forces', 'moments', 'dist_loads']:
+        loads_in_case[name] = [load for load in beam[name]
+                               if load.get('case', 'default') == case]
+    return loads_in_case
+
+
+# Pre: Accepts the beams of the load cases from case_beam, their totals from beam_totals, and
+#      the factor of each case in one combination
+# Post: This returns the total forces, moments, and distributed loads of the combination, which
+#       are the loads and reactions of every case times the factor of the case. Cases with a
+#       factor of 0 are left out.
+def combination_totals(case_beams, case_totals, case_factors):
+    combination = {'total_h_forces': [], 'total_v_forces': [], 'moments': [], 'dist_loads': []}
+    for case, totals, factor in zip(case_beams, case_totals, case_factors):
+        if factor == 0:
+            continue
+        for name in ['total_h_forces', 'total_v_forces', 'moments']:
+            combination[name] += [{'location': load['location'],
+                                   'magnitude': factor * load['magnitude']}
+                                  for load in totals[name]]
+        combination['dist_loads'] += [scale_load(load, factor) for load in case['dist_loads']]
+    return combination
+
+
+# Pre: Accepts the dictionary from analyze_combinations
+# Post: This returns the reactions and the location and value of the max |value| (and the
+#       extrema) of each diagram for every combination, and the governing combination at each
+#       x, as plain numbers and lists so they can be printed as JSON. Breakpoints are in
+#       x_values twice, first for the value just to their left and then for the value at them.
+def summarize_combinations(combinations):
+    x_values = combinations['x_values']
+    summary = {'load_cases': combinations['load_cases'], 'combinations': {}}
+    for index, name in enumerate(combinations['combination_names']):
+        summary['combinations'][name] = {
+            'factors': dict(zip(combinations['load_cases'],
+                                combinations['factors'][index].tolist())),
+            'reactions': combinations['reactions'][name]}
+        for diagram, extrema in combinations['extrema'][name].items():
+            max_x, max_y = find_max_abs(extrema)
+            summary['combinations'][name][diagram] = {'max_location': max_x,
+                                                      'max_value': max_y,
+                                                      'extrema': extrema}
+
+    summary['governing'] = {'x_values': x_values.tolist()}
+    for diagram, governing in combinations['governing'].items():
+        summary['governing'][diagram] = {
+            'max': governing['max'].tolist(),
+            'max_combination': governing['max_combination'],
+            'min': governing['min'].tolist(),
+            'min_combination': governing['min_combination']}
+    return summary
+
+
+# Pre: Accepts the dictionary from analyze_beam
+# Post: This returns the reactions and the location and value of the max |value| of each
+#       diagram as plain numbers so they can be printed as JSON.
+def summarize_analysis(analysis):
+    summary = {'reactions': analysis['reactions']}
+    for diagram in ['axial', 'shear', 'moment', 'slope', 'deflection']:
+        if diagram not in analysis:
+            continue
+        summary[diagram] = {'max_location': analysis[diagram]['max_location'],
+                            'max_value': analysis[diagram]['max_value'],
+                            'extrema': analysis[diagram]['extrema']}
+    return summary
+
+
+# The columns of the exported diagrams
+EXPORT_COLUMNS = ['x', 'N', 'V', 'M']
+
+
+# Pre: Accepts a beam dictionary, its analysis from analyze_beam, the number of evenly spaced
+#      points along the beam, and how many points are evaluated at a time
+# Post: This is a generator that yields the x values and the axial force, shear force, and
+#       moment at them one chunk at a time, so a beam with millions of points never has all of
+#       its arrays in memory at once. Every breakpoint is added to the chunk with the closest
+#       evenly spaced point (which it replaces) and sampled twice like in breakpoint_grid, so
+#       the jumps of the diagrams are kept.
+def diagram_chunks(beam, analysis, points=10001, chunk_size=65536):
+    inputted_length = beam['inputted_length']
+    dist_loads = prepare_loads(beam['dist_loads'])
+    total_h_forces = analysis['total_h_forces']
+    total_v_forces = analysis['total_v_forces']
+    moments = analysis['moments']
+
+    model = singularity_model(total_v_forces, moments, dist_loads, total_h_forces)
+    events = [force['location'] for force in total_h_forces]
+    events += shear_moment_events(total_v_forces, moments, dist_loads)
+    breakpoints = diagram_breakpoints(inputted_length, events)
+
+    spacing = inputted_length / (points - 1)
+    for first in range(0, points, chunk_size):
+        last = min(first + chunk_size, points) - 1
+        x_grid = np.arange(first, last + 1) * spacing
+        if last == points - 1:
+            x_grid[-1] = inputted_length
+
+        # The breakpoints that are closer to this chunk than to any other chunk
+        inside = breakpoints[(breakpoints >= (first - 0.5) * spacing)
+                             & (breakpoints < (last + 0.5) * spacing)]
+        if len(inside):
+            nearest = np.clip(np.searchsorted(inside, x_grid), 1, len(inside))
+            distance = np.minimum(np.abs(x_grid - inside[nearest - 1]),
+                                  np.abs(x_grid - inside[np.minimum(nearest, len(inside) - 1)]))
+            x_grid = x_grid[distance > 1e-9 * spacing]
+
+        x_values = np.concatenate([x_grid, inside, inside])
+        left = np.concatenate([np.zeros(len(x_grid), dtype=bool),
+                               np.ones(len(inside), dtype=bool),
+                               np.zeros(len(inside), dtype=bool)])
+        # The value just to the left of a breakpoint comes before the value at it
+        order = np.lexsort((~left, x_values))
+        x_values, left = x_values[order], left[order]
+
+        yield (x_values,
+               evaluate_sides(lambda x, left=False: singularity_axial(model, x, left),
+                              x_values, left),
+               evaluate_sides(lambda x, left=False: singularity_shear(model, x, left),
+                              x_values, left),
+               evaluate_sides(lambda x, left=False: singularity_moment(model, x, left),
+                              x_values, left))
+
+
+# Pre: Accepts the chunks from diagram_chunks, an open text file (like sys.stdout), the format
+#      ("csv" or "ndjson"), the name of the beam (a beam column is only added when it is not
+#      None), and whether to start the CSV with a header
+# Post: This writes a row for every x value as soon as its chunk is made, so the rows can be
+#       read from a pipe while the rest of the beam is still being evaluated. Each NDJSON line
+#       is a JSON object with the same keys as the CSV columns. The floats are written with
+#       repr, which is the shortest form that reads back exactly (the same as json).
+def write_diagram_rows(chunks, stream, file_format='csv', beam_name=None, header=True):
+    if file_format == 'csv':
+        if header:
+            columns = (['beam'] if beam_name is not None else []) + EXPORT_COLUMNS
+            stream.write(",".join(columns) + "\n")
+        # The name is always quoted, so a comma in it does not start a new column
+        row_format = "" if beam_name is None else '"' + beam_name.replace('"', '""') + '",'
+        value_format = ",".join(["%r"] * len(EXPORT_COLUMNS)) + "\n"
+    else:
+        row_format = "{" if beam_name is None else "{" + f'"beam": {json.dumps(beam_name)}, '
+        value_format = ", ".join(f'"{column}": %r' for column in EXPORT_COLUMNS) + "}\n"
+    # A % in the name of the beam is not a placeholder
+    row_format = row_format.replace("%", "%%") + value_format
+
+    for chunk in chunks:
+        stream.write("".join(map(row_format.__mod__,
+                                 zip(*(column.tolist() for column in chunk)))))
+        stream.flush()
+
+
+# Pre: Accepts the dictionary from influence_lines
+# Post: This returns the influence lines as lists so they can be printed or saved as JSON
+def summarize_influence_lines(influence):
+    return {'load_positions': influence['load_positions'].tolist(),
+            'reactions': {name: {'location': reaction['location'],
+                                 'values': reaction['values'].tolist()}
+                          for name, reaction in influence['reactions'].items()},
+            'sections': [{'location': float(location),
+                          'shear': influence['shear'][index].tolist(),
+                          'moment': influence['moment'][index].tolist()}
+                         for index, location in enumerate(influence['section_locations'])]}
+
+
+# Pre: Accepts the dictionary from train_envelopes
+# Post: This returns the envelopes as lists so they can be printed or saved as JSON
+def summarize_envelopes(envelopes):
+    summary = {'section_locations': envelopes['section_locations'].tolist()}
+    for diagram in ['shear', 'moment']:
+        summary[diagram] = {name: values.tolist()
+                            for name, values in envelopes[diagram].items()}
+    return summary
+
+
+# Pre: Accepts the dictionary from influence_lines and unit_system
+# Post: This plots the influence lines of the reactions, the shear at each section, and the
+#       moment at each section under each other and returns the figure. The values are per unit
+#       load, so the moment lines are in units of length.
+def plot_influence_lines(influence, unit_system):
+    import matplotlib.pyplot as plt
+
+    length_unit = 'm' if unit_system == 'metric' else 'ft'
+    load_positions = influence['load_positions']
+
+    influence_fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(12, 16))
+    for name, reaction in influence['reactions'].items():
+        ax1.plot(load_positions, reaction['values'],
+                 label=f"{name} at {reaction['location']} {length_unit}")
+    for index, location in enumerate(influence['section_locations']):
+        ax2.plot(load_positions, influence['shear'][index],
+                 label=f"Section at {location} {length_unit}")
+        ax3.plot(load_positions, influence['moment'][index],
+                 label=f"Section at {location} {length_unit}")
+
+    titles = ["Reaction Influence Lines", "Shear Force Influence Lines",
+              "Moment Influence Lines"]
+    y_labels = ["Reaction per Unit Load", "Shear Force per Unit Load",
+                f"Moment per Unit Load ({length_unit})"]
+    for ax, title, y_label in zip([ax1, ax2, ax3], titles, y_labels):
+        ax.axhline(y=0, color='k', linestyle='--')
+        ax.set_title(title)
+        ax.set_xlabel(f"Unit Load Position ({length_unit})")
+        ax.set_ylabel(y_label)
+        ax.legend(prop={'size': 8})
+        ax.grid(True)
+
+    # This avoids overlapping of text
+    with stage_timing.stage('tight_layout'):
+        plt.tight_layout(pad=3.0)
+
+    return influence_fig
+
+
+# Pre: Accepts an axis, the dictionary from train_envelopes, which diagram to draw ('shear' or
+#      'moment'), and unit_system
+# Post: This draws the max and min envelope of the diagram as a filled band in the same style
+#       as shear_diagram and moment_diagram and labels the largest absolute value.
+def envelope_diagram(ax, envelopes, diagram, unit_system):
+    length_unit = 'm' if unit_system == 'metric' else 'ft'
+    force_unit = 'N' if unit_system == 'metric' else 'lb'
+    moment_unit = 'N*m' if unit_system == 'metric' else 'ft*lb'
+
+    if diagram == 'shear':
+        color, title, unit, label = 'r', "Shear Force Envelope", force_unit, 'Force'
+        y_label = f"Shear Force ({force_unit})"
+    else:
+        color, title, unit, label = 'g', "Moment Envelope", moment_unit, 'Moment'
+        y_label = f"Moment ({moment_unit})"
+
+    x_values = envelopes['section_locations']
+    max_values = envelopes[diagram]['max']
+    min_values = envelopes[diagram]['min']
+
+    # The maximum absolute value and its x value
+    if np.max(max_values) >= -np.min(min_values):
+        max_index = np.argmax(max_values)
+        max_y = max_values[max_index]
+    else:
+        max_index = np.argmin(min_values)
+        max_y = min_values[max_index]
+    max_x = x_values[max_index]
+
+    # This places the annotation above or below the point, whichever is closer to the center
+    y_center = (np.max(max_values) + np.min(min_values)) / 2
+    if abs((max_y / 1.5) - y_center) < abs((max_y * 1.5) - y_center):
+        xytext = (max_x, max_y / 1.5)
+    else:
+        xytext = (max_x, max_y * 1.5)
+
+    ax.axhline(y=0, color='k', linestyle='--')
+    ax.fill_between(x_values, min_values, max_values, color=color, alpha=0.3,
+                    label=f"{title} (min to max)")
+    ax.plot(x_values, max_values, color=color)
+    ax.plot(x_values, min_values, color=color)
+    ax.annotate(f'Max |{label}|: {abs(max_y):.2f} {unit}\nat x = {max_x:.2f} {length_unit}',
+                xy=(max_x, max_y), xytext=xytext,
+                arrowprops=dict(facecolor='red', shrink=0.05),
+                fontsize=12, color='red', horizontalalignment='center')
+    ax.set_title(title)
+    ax.set_xlabel(f"Position ({length_unit})")
+    ax.set_ylabel(y_label)
+    ax.legend(prop={'size': 8})
+    ax.grid(True)
+
+
+# Pre: Accepts the dictionary from train_envelopes and unit_system
+# Post: This plots the shear and moment envelopes under each other and returns the figure
+def plot_envelopes(envelopes, unit_system):
+    import matplotlib.pyplot as plt
+
+    envelope_fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 12))
+    envelope_diagram(ax1, envelopes, 'shear', unit_system)
+    envelope_diagram(ax2, envelopes, 'moment', unit_system)
+
+    # This avoids overlapping of text
+    with stage_timing.stage('tight_layout'):
+        plt.tight_layout(pad=3.0)
+
+    return envelope_fig
+
+
+# Pre: Accepts a list of (figure, diagram name) pairs, the folder to save the images in, the
+#      name that starts each file name, and the file formats
+# Post: This saves every figure in every format as "{file_name}_{diagram name}.{format}" and
+#       returns the paths of the saved files.
+def save_figures(figures, output_directory, file_name, formats):
+    os.makedirs(output_directory, exist_ok=True)
+    saved_files = []
+    for file_format in formats:
+        for figure, diagram_name in figures:
+            file_path = os.path.join(output_directory,
+                                     f"{file_name}_{diagram_name}.{file_format}")
+            figure.savefig(file_path, format=file_format)
+            saved_files.append(file_path)
+    return saved_files
@@ -0,0 +1,1411 @@
+# This is a program about generating load, axial, shear, and moment graphs based on external forces
+# acted on a continuous beam. A continuous beam rests on any number of pin, roller, and fixed
+# supports along its length, so it is usually statically indeterminate. The reactions are found
+# with the direct stiffness method and the graphs are generated based on the external point
+# forces, moments, and distributed loads.
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import sympy as sp
+# matplotlib and scipy are imported inside the functions that use them, so the
+# reactions and diagram values can be computed without loading matplotlib (see analyze_beam).
+
+import stage_timing
+
+# The beam types share everything but the reaction solve (see beam_engine)
+import beam_engine
+from beam_engine import (beam_length, curve_deflection, curve_slope, definition_number,
+    deflection_diagram, diagram_chunks, elastic_curve, load_singularity_terms,
+    parse_distributed_function, point_definitions, prepare_load, prepare_loads,
+    prepared_load_record, read_beam_definition, restore_prepared_load, sample_axial_diagram,
+    sample_deflection_diagram, sample_moment_diagram, sample_shear_diagram, sample_slope_diagram,
+    save_figures, scale_functions, section_stiffness, shear_moment_events, singularity_model,
+    slope_diagram, stiffness_at_point, stiffness_definition, summarize_analysis, unit_system_type,
+    write_diagram_rows)
+
+# The stages that --timing reports and the functions that run them (see stage_timing)
+TIMED_STAGES = {
+    'load_beam_definition': 'input',
+    'prompt_beam_definition': 'input',
+    'parse_distributed_function': 'sympify',
+    'closed_form_antiderivative': 'integrate',
+    'numeric_antiderivative': 'quad',
+    'compile_function': 'lambdify',
+    'equivalent_nodal_loads': 'nodal loads',
+    'solve_support_reactions': 'reaction solve',
+    'beam_totals': 'total forces',
+    'analyze_beam': 'analysis',
+    'sample_axial_diagram': 'axial diagram',
+    'sample_shear_diagram': 'shear diagram',
+    'sample_moment_diagram': 'moment diagram',
+    'elastic_curve': 'elastic curve',
+    'sample_slope_diagram': 'slope diagram',
+    'sample_deflection_diagram': 'deflection diagram',
+    'plot_beam': 'plot',
+    'scale_functions': 'scale loads',
+    'load_diagram': 'load plot',
+    'axial_diagram': 'axial plot',
+    'shear_diagram': 'shear plot',
+    'moment_diagram': 'moment plot',
+    'slope_diagram': 'slope plot',
+    'deflection_diagram': 'deflection plot',
+    'save_figures': 'render'}
+
+# These are the directions each type of support holds the beam in. "x" and "y" are the
+# horizontal and vertical movement and "m" is the rotation.
+SUPPORT_TYPES = {'pin': ['x', 'y'],
+                 'roller': ['y'],
+                 'fixed': ['x', 'y', 'm']}
+
+
+# Pre: This takes in inputted_length
+# Post: This prompts the user for the location and type of every support of the beam. A pin
+#       holds the beam horizontally and vertically, a roller only vertically, and a fixed
+#       support also holds its rotation. The user will be reprompted if the support is out of
+#       the range of the beam, at the same location as another support, or not one of the
+#       three types. To end the input, the user can type 'done' once there are enough
+#       supports to hold the beam in place.
+def support_locations_input(inputted_length):
+    print()
+    supports = []
+    print("Please input the location of a support or type 'done' if there are no more: ")
+    while True:
+        location_input = input("Enter the location of the support: ")
+        if location_input.lower() == "done":
+            try:
+                check_supports(supports)
+                break
+            except ValueError as error:
+                print(error)
+                continue
+        try:
+            support_location = float(location_input)
+            if not (0 <= support_location <= inputted_length):
+                print("The location is not in the range of the beam. Please Try again.")
+                continue
+            if any(support['location'] == support_location for support in supports):
+                print("Invalid input. There is already a support at this location.")
+                continue
+        except ValueError:
+            print("Invalid input. Please input only a number.")
+            continue
+
+        support_type = input("Enter the type of the support (pin, roller, or fixed): ")
+        support_type = support_type.strip().lower()
+        if support_type not in SUPPORT_TYPES:
+            print("Invalid input. The support must be a pin, roller, or fixed.")
+            continue
+
+        supports.append({"location": support_location, "type": support_type})
+
+    return sorted(supports, key=lambda support: support['location'])
+
+
+# Pre: Takes in inputtedLength to check if the inputted force is within bounds. 
+#      It only accepts numbers and reprompts the user if they input
+#      anything else.
+# Post: This prompts the user to input the location of the horizontal point force and the direction
+#       and magnitude. After that is done, it reprompts the user to add another force.
+#       To end the input, the user can type 'done' and move on to the next prompt.
+def point_horizontal_forces(inputted_length):
+    print()
+    h_forces = []  # This is an empty list to store the forces and locations the user inputs
+    print("Please input the location of a horizontal point force "
+          "or type 'done' if there are no more: ")
+    while True:
+        location_input = input("Enter the location of the force: ")
+        if location_input.lower() == "done":
+            break
+        try:
+            horizontal_force_location = float(location_input)
+            if not (0 <= horizontal_force_location <= inputted_length):
+                print("The location is not in the range of the beam. Please Try again.")
+                continue
+        except ValueError:
+            print("Invalid input. Please input only a number.")      
+            continue
+                      
+        try:
+            print("For the direction, enter a positive number if the force is to the right "
+                  "and a negative number if the force is to the left")
+            horizontal_force_magnitude = float(input("Enter the magnitude and "
+                                                     "direction of the force: "))
+        except ValueError:
+            print("Invalid input. Please input only a number.")
+            continue
+
+        horizontal_force_info = {"location": horizontal_force_location,
+                                 "magnitude": horizontal_force_magnitude}
+        # horizontalForce is a dictionary that stores the information for the location
+        # and magnitude of a given force.
+        h_forces.append(horizontal_force_info)
+        
+    return h_forces
+
+
+# Pre: Takes in inputtedLength to check if the inputted force is within bounds.
+#      It only accepts numbers and reprompts the user if they input
+#      anything else.
+# Post: This prompts the user to input the location of the vertical point force and the direction
+#       and magnitude. After that is done, it reprompts the user to add another force.
+#       To end the input, the user can type 'done' and move on to the next prompt.
+def point_vertical_forces(inputted_length):
+    print()
+    v_forces = []  # This is an empty list to store the forces and locations the user inputs
+    print("Please input the location of a vertical point force "
+          "or type 'done' if there are no more: ")
+    while True:
+        location_input = input("Enter the location of the force: ")
+        if location_input.lower() == "done":
+            break
+        try:
+            vertical_force_location = float(location_input)
+            if not (0 <= vertical_force_location <= inputted_length):
+                print("The location is not in the range of the beam. Please Try again.")
+                continue
+        except ValueError:
+            print("Invalid input. Please input only a number.")      
+            continue
+                      
+        try:
+            print("For the direction, enter a positive number if the force is upwards"
+                  " and a negative number if the force is downwards")
+            vertical_force_magnitude = float(input("Enter the magnitude and " 
+                                                   "direction of the force: "))
+        except ValueError:
+            print("Invalid input. Please input only a number.")
+            continue
+
+        vertical_force_info = {"location": vertical_force_location,
+                               "magnitude": vertical_force_magnitude}
+        # vertical_force_info is a dictionary that stores the information for the location
+        # and magnitude of a given force.
+        v_forces.append(vertical_force_info)
+
+    return v_forces
+
+
+# Pre: Takes in inputtedLength to check if the inputted moment is within bounds.
+#      It only accepts numbers and reprompts the user if they input
+#      anything else.
+# Post: This prompts the user to input the location of the bending point moment and the direction
+#       and magnitude. After that is done, it reprompts the user to add another bending moment.
+#       To end the input, the user can type 'done' and move on to the next prompt.
+def point_moments(inputted_length):
+    print()
+    moments = []  # This is an empty list to store the forces and locations the user inputs
+    print("Please input the location of a bending moment "
+          "or type 'done' if there are no more: ")
+    while True:
+        location_input = input("Enter the location of the moment: ")
+        if location_input.lower() == "done":
+            break
+        try:
+            moment_location = float(location_input)
+            if not (0 <= moment_location <= inputted_length):
+                print("The location is not in the range of the beam. Please Try again.")
+                continue
+        except ValueError:
+            print("Invalid input. Please input only a number.")      
+            continue
+                      
+        try:
+            print("For the direction, enter a positive number if the moment is counter-clockwise"
+                  " and a negative number if the moment is clockwise")
+            moment_magnitude = float(input("Enter the magnitude and " 
+                                           "direction of the moment: "))
+        except ValueError:
+            print("Invalid input. Please input only a number.")
+            continue
+
+        moment_info = {"location": moment_location,
+                       "magnitude": moment_magnitude}
+        # moment_info is a dictionary that stores the information for the location
+        # and magnitude of a given moment.
+        moments.append(moment_info)
+
+    return moments
+
+
+# Pre: Takes in inputtedLength to check if the inputted moment is within bounds.
+#      It only accepts numbers and reprompts the user if they input
+#      anything else.
+# Post: This prompts the user to input the interval of the distributed load and the
+#       function. After that is done, it reprompts the user to add another distrbuted load.
+#       To end the input, the user can type 'done' and move on to the next prompt.
+def distributed_load(inputted_length):
+    print()
+    dist_loads = []  # This is an empty list to store the function and interval
+    print("Please input the starting location of the "
+          "Distributed Load or type 'done' if there are no more: ")
+    while True:
+        location_input = input("Enter the starting location: ")
+        if location_input.lower() == "done":
+            break
+        try:
+            start_location = float(location_input)
+            if not (0 <= start_location <= inputted_length):
+                print("The location is not in the range of the beam. Please Try again.")
+                continue
+        except ValueError:
+            print("Invalid input. Please input only a number.")
+            continue
+
+        try:
+            print("Please input the ending location of the Distributed Load: ")
+            location_input = input("Enter the ending location: ")
+            end_location = float(location_input)
+
+            if end_location == start_location:
+                print("The ending location cannot be the same as the starting location. "
+                      "Please try again.")
+                continue
+
+            if not (start_location < end_location <= inputted_length):
+                print("The location is not in the range of the beam or is "
+                      "before the starting location. Please try again")
+                continue
+        except ValueError:
+            print("Invalid input. Please input only a number.")
+            continue
+
+        try:
+            print("Please input the distributed load function in a format"
+                  " that matplotlib will be able to graph")
+            user_function_input = input("Enter the function: ")
+            user_function = parse_distributed_function(user_function_input,
+                                                       start_location, end_location)
+
+            dist_info = {"start": start_location, "end": end_location, "function": user_function}
+            # dist_info is a dictionary that stores the information for the interval
+            # and function for a given distributed load.
+            dist_loads.append(dist_info)
+
+        except (sp.SympifyError, ValueError):
+            print("Invalid function. Please enter a valid mathematical "
+                  "function that matplotlib can graph.")
+            print()
+            continue
+
+    return dist_loads
+
+
+# Pre: Accepts a list of supports, each with a location and a type
+# Post: This checks that the supports can hold the beam in place. The beam needs something to
+#       hold it horizontally (a pin or a fixed support) and either two supports that hold it
+#       vertically or a fixed support. A ValueError that explains the problem is raised if not.
+def check_supports(supports):
+    held_directions = [direction for support in supports
+                       for direction in SUPPORT_TYPES[support['type']]]
+    if 'x' not in held_directions:
+        raise ValueError("The beam needs a pin or a fixed support to hold it horizontally.")
+    if held_directions.count('y') < 2 and 'm' not in held_directions:
+        raise ValueError("The beam needs at least two supports or a fixed support.")
+
+
+# Pre: Accepts the "supports" of a beam definition file and inputted_length
+# Post: This checks every support the same way the prompts do and returns the list of
+#       supports sorted by location, each with a location and type.
+def support_definitions(entries, inputted_length):
+    if not isinstance(entries, list):
+        raise ValueError('supports must be a list of supports with a "location" and "type"')
+
+    supports = []
+    for index, entry in enumerate(entries):
+        entry_name = f"supports[{index}]"
+        if not isinstance(entry, dict):
+            raise ValueError(f"{entry_name} must have a location and a type")
+        location = definition_number(entry.get('location'), f"{entry_name} location")
+        if not (0 <= location <= inputted_length):
+            raise ValueError(f"{entry_name}: The location is not in the range of the beam.")
+        if any(support['location'] == location for support in supports):
+            raise ValueError(f"{entry_name}: There is already a support at this location.")
+        support_type = str(entry.get('type', '')).strip().lower()
+        if support_type not in SUPPORT_TYPES:
+            raise ValueError(f"{entry_name}: The support must be a pin, roller, or fixed.")
+        supports.append({"location": location, "type": support_type})
+
+    try:
+        check_supports(supports)
+    except ValueError as error:
+        raise ValueError(f"supports: {error}") from None
+    return sorted(supports, key=lambda support: support['location'])
+
+
+# Pre: Accepts a beam definition as a dictionary (the contents of a JSON or TOML file)
+#      It has "unit_system", "length", "supports" (each with a "location" and a "type" of
+#      "pin", "roller", or "fixed"), and optionally lists of "h_forces", "v_forces", and
+#      "moments" (each with a "location" and "magnitude"), "dist_loads" (each with a "start",
+#      "end", and "function"), and the "EI" and "EA" of the beam.
+# Post: This checks the definition the same way the prompts check the user input and returns
+#       the beam as a dictionary. A ValueError that explains the problem is raised if anything
+#       is invalid.
+def validate_beam_definition(definition):
+    if not isinstance(definition, dict):
+        raise ValueError("The beam definition must be an object")
+
+    unit_system = str(definition.get('unit_system', '')).strip().lower()
+    if unit_system not in ["metric", "imperial"]:
+        raise ValueError('unit_system must be "metric" or "imperial"')
+
+    inputted_length = definition_number(definition.get('length'), "length")
+    if inputted_length <= 0:
+        raise ValueError("length: Invalid input. Length must be a positive number.")
+
+    supports = support_definitions(definition.get('supports'), inputted_length)
+
+    h_forces = point_definitions(definition.get('h_forces', []), "h_forces", inputted_length)
+    v_forces = point_definitions(definition.get('v_forces', []), "v_forces", inputted_length)
+    moments = point_definitions(definition.get('moments', []), "moments", inputted_length)
+
+    dist_loads = []
+    for index, load in enumerate(definition.get('dist_loads', [])):
+        load_name = f"dist_loads[{index}]"
+        if not isinstance(load, dict):
+            raise ValueError(f"{load_name} must have a start, end, and function")
+        start_location = definition_number(load.get('start'), f"{load_name} start")
+        if not (0 <= start_location <= inputted_length):
+            raise ValueError(f"{load_name}: The location is not in the range of the beam.")
+        end_location = definition_number(load.get('end'), f"{load_name} end")
+        if end_location == start_location:
+            raise ValueError(f"{load_name}: The ending location cannot be the same as the "
+                             f"starting location.")
+        if not (start_location < end_location <= inputted_length):
+            raise ValueError(f"{load_name}: The location is not in the range of the beam or "
+                             f"is before the starting location.")
+        try:
+            user_function = parse_distributed_function(str(load.get('function')),
+                                                       start_location, end_location)
+        except (sp.SympifyError, ValueError):
+            raise ValueError(f"{load_name}: Invalid function. Please enter a valid "
+                             f"mathematical function that matplotlib can graph.") from None
+
+        dist_loads.append({"start": start_location, "end": end_location,
+                           "function": user_function})
+
+    stiffness = None
+    if 'EI' in definition:
+        stiffness = stiffness_definition(definition['EI'], inputted_length)
+
+    axial_stiffness = 1.0
+    if 'EA' in definition:
+        axial_stiffness = definition_number(definition['EA'], "EA")
+        if axial_stiffness <= 0:
+            raise ValueError("EA: Invalid input. EA must be a positive number.")
+
+    return {'unit_system': unit_system,
+            'inputted_length': inputted_length,
+            'supports': supports,
+            'h_forces': h_forces,
+            'v_forces': v_forces,
+            'moments': moments,
+            'dist_loads': dist_loads,
+            'stiffness': stiffness,
+            'axial_stiffness': axial_stiffness}
+
+
+# Pre: Accepts the path of a beam definition file. Files ending in .toml are read as TOML
+#      and every other file is read as JSON.
+# Post: This reads and validates the file and returns the beam as a dictionary.
+def load_beam_definition(file_path):
+    return validate_beam_definition(read_beam_definition(file_path))
+
+
+# Pre: Accepts a beam dictionary
+# Post: This returns the nodes of the stiffness model: both ends of the beam, every support,
+#       and every place where the EI changes. Each element between two nodes has one EI.
+def beam_nodes(beam):
+    node_locations = [0.0, beam['inputted_length']]
+    node_locations += [support['location'] for support in beam['supports']]
+    if beam['stiffness'] is not None:
+        node_locations += [piece['start'] for piece in beam['stiffness']]
+    return np.unique(np.array(node_locations, dtype=float))
+
+
+# Pre: Accepts the nodes from beam_nodes, the pieces from stiffness_definition (or None), and
+#      the EA of the beam
+# Post: This returns the (E, 6, 6) stiffness matrices of the E elements between the nodes. The
+#       degrees of freedom of each element are the horizontal movement, vertical movement, and
+#       rotation of its left node and then of its right node. The axial part is a bar and the
+#       bending part is an Euler-Bernoulli beam. The EI is 1 when it was not given, which
+#       gives the same reactions as any other constant EI.
+def element_stiffness(nodes, stiffness, axial_stiffness):
+    lengths = np.diff(nodes)
+    if stiffness is None:
+        bending_stiffness = np.ones(len(lengths))
+    else:
+        bending_stiffness = stiffness_at_point((nodes[:-1] + nodes[1:]) / 2, stiffness)
+
+    matrices = np.zeros((len(lengths), 6, 6))
+    bar = axial_stiffness / lengths
+    matrices[:, 0, 0] = matrices[:, 3, 3] = bar
+    matrices[:, 0, 3] = matrices[:, 3, 0] = -bar
+
+    flexural = bending_stiffness / lengths ** 3
+    unit_beam = np.array([[12, 6, -12, 6], [6, 4, -6, 2], [-12, -6, 12, -6], [6, 2, -6, 4]])
+    # Row and column 1 and 3 of the unit beam are rotations, which have a length factor
+    length_powers = np.array([0, 1, 0, 1])
+    bending_dofs = [1, 2, 4, 5]
+    for row in range(4):
+        for column in range(4):
+            matrices[:, bending_dofs[row], bending_dofs[column]] = (
+                flexural * unit_beam[row, column]
+                * lengths ** (length_powers[row] + length_powers[column]))
+    return matrices
+
+
+# Pre: Accepts the positions along an element as fractions xi of its length and the lengths of
+#      the elements
+# Post: This returns the Hermite shape functions of the vertical movement and rotation of each
+#       end of the element at every position and their derivatives along the beam, each as an
+#       array with the 4 functions in the last axis
+def hermite_shapes(xi, lengths):
+    shapes = np.stack([1 - 3 * xi ** 2 + 2 * xi ** 3,
+                       lengths * (xi - 2 * xi ** 2 + xi ** 3),
+                       3 * xi ** 2 - 2 * xi ** 3,
+                       lengths * (-xi ** 2 + xi ** 3)], axis=-1)
+    slopes = np.stack([(-6 * xi + 6 * xi ** 2) / lengths,
+                       1 - 4 * xi + 3 * xi ** 2,
+                       (6 * xi - 6 * xi ** 2) / lengths,
+                       -2 * xi + 3 * xi ** 2], axis=-1)
+    return shapes, slopes
+
+
+# Pre: Accepts the nodes from beam_nodes and a beam dictionary with prepared distributed loads
+# Post: This returns the load vector with 3 values for each node (the horizontal force,
+#       vertical force, and moment). A load between two nodes is shared between them the same
+#       way the shape functions share the movement (the consistent or work-equivalent loads),
+#       so the movements at the nodes are exact. Polynomial distributed loads are integrated
+#       exactly with Gauss-Legendre quadrature over the part of the load on each element and
+#       other loads are integrated adaptively.
+def equivalent_nodal_loads(nodes, beam):
+    loads = np.zeros(3 * len(nodes))
+    lengths = np.diff(nodes)
+
+    # This finds the element of each location and where it is along that element
+    def element_positions(locations):
+        locations = np.asarray(locations, dtype=float)
+        elements = np.clip(np.searchsorted(nodes, locations, side='right') - 1,
+                           0, len(lengths) - 1)
+        return elements, (locations - nodes[elements]) / lengths[elements]
+
+    def add_bending_loads(elements, values):
+        for index, offset in enumerate([1, 2, 4, 5]):
+            np.add.at(loads, 3 * elements + offset, values[..., index])
+
+    if beam['h_forces']:
+        elements, xi = element_positions([force['location'] for force in beam['h_forces']])
+        magnitudes = np.array([force['magnitude'] for force in beam['h_forces']])
+        np.add.at(loads, 3 * elements, (1 - xi) * magnitudes)
+        np.add.at(loads, 3 * elements + 3, xi * magnitudes)
+
+    if beam['v_forces']:
+        elements, xi = element_positions([force['location'] for force in beam['v_forces']])
+        magnitudes = np.array([force['magnitude'] for force in beam['v_forces']])
+        shapes, _ = hermite_shapes(xi, lengths[elements])
+        add_bending_loads(elements, magnitudes[:, np.newaxis] * shapes)
+
+    if beam['moments']:
+        elements, xi = element_positions([moment['location'] for moment in beam['moments']])
+        magnitudes = np.array([moment['magnitude'] for moment in beam['moments']])
+        _, slopes = hermite_shapes(xi, lengths[elements])
+        add_bending_loads(elements, magnitudes[:, np.newaxis] * slopes)
+
+    gauss_nodes, gauss_weights = np.polynomial.legendre.leggauss(8)
+    for load in beam['dist_loads']:
+        load_function = prepare_load(load)['function']
+        cuts = np.unique(np.clip(nodes, load['start'], load['end']))
+        starts, ends = cuts[:-1], cuts[1:]
+        elements, _ = element_positions((starts + ends) / 2)
+
+        if load_singularity_terms(load) is None:
+            from scipy.integrate import quad_vec
+
+            # Loads that are not polynomials can have a kink or a steep part (like sqrt(x) at
+            # 0), so each part of the load is integrated adaptively
+            for element, start, end in zip(elements, starts, ends):
+                def shared_load(position):
+                    xi = (position - nodes[element]) / lengths[element]
+                    shapes, _ = hermite_shapes(xi, lengths[element])
+                    # A positive distributed load acts downwards
+                    return -load_function(position) * shapes
+
+                add_bending_loads(np.array([element]),
+                                  quad_vec(shared_load, start, end, epsrel=1e-10)[0][np.newaxis])
+            continue
+
+        # The shape functions are cubic, so 8 Gauss points are exact for polynomial loads of up
+        # to degree 12
+        widths = (ends - starts)[:, np.newaxis]
+        positions = starts[:, np.newaxis] + widths * (gauss_nodes + 1) / 2
+        weights = widths * gauss_weights / 2
+        # A positive distributed load acts downwards
+        intensities = -np.broadcast_to(load_function(positions), positions.shape)
+
+        xi = (positions - nodes[elements][:, np.newaxis]) / lengths[elements][:, np.newaxis]
+        shapes, _ = hermite_shapes(xi, lengths[elements][:, np.newaxis])
+        add_bending_loads(elements, np.sum((weights * intensities)[..., np.newaxis] * shapes,
+                                           axis=1))
+
+    return loads
+
+
+# Pre: Accepts a beam dictionary
+# Post: This solves the beam with the direct stiffness method and returns the movement of every
+#       node and the reaction at every direction each support holds. The nodes are numbered
+#       along the beam, so an element only connects the 3 degrees of freedom of one node to the
+#       next. The global stiffness matrix is then a band with 5 diagonals above the main
+#       diagonal, and it is built straight into banded storage and solved with
+#       scipy.linalg.solveh_banded. This keeps the time and memory in proportion to the number
+#       of spans, so beams with hundreds of spans are solved quickly. A ValueError is raised if
+#       the supports cannot keep the beam in place.
+def solve_support_reactions(beam):
+    from scipy.linalg import LinAlgError, solveh_banded
+
+    nodes = beam_nodes(beam)
+    matrices = element_stiffness(nodes, beam['stiffness'], beam['axial_stiffness'])
+    loads = equivalent_nodal_loads(nodes, beam)
+
+    held_dofs = []
+    for support in beam['supports']:
+        node = int(np.searchsorted(nodes, support['location']))
+        held_dofs += [3 * node + 'xym'.index(direction)
+                      for direction in SUPPORT_TYPES[support['type']]]
+
+    # This numbers the free degrees of freedom in order and marks the held ones with -1
+    free = np.ones(3 * len(nodes), dtype=bool)
+    free[held_dofs] = False
+    free_index = np.full(3 * len(nodes), -1)
+    free_index[free] = np.arange(np.count_nonzero(free))
+
+    element_dofs = 3 * np.arange(len(nodes) - 1)[:, np.newaxis] + np.arange(6)
+    bandwidth = 5
+    banded = np.zeros((bandwidth + 1, np.count_nonzero(free)))
+    for row in range(6):
+        for column in range(6):
+            rows = free_index[element_dofs[:, row]]
+            columns = free_index[element_dofs[:, column]]
+            # Only the upper triangle is stored. Row i and column j go to
+            # banded[bandwidth + i - j, j].
+            upper = (rows >= 0) & (columns >= 0) & (rows <= columns)
+            np.add.at(banded, (bandwidth + rows[upper] - columns[upper], columns[upper]),
+                      matrices[upper, row, column])
+
+    displacements = np.zeros(3 * len(nodes))
+    try:
+        displacements[free] = solveh_banded(banded, loads[free])
+    except LinAlgError:
+        raise ValueError("The supports cannot keep the beam in place.") from None
+
+    # The reactions are what the elements need at the held degrees of freedom beyond the loads
+    internal_forces = np.zeros(3 * len(nodes))
+    np.add.at(internal_forces, element_dofs,
+              np.einsum('eij,ej->ei', matrices, displacements[element_dofs]))
+    reactions = internal_forces - loads
+
+    support_reactions = []
+    for support in beam['supports']:
+        node = int(np.searchsorted(nodes, support['location']))
+        support_reactions.append({direction: float(reactions[3 * node + 'xym'.index(direction)])
+                                  for direction in SUPPORT_TYPES[support['type']]})
+    return {'nodes': nodes, 'displacements': displacements, 'reactions': support_reactions}
+
+
+# Pre: Accepts a beam dictionary and the dictionary from solve_support_reactions
+# Post: This adds the reactions of the supports to the forces and moments of the beam. Once
+#       the reactions are known the beam is in equilibrium like a statically determinate
+#       beam, so the diagrams are found the same way as the other beam types. It returns a
+#       dictionary with the reactions (named after the type and number of each support) and
+#       the total forces and moments on the beam.
+def beam_totals(beam, solution):
+    reactions = {}
+    total_h_forces = list(beam['h_forces'])
+    total_v_forces = list(beam['v_forces'])
+    moments = list(beam['moments'])
+
+    for number, (support, support_reactions) in enumerate(zip(beam['supports'],
+                                                              solution['reactions']), start=1):
+        location = support['location']
+        for direction, reaction in support_reactions.items():
+            reactions[f"{support['type']}_{number}_{direction}"] = reaction
+        if 'x' in support_reactions:
+            total_h_forces.append({'location': location, 'magnitude': support_reactions['x']})
+        total_v_forces.append({'location': location, 'magnitude': support_reactions['y']})
+        if 'm' in support_reactions:
+            moments.append({'location': location, 'magnitude': support_reactions['m']})
+
+    return {'reactions': reactions,
+            'total_h_forces': total_h_forces,
+            'total_v_forces': total_v_forces,
+            'moments': moments}
+
+
+# Pre: Accepts an elastic curve from elastic_curve and the supports of the beam
+# Post: The deflection is 0 at every support and the slope is 0 at fixed supports. Since the
+#       reactions come from the same beam theory, one slope and deflection at x = 0 meet all of
+#       these at once. They are found with least squares (the curve moves by
+#       rotation * x + offset) and the curve is returned.
+def support_curve(curve, supports):
+    rows = []
+    values = []
+    for support in supports:
+        rows.append([support['location'], 1.0])
+        values.append(-curve_deflection(curve, support['location']))
+        if support['type'] == 'fixed':
+            rows.append([1.0, 0.0])
+            values.append(-curve_slope(curve, support['location']))
+    (curve['rotation'], curve['offset']), *_ = np.linalg.lstsq(np.array(rows),
+                                                               np.array(values), rcond=None)
+    return curve
+
+
+# Pre: Accepts inputtedLength, v_forces, initial_shear_force.
+# Post: This plots the axial force diagram based on what the user inputted for horizontal forces.
+#       It uses matplotlib for the graph.
+def axial_diagram(ax, inputted_length, h_forces, total_h_forces, unit_system,
+                  samples=None):
+    length_unit = 'm' if unit_system == 'metric' else 'ft'
+    force_unit = 'N' if unit_system == 'metric' else 'lb'
+
+    if samples is None:
+        samples = sample_axial_diagram(inputted_length, total_h_forces)
+    x_values = samples['x_values']
+    y_values = samples['values']
+
+    # This plots a vertical line for the horizontal point forces
+    for force in h_forces:
+        location = force['location']
+        magnitude = force['magnitude']
+        ax.axvline(x=location, linestyle='--',
+                   label=f'Axial Force at {location} {length_unit}, {magnitude} {force_unit}')
+
+    # This plots a vertical line for the pin reaction force
+    pin_x = total_h_forces[-1]
+    location = pin_x['location']
+    magnitude = pin_x['magnitude']
+    ax.axvline(x=location, linestyle='--', color='red',
+               label=f'Horizontal Reaction Force at {location} m, {magnitude:.2f} N')
+
+    # The maximum absolute value and its x value
+    max_x = samples['max_location']
+    max_y = samples['max_value']
+
+    # Determine the vertical offset direction based on y position relative to the center
+    # This finds whether to orient the annotation above or below the plotted line based on
+    # which one is closest to the center
+    y_range = np.max(y_values) - np.min(y_values)
+    y_center = np.min(y_values) + y_range / 2
+
+    # Calculate the distances for both potential annotation positions
+    distance_above = abs((max_y * 1.5) - y_center)
+    distance_below = abs((max_y / 1.5) - y_center)
+    if distance_below < distance_above:
+        # Place annotation below the point
+        xytext = (max_x, max_y / 1.5)
+    else:
+        # Place annotation above the point
+        xytext = (max_x, max_y * 1.5)
+
+    # This makes the graph
+    ax.axhline(y=0, color='k', linestyle='--')
+    ax.plot(x_values, y_values, label="Axial Force Diagram", color='b')
+    ax.annotate(f'Max |Force|: {abs(max_y):.2f} {force_unit}\nat x = {max_x:.2f} {length_unit}',
+                xy=(max_x, max_y), xytext=xytext,
+                arrowprops=dict(facecolor='r', shrink=0.05),
+                fontsize=12, color='r', horizontalalignment='center')
+    ax.set_title("Axial Force Diagram")
+    ax.set_xlabel(f"Position ({length_unit})")
+    ax.set_ylabel(f"Axial Force ({force_unit})")
+    ax.legend(prop={'size': 8})
+    ax.grid(True)
+
+
+# Pre: Accepts inputtedLength, v_forces, initial_shear_force.
+# Post: This plots the shear force diagram based on what the user inputted for vertical forces.
+#       It uses matplotlib for the graph.
+def shear_diagram(ax, inputted_length, v_forces, total_v_forces, dist_loads, unit_system,
+                  samples=None):
+    length_unit = 'm' if unit_system == 'metric' else 'ft'
+    force_unit = 'N' if unit_system == 'metric' else 'lb'
+
+    if samples is None:
+        samples = sample_shear_diagram(inputted_length, total_v_forces, dist_loads)
+    x_values = samples['x_values']
+    y_values = samples['values']
+
+    # This plots a vertical line for the point shear forces
+    for force in v_forces:
+        location = force['location']
+        magnitude = force['magnitude']
+        ax.axvline(x=location, linestyle='--',
+                   label=f'Shear Force at {location} {length_unit}, {magnitude} {force_unit}')
+
+    # The reactions of the supports are appended after the vertical forces of the beam
+    for force in total_v_forces[len(v_forces):]:
+        location = force['location']
+        magnitude = force['magnitude']
+        ax.axvline(x=location, linestyle='--', color='blue',
+                   label=f'Vertical Reaction Force at {location} {length_unit}, '
+                         f'{magnitude:.2f} {force_unit}')
+
+    # This plots a vertical line for the start and end of distributed loads
+    for load in dist_loads:
+        start = load['start']
+        end = load['end']
+        function = load['function']
+        ax.axvline(x=start, linestyle='--', color='purple',
+                   label=f'Distributed Load start at {start} {length_unit}, '
+                         f'{function} {force_unit}/{length_unit}')
+        ax.axvline(x=end, linestyle='--', color='purple',
+                   label=f'Distributed Load end at {end} {length_unit}, '
+                         f'{function} {force_unit}/{length_unit}')
+
+    # The maximum absolute value and its x value
+    max_x = samples['max_location']
+    max_y = samples['max_value']
+
+    # Determine the vertical offset direction based on y position relative to the center
+    # This finds whether to orient the annotation above or below the plotted line based on
+    # which one is closest to the center
+    y_range = np.max(y_values) - np.min(y_values)
+    y_center = np.min(y_values) + y_range / 2
+
+    # Calculate the distances for both potential annotation positions
+    distance_above = abs((max_y * 1.5) - y_center)
+    distance_below = abs((max_y / 1.5) - y_center)
+    if distance_below < distance_above:
+        # Place annotation below the point
+        xytext = (max_x, max_y / 1.5)
+    else:
+        # Place annotation above the point
+        xytext = (max_x, max_y * 1.5)
+
+    # This plots the graph
+    ax.plot(x_values, y_values, label="Shear Force Diagram", color='r')
+    ax.axhline(y=0, color='k', linestyle='--')
+    ax.annotate(f'Max |Force|: {abs(max_y):.2f} {force_unit}\nat x = {max_x:.2f} {length_unit}',
+                xy=(max_x, max_y), xytext=xytext,
+                arrowprops=dict(facecolor='red', shrink=0.05),
+                fontsize=12, color='red', horizontalalignment='center')
+    ax.set_title("Shear Force Diagram")
+    ax.set_xlabel(f"Position ({length_unit})")
+    ax.set_ylabel(f"Shear Force ({force_unit})")
+    ax.legend(prop={'size': 8})
+    ax.grid(True)
+
+
+# Pre: Accepts inputtedLength, total_v_forces, moments, and v_forces.
+# Post: This plots the moment diagram based on what the user inputted for vertical forces and
+#       moments. It uses matplotlib for the graph
+def moment_diagram(ax, inputted_length, total_v_forces, moments,
+                   v_forces, dist_loads, unit_system,
+                   samples=None):
+    length_unit = 'm' if unit_system == 'metric' else 'ft'
+    force_unit = 'N' if unit_system == 'metric' else 'lb'
+    moment_unit = 'N*m' if unit_system == 'metric' else 'ft*lb'
+
+    if samples is None:
+        samples = sample_moment_diagram(inputted_length, total_v_forces, moments, dist_loads)
+    x_values = samples['x_values']
+    moment_values = samples['values']
+
+    # This plots a vertical line for the point vertical forces
+    for force in v_forces:
+        location = force['location']
+        magnitude = force['magnitude']
+        ax.axvline(x=location, linestyle='--',
+                   label=f'Shear Force at {location} {length_unit}, '
+                         f'{magnitude} {moment_unit}')
+
+    # The reactions of the supports are appended after the vertical forces of the beam
+    for force in total_v_forces[len(v_forces):]:
+        location = force['location']
+        magnitude = force['magnitude']
+        ax.axvline(x=location, linestyle='--', color='blue',
+                   label=f'Vertical Reaction Force at {location} {length_unit}, '
+                         f'{magnitude:.2f} {force_unit}')
+
+    # This plots a vertical line for the start and end of distributed loads
+    for load in dist_loads:
+        start = load['start']
+        end = load['end']
+        function = load['function']
+        ax.axvline(x=start, linestyle='--', color='purple',
+                   label=f'Distributed Load start at {start} {length_unit}, '
+                         f'{function} {force_unit}/{length_unit}')
+        ax.axvline(x=end, linestyle='--', color='purple',
+                   label=f'Distributed Load end at {end} {length_unit}, '
+                         f'{function} {force_unit}/{length_unit}')
+
+    # This plots a vertical line for the point moments
+    for moment in moments:
+        location = moment['location']
+        magnitude = moment['magnitude']
+        ax.axvline(x=location, linestyle='--', color='red',
+                   label=f'Moment at {location} {length_unit}, '
+                         f'{magnitude} {moment_unit}')
+
+    # The maximum absolute value and its corresponding x value
+    max_x = samples['max_location']
+    max_y = samples['max_value']
+
+    # Determine the vertical offset direction based on y position relative to the center
+    # This finds whether to orient the annotation above or below the plotted line based on
+    # which one is closest to the center
+    y_range = np.max(moment_values) - np.min(moment_values)
+    y_center = np.min(moment_values) + y_range / 2
+
+    # Calculate the distances for both potential annotation positions
+    distance_above = abs((max_y * 1.5) - y_center)
+    distance_below = abs((max_y / 1.5) - y_center)
+    if distance_below < distance_above:
+        # Place annotation below the point
+        xytext = (max_x, max_y / 1.5)
+    else:
+        # Place annotation above the point
+        xytext = (max_x, max_y * 1.5)
+
+    # Label the maximum absolute value
+    ax.annotate(f'Max |Moment|: {abs(max_y):.2f} {moment_unit}\n'
+                f'at x = {max_x:.2f} {length_unit}',
+                xy=(max_x, max_y),
+                xytext=xytext,
+                arrowprops=dict(facecolor='red', shrink=0.05),
+                fontsize=12, color='red',
+                horizontalalignment='center')
+
+    # Plot the moment function
+    ax.axhline(y=0, color='k', linestyle='--')
+    ax.plot(x_values, moment_values, label="Moment Diagram", color='g')
+    ax.set_title("Moment Diagram")
+    ax.set_xlabel(f"Position ({length_unit})")
+    ax.set_ylabel(f"Moment ({moment_unit})")
+    ax.legend(prop={'size': 8})
+    ax.grid(True)
+
+
+# Pre: Takes in h_forces, total_v_forces, moments, and inputtedLength
+# Post: Plots a FBD of the beam otherwise known as the load diagram. This does not consider
+#       loads yet. This is only a 1 dimensional representation
+def load_diagram(ax, total_h_forces, total_v_forces, moments, inputted_length,
+                 scaled_loads, unit_system, dist_loads):
+    from matplotlib.patches import FancyArrowPatch
+
+    length_unit = 'm' if unit_system == 'metric' else 'ft'
+    force_unit = 'N' if unit_system == 'metric' else 'lb'
+    moment_unit = 'N*m' if unit_system == 'metric' else 'ft*lb'
+
+    # Draw the beam
+    ax.plot([0, inputted_length], [0, 0], 'k-', lw=5)
+
+    # The arrows are collected as (x, y, dx, dy) and the point force arrows and distributed
+    # load arrows are each drawn as one quiver at the end. One artist for all of them keeps
+    # the layout and drawing time the same no matter how many arrows there are.
+    force_arrows = []
+    load_arrows = []
+
+    for force in total_v_forces:
+        location = force['location']
+        magnitude = force['magnitude']
+
+        if magnitude < 0:
+            force_arrows.append((location, 0, 0, -1))
+            ax.text(location, -1.2, f"{abs(magnitude):.2f} {force_unit}",
+                    ha='center', va='top', color='b', zorder=2)
+        elif magnitude > 0:
+            force_arrows.append((location, 0, 0, 1))
+            ax.text(location, 1.2, f"{magnitude:.2f} {force_unit}",
+                    ha='center', va='bottom', color='b', zorder=2)
+
+    for force in total_h_forces:
+        location = force['location']
+        magnitude = force['magnitude']
+
+        if magnitude < 0:
+            force_arrows.append((location, 0, -1, 0))
+            ax.text(location - 0.5, -0.2, f"{abs(magnitude):.2f} {force_unit}",
+                    ha='center', color='b', zorder=2)
+        elif magnitude > 0:
+            force_arrows.append((location, 0, 1, 0))
+            ax.text(location + 0.5, -0.2, f"{magnitude:.2f} {force_unit}",
+                    ha='center', color='b', zorder=2)
+
+    # This make the moments
+    for moment in moments:
+        location = moment['location']
+        magnitude = moment['magnitude']
+        start = (location, -0.4)
+        end = (location, 0.4)
+
+        if magnitude > 0:
+            arrow = FancyArrowPatch(start, end,
+                                    connectionstyle=f"arc3,rad=0.4",  # Radius of the curve
+                                    arrowstyle='->',
+                                    mutation_scale=20,  # Size of the arrowhead
+                                    lw=2,  # Line width
+                                    color='blue',  # Arrow color
+                                    zorder=2)
+        elif magnitude < 0:
+            arrow = FancyArrowPatch(start, end,
+                                    connectionstyle=f"arc3,rad=-0.4",  # Radius of the curve
+                                    arrowstyle='->',
+                                    mutation_scale=20,  # Size of the arrowhead
+                                    lw=2,  # Line width
+                                    color='blue',  # Arrow color
+                                    zorder=2)
+
+        # Add the arrow to the plot
+        ax.add_patch(arrow)
+        ax.text(location, 0.5, f"{abs(magnitude):.2f} {moment_unit}",
+                ha='center', va='top', color='b')
+
+    # This creates the dist load graph
+    for load in scaled_loads:
+        start = load['start']
+        end = load['end']
+        function = load['function']
+
+        func = prepare_load(load)['function']
+        x_vals = np.linspace(start, end, 100)
+        y_vals = func(x_vals)
+
+        # Add arrows. The arrows start on the function line and end on the beam (x-axis). There
+        # are 2 arrows per unit of length, but no more than 200 along the whole beam since
+        # closer arrows run together on a long beam.
+        num_arrows = int((end - start) * min(2, 200 / inputted_length))
+        arrow_x_vals = np.linspace(start, end, num_arrows)
+        arrow_y_vals = np.broadcast_to(func(arrow_x_vals), arrow_x_vals.shape)
+        load_arrows += [(x_arrow, y_arrow, 0, -y_arrow)
+                        for x_arrow, y_arrow in zip(arrow_x_vals, arrow_y_vals)]
+
+        ax.plot(x_vals, y_vals, color='red', label=f'{function}')
+
+    # The arrows are in data units (scale_units='xy'), so each one has the same length as
+    # before. The width and heads are a fraction of the axes width, so the heads are the same
+    # size on every beam. minlength=0 leaves out the arrows where the load is 0.
+    if force_arrows:
+        x, y, dx, dy = np.array(force_arrows, dtype=float).T
+        # The point force arrows have a length of 1 plus a head of 0.1 like ax.arrow drew them
+        ax.quiver(x, y, dx * 1.1, dy * 1.1, angles='xy', scale_units='xy', scale=1, color='b',
+                  width=0.002, headwidth=5, headlength=8, headaxislength=7.5, minlength=0,
+                  zorder=2)
+    if load_arrows:
+        x, y, dx, dy = np.array(load_arrows, dtype=float).T
+        ax.quiver(x, y, dx, dy, angles='xy', scale_units='xy', scale=1, color='red',
+                  width=0.0015, headwidth=4, headlength=4, headaxislength=3.5, minlength=0,
+                  zorder=3)
+
+    # This labels the dist load function
+    for load in dist_loads:
+        start = load['start']
+        end = load['end']
+        function = load['function']
+
+        # Distributed load annotations
+        midpoint = (start + end) / 2
+        function_text = f"Function: w(x) = {function.evalf(4)} {force_unit}/{length_unit}"
+        ax.text(midpoint, 2.1, function_text, ha='center', va='bottom', color='red', fontsize=12)
+
+    ax.set_xlim(-0.5, inputted_length + 0.5)
+    ax.set_ylim(-2.5, 2.5)
+    ax.set_aspect('auto')
+    ax.set_xlabel(f'Length of Beam ({length_unit})')
+    ax.set_title('Load Diagram')
+
+    # Hide the y-axis
+    ax.get_yaxis().set_visible(False)
+
+    ax.grid(True)
+
+
+# Pre: Accepts a beam dictionary from prompt_beam_definition or validate_beam_definition
+# Post: This solves the reaction forces with the direct stiffness method and samples the axial,
+#       shear, and moment diagrams without plotting anything, so matplotlib is never imported.
+#       If the beam has an EI, the slope and deflection diagrams are sampled too. It returns a
+#       dictionary with the reactions, the total forces and moments on the beam, and the
+#       samples of each diagram.
+def analyze_beam(beam):
+    inputted_length = beam['inputted_length']
+
+    dist_loads = prepare_loads(beam['dist_loads'])
+    # This stores the return list for the distributed loads after they are prepared
+
+    solution = solve_support_reactions(beam)
+    # This stores the movements of the nodes and the reactions of the supports
+
+    totals = beam_totals(beam, solution)
+    total_h_forces = totals['total_h_forces']
+    total_v_forces = totals['total_v_forces']
+    moments = totals['moments']
+
+    analysis = {'reactions': totals['reactions'],
+                'total_h_forces': total_h_forces,
+                'total_v_forces': total_v_forces,
+                'moments': moments,
+                'axial': sample_axial_diagram(inputted_length, total_h_forces),
+                'shear': sample_shear_diagram(inputted_length, total_v_forces, dist_loads),
+                'moment': sample_moment_diagram(inputted_length, total_v_forces,
+                                                moments, dist_loads)}
+
+    # The slope and deflection are only found if the EI of the beam was given
+    if beam['stiffness'] is not None:
+        model = singularity_model(total_v_forces, moments, dist_loads)
+        events = shear_moment_events(total_v_forces, moments, dist_loads)
+        curve = support_curve(
+            elastic_curve(model, beam['stiffness'], inputted_length, events),
+            beam['supports'])
+        analysis['slope'] = sample_slope_diagram(inputted_length, curve, events)
+        analysis['deflection'] = sample_deflection_diagram(inputted_length, curve, events)
+
+    return analysis
+
+
+# Pre: Accepts the path of the cache database, or None to not use the cache
+# Post: This opens the result cache for this beam script. The results are stored under the
+#       version of the script and of beam_engine, so checkouts that share a cache do not read
+#       each other's results. None is returned if there is no path or the cache cannot be
+#       opened, and the beams are then analyzed without it.
+def open_result_cache(cache_path):
+    if cache_path is None:
+        return None
+    import result_cache
+    script_path = os.path.abspath(__file__)
+    try:
+        return result_cache.open_cache(
+            cache_path, beam_type=os.path.splitext(os.path.basename(script_path))[0],
+            version=result_cache.engine_version(script_path, beam_engine.__file__))
+    except result_cache.CACHE_ERRORS as error:
+        print(f"Could not open the result cache {cache_path}: {error}", file=sys.stderr)
+        return None
+
+
+# Pre: Accepts a beam dictionary and a cache from open_result_cache (or None)
+# Post: This returns the analysis of the beam from the cache if the same beam was analyzed
+#       before, and otherwise analyzes it with analyze_beam and stores the analysis in the
+#       cache. The beam is looked up before any load is integrated or any reaction is solved.
+#       The prepared loads are stored with the analysis and put back on the loads of a beam
+#       that is read back, so plotting and exporting it do not integrate the loads either.
+def cached_analyze_beam(beam, cache=None):
+    if cache is None:
+        return analyze_beam(beam)
+    import result_cache
+    key = result_cache.beam_key(cache['beam_type'], cache['version'], beam)
+    analysis = result_cache.cache_get(cache, key)
+    if analysis is None:
+        analysis = analyze_beam(beam)
+        analysis['loads'] = [prepared_load_record(load) for load in beam['dist_loads']]
+        result_cache.cache_put(cache, key, analysis)
+    else:
+        for load, record in zip(beam['dist_loads'], analysis['loads']):
+            restore_prepared_load(load, record)
+    return analysis
+
+
+# Pre: Accepts a beam dictionary and the dictionary from analyze_beam
+# Post: This plots the load diagram and the axial, shear, and moment diagrams from the samples
+#       that were already computed. matplotlib is only imported once plotting is requested.
+#       It returns the figure of the load diagram, the figure of the other diagrams, and the
+#       figure of the slope and deflection diagrams (None if the beam does not have an EI).
+def plot_beam(beam, analysis):
+    import matplotlib.pyplot as plt
+
+    unit_system = beam['unit_system']
+    inputted_length = beam['inputted_length']
+    h_forces = beam['h_forces']
+    v_forces = beam['v_forces']
+    dist_loads = beam['dist_loads']
+    total_h_forces = analysis['total_h_forces']
+    total_v_forces = analysis['total_v_forces']
+    moments = analysis['moments']
+
+    scaled_loads = scale_functions(dist_loads)
+    # stores the scaled functions
+
+    load_fig, ax = plt.subplots(figsize=(12, 16))
+    load_diagram(ax, total_h_forces, total_v_forces, moments, inputted_length,
+                 scaled_loads, unit_system, dist_loads)
+
+    if h_forces == []:
+        diagram_fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 12))
+        shear_diagram(ax1, inputted_length, v_forces, total_v_forces, dist_loads, unit_system,
+                      samples=analysis['shear'])
+        moment_diagram(ax2, inputted_length, total_v_forces, moments,
+                       v_forces, dist_loads, unit_system, samples=analysis['moment'])
+    # This only prints out the shear and moment graph if there are no axial forces.
+    # If there are axial forces, all three graphs will be graphed
+    else:
+        diagram_fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(12, 16))
+        axial_diagram(ax1, inputted_length, h_forces, total_h_forces, unit_system,
+                      samples=analysis['axial'])
+        shear_diagram(ax2, inputted_length, v_forces, total_v_forces, dist_loads, unit_system,
+                      samples=analysis['shear'])
+        moment_diagram(ax3, inputted_length, total_v_forces, moments,
+                       v_forces, dist_loads, unit_system, samples=analysis['moment'])
+
+    # This avoids overlapping of text
+    with stage_timing.stage('tight_layout'):
+        plt.tight_layout(pad=3.0)
+
+    deflection_fig = None
+    if 'deflection' in analysis:
+        deflection_fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 12))
+        slope_diagram(ax1, inputted_length, beam['stiffness'], unit_system,
+                      samples=analysis['slope'])
+        deflection_diagram(ax2, inputted_length, beam['stiffness'], unit_system,
+                           samples=analysis['deflection'])
+        with stage_timing.stage('tight_layout'):
+            plt.tight_layout(pad=3.0)
+
+    return load_fig, diagram_fig, deflection_fig
+
+
+# Pre: Accepts a beam dictionary, the folder to save the images in, the name that starts each
+#      file name, the file formats ("png", "svg", and/or "pdf"), and a cache from
+#      open_result_cache (or None)
+# Post: This plots the beam with the non-interactive Agg backend and saves the load diagram
+#       and the axial, shear, and moment diagrams in every format. The figures are closed
+#       afterwards and the paths of the saved files are returned.
+def render_beam(beam, output_directory, file_name, formats=('png',), cache=None):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    analysis = cached_analyze_beam(beam, cache)
+    load_fig, diagram_fig, deflection_fig = plot_beam(beam, analysis)
+
+    figures = [(load_fig, 'load'), (diagram_fig, 'diagrams')]
+    if deflection_fig is not None:
+        figures.append((deflection_fig, 'deflection'))
+    saved_files = save_figures(figures, output_directory, file_name, formats)
+
+    for figure, _ in figures:
+        plt.close(figure)
+    return saved_files
+
+
+# Pre: Accepts the path of a beam definition file, the output folder, the file formats, and
+#      the path of the result cache (or None to not use it)
+# Post: This loads one beam file and renders it with render_beam. The images are named after
+#       the beam file. This is what each worker process of render_beam_files runs, so each
+#       process opens its own connection to the cache.
+def render_beam_file(beam_file, output_directory, formats, cache_path=None):
+    beam = load_beam_definition(beam_file)
+    file_name = os.path.splitext(os.path.basename(beam_file))[0]
+    cache = open_result_cache(cache_path)
+    try:
+        return render_beam(beam, output_directory, file_name, formats, cache)
+    finally:
+        if cache is not None:
+            import result_cache
+            result_cache.close_cache(cache)
+
+
+# Pre: Accepts a list of beam definition files, the output folder, the file formats, the
+#      number of worker processes (every CPU is used when it is None), and the path of the
+#      result cache (or None to not use it)
+# Post: This renders every beam file across a pool of processes. Processes are used instead of
+#       threads because matplotlib is not thread-safe. It returns a dictionary with the list
+#       of saved files for each beam file, or the error if that beam could not be rendered.
+def render_beam_files(beam_files, output_directory, formats=('png',), max_workers=None,
+                      cache_path=None):
+    render_results = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {beam_file: executor.submit(render_beam_file, beam_file, output_directory,
+                                              tuple(formats), cache_path)
+                   for beam_file in beam_files}
+        for beam_file, future in futures.items():
+            try:
+                render_results[beam_file] = future.result()
+            except Exception as error:
+                # One bad beam should not stop the rest of the batch
+                render_results[beam_file] = error
+
+    return render_results
+
+
+# Pre: Accepts nothing.
+# Post: This prompts the user for the whole beam and returns it as a dictionary in the same
+#       form as validate_beam_definition.
+def prompt_beam_definition():
+    unit_system = unit_system_type()
+    inputted_length = beam_length()  # This stores the return value for the length of the beam
+
+    supports = support_locations_input(inputted_length)
+
+    h_forces = point_horizontal_forces(inputted_length)  # This stores the return list for
+    # the horizontal forces.
+
+    v_forces = point_vertical_forces(inputted_length)  # This stores the return list for
+    # the vertical forces.
+
+    moments = point_moments(inputted_length)
+    # This stores the return list for the moments.
+
+    dist_loads = distributed_load(inputted_length)
+    # This stores the return list for the distributed loads
+
+    stiffness = section_stiffness(inputted_length)
+
+    return {'unit_system': unit_system,
+            'inputted_length': inputted_length,
+            'supports': supports,
+            'h_forces': h_forces,
+            'v_forces': v_forces,
+            'moments': moments,
+            'dist_loads': dist_loads,
+            'stiffness': stiffness,
+            'axial_stiffness': 1.0}
+
+
+# Pre: Accepts a list of command line arguments (sys.argv is used when it is None)
+# Post: This returns the parsed arguments.
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Generates the load, axial, shear, and moment diagrams of"
+                    " a continuous beam.")
+    parser.add_argument('beam_files', nargs='*',
+                        help="JSON or TOML beam definition files. The beam is entered "
+                             "with prompts if these are left out.")
+    output_mode = parser.add_mutually_exclusive_group()
+    output_mode.add_argument('--compute-only', action='store_true',
+                             help="only print the reactions and the max |value| of each "
+                                  "diagram as JSON. Nothing is plotted and matplotlib is "
+                                  "not imported.")
+    output_mode.add_argument('--output-dir',
+                             help="save the diagrams to files in this folder instead of "
+                                  "showing them. Several beam files are rendered in parallel.")
+    output_mode.add_argument('--export', choices=['csv', 'ndjson'],
+                             help="stream the axial force, shear force, and moment at evenly "
+                                  "spaced points along the beam to stdout as CSV or NDJSON "
+                                  "rows. Nothing is plotted.")
+    parser.add_argument('--export-points', type=int, default=10001,
+                        help="number of evenly spaced points used for --export, not counting "
+                             "the breakpoints (default: 10001)")
+    parser.add_argument('--format', dest='formats', nargs='+', default=['png'],
+                        choices=['png', 'svg', 'pdf'],
+                        help="file formats used with --output-dir (default: png)")
+    parser.add_argument('--workers', type=int,
+                        help="number of processes used to render beam files "
+                             "(default: one per CPU)")
+    parser.add_argument('--cache', action='store_true',
+                        help="read the results of beams that were analyzed before from the "
+                             "result cache and store the results of new beams in it")
+    parser.add_argument('--cache-path',
+                        help="SQLite file of the result cache, which also turns on --cache "
+                             "(default: results.sqlite in the user's cache folder)")
+    parser.add_argument('--timing', action='store_true',
+                        help="print the wall time and number of calls of each stage (input, "
+                             "sympify, integrate, reaction solve, each diagram, tight_layout, "
+                             "render, ...) to stderr when the program ends. The BEAM_TIMING "
+                             "environment variable turns this on too.")
+    parser.add_argument('--timing-format', choices=['table', 'json'],
+                        help="print the timing summary as a table or as JSON (default: table)")
+    parser.add_argument('--profile-stage', metavar='STAGE',
+                        help="also run this stage (like \"reaction solve\") under cProfile and "
+                             "save the profile to --profile-output")
+    parser.add_argument('--profile-output', metavar='FILE',
+                        help="file the profile of --profile-stage is saved to (default: the "
+                             "name of the stage with .prof)")
+    arguments = parser.parse_args(argv)
+
+    if arguments.export_points < 2:
+        parser.error("--export-points must be at least 2")
+    return arguments
+
+
+# Pre: Accepts a list of command line arguments (sys.argv is used when it is None)
+# Post: This parses the arguments and runs the beams with run_beams. With --timing the stages
+#       are timed for this run only and the summary is printed when it ends.
+def main(argv=None):
+    arguments = parse_arguments(argv)
+    # The shared functions call each other inside beam_engine, so it is timed too
+    with stage_timing.timed_run([globals(), vars(beam_engine)], TIMED_STAGES, arguments.timing,
+                                arguments.timing_format, arguments.profile_stage,
+                                arguments.profile_output):
+        return run_beams(arguments)
+
+
+# Pre: Accepts the command line arguments from parse_arguments
+# Post: This reads the beams from the beam definition files if any are given and prompts the
+#       user for one otherwise. The reaction forces are then solved and the diagrams are shown
+#       or saved to files, or only the results are printed in compute only mode.
+def run_beams(arguments):
+    # Beams that were analyzed before are read back from the result cache if it is turned on
+    cache_path = None
+    if arguments.cache or arguments.cache_path is not None:
+        import result_cache
+        cache_path = arguments.cache_path or result_cache.default_cache_path()
+
+    # Beam files that are saved to files are rendered in parallel. They are rendered one by
+    # one in this process when the stages are timed, so the times of every stage are kept.
+    if (arguments.output_dir is not None and arguments.beam_files
+            and not stage_timing.timing_state['enabled']):
+        render_results = render_beam_files(arguments.beam_files, arguments.output_dir,
+                                           arguments.formats, arguments.workers,
+                                           cache_path)
+        failed = False
+        for beam_file, result in render_results.items():
+            if isinstance(result, Exception):
+                print(f"Could not render {beam_file}: {result}")
+                failed = True
+            else:
+                print("\n".join(result))
+        if failed:
+            sys.exit(1)
+        return
+
+    if not arguments.beam_files:
+        beams = {'beam': prompt_beam_definition()}
+    else:
+        beams = {}
+        for beam_file in arguments.beam_files:
+            try:
+                beams[beam_file] = load_beam_definition(beam_file)
+            except (OSError, ValueError) as error:
+                sys.exit(f"Could not load the beam definition file {beam_file}: {error}")
+
+    cache = open_result_cache(cache_path)
+    summaries = {}
+    for beam_index, (beam_name, beam) in enumerate(beams.items()):
+        if arguments.output_dir is not None:
+            file_name = os.path.splitext(os.path.basename(beam_name))[0]
+            print("\n".join(render_beam(beam, arguments.output_dir, file_name,
+                                        arguments.formats, cache)))
+            continue
+
+        try:
+            analysis = cached_analyze_beam(beam, cache)
+        except ValueError as error:
+            sys.exit(f"Could not solve {beam_name}: {error}")
+        if arguments.export is not None:
+            # The beam is only named in each row when there are several beams
+            write_diagram_rows(diagram_chunks(beam, analysis, arguments.export_points),
+                               sys.stdout, arguments.export,
+                               beam_name if len(beams) > 1 else None, beam_index == 0)
+            continue
+        if arguments.compute_only:
+            summaries[beam_name] = summarize_analysis(analysis)
+            continue
+
+        import matplotlib.pyplot as plt
+        plot_beam(beam, analysis)
+        plt.show()
+
+    if cache is not None:
+        import result_cache
+        result_cache.close_cache(cache)
+
+    if arguments.compute_only:
+        # One beam prints its summary and several beams print a summary for each file
+        if len(summaries) == 1:
+            summaries = summaries.popitem()[1]
+        print(json.dumps(summaries, indent=4))
+
+
+if __name__ == "__main__":
+    main()
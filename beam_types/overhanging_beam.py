@@ -7,40 +7,61 @@
 # The graphs are generated based on the external point forces,
 # moments, and distributed loads.
 
+import argparse
+import itertools
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 import sympy as sp
-import matplotlib.pyplot as plt
-from matplotlib.patches import FancyArrowPatch
-from scipy import integrate
-
-
-# Pre: Accepts nothing. Only accepts either the string "metric" or the string "imperial"
-# Post: This prompts the user to input what unit system they will be using
-def unit_system_type():
-    while True:
-        unit_system = input('Please input the unit system you need '
-                            '(Enter "metric" or "imperial"): ').strip().lower()
-        if unit_system not in ["metric", "imperial"]:
-            print("Invalid input. Please try again.")
-        else:
-            return unit_system
-
-
-# Pre: Accepts nothing. Only accepts positive numbers and will reprompt the user if
-#      they enter anything else
-# Post: This prompts the user to input the length of the beam and then returns the length as a
-# #     float value.
-def beam_length():
-    print()
-    while True:
-        try:
-            inputted_length = float(input("Please input the length of the beam: "))
-            if inputted_length <= 0:
-                print("Invalid input. Length must be a positive number.")
-            else:
-                return inputted_length
-        except ValueError:
-            print("Invalid input. Please input only a number.")
+# matplotlib and scipy.integrate are imported inside the functions that use them, so the
+# reactions and diagram values can be computed without loading them (see analyze_beam).
+
+import stage_timing
+
+# The beam types share everything but the reaction solve (see beam_engine)
+import beam_engine
+from beam_engine import (axle_train_definition, beam_length, beam_load_cases, breakpoint_grid,
+    case_beam, combination_definitions, combination_totals, curve_deflection, definition_number,
+    deflection_diagram, diagram_chunks, diagram_extrema, elastic_curve, evaluate_sides,
+    exact_load_integrals, exact_number, find_max_abs, parse_distributed_function, plot_envelopes,
+    plot_influence_lines, point_definitions, prepare_load, prepare_loads, prepared_load_record,
+    read_beam_definition, restore_prepared_load, sample_axial_diagram, sample_deflection_diagram,
+    sample_moment_diagram, sample_shear_diagram, sample_slope_diagram, save_figures,
+    scale_functions, section_stiffness, shear_moment_events, singularity_axial, singularity_model,
+    singularity_moment, singularity_shear, slope_diagram, stiffness_definition, summarize_analysis,
+    summarize_combinations, summarize_envelopes, summarize_influence_lines, unit_system_type,
+    write_diagram_rows)
+
+# The stages that --timing reports and the functions that run them (see stage_timing)
+TIMED_STAGES = {
+    'load_beam_definition': 'input',
+    'prompt_beam_definition': 'input',
+    'parse_distributed_function': 'sympify',
+    'closed_form_antiderivative': 'integrate',
+    'numeric_antiderivative': 'quad',
+    'compile_function': 'lambdify',
+    'solve_reaction_forces': 'reaction solve',
+    'beam_totals': 'total forces',
+    'analyze_beam': 'analysis',
+    'sample_axial_diagram': 'axial diagram',
+    'sample_shear_diagram': 'shear diagram',
+    'sample_moment_diagram': 'moment diagram',
+    'elastic_curve': 'elastic curve',
+    'sample_slope_diagram': 'slope diagram',
+    'sample_deflection_diagram': 'deflection diagram',
+    'plot_beam': 'plot',
+    'scale_functions': 'scale loads',
+    'load_diagram': 'load plot',
+    'axial_diagram': 'axial plot',
+    'shear_diagram': 'shear plot',
+    'moment_diagram': 'moment plot',
+    'slope_diagram': 'slope plot',
+    'deflection_diagram': 'deflection plot',
+    'save_figures': 'render'}
 
 
 # Pre: This takes in inputted_length
@@ -66,6 +87,8 @@ def support_locations_input(inputted_length):
             pin_position = float(input("Please input the location of the pin support: "))
             if pin_position < 0 or pin_position > inputted_length:
                 print("Invalid input. The pin must be along the beam.")
+            elif pin_position == support_locations[0]:
+                print("Invalid input. The pin cannot be at the same location as the roller.")
             else:
                 support_locations.append(pin_position)
                 break
@@ -246,21 +269,9 @@ def distributed_load(inputted_length):
         try:
             print("Please input the distributed load function in a format"
                   " that matplotlib will be able to graph")
-            x = sp.symbols('x')
             user_function_input = input("Enter the function: ")
-            user_function = sp.sympify(user_function_input)
-
-            # Check if the function is a valid expression and can be evaluated
-            if not isinstance(user_function, (sp.Basic, float, int)):
-                raise ValueError
-
-            # Attempt to evaluate the function at some points to see if it's graphable
-            test_point = (start_location + end_location) / 2
-            evaluated_function = user_function.evalf(subs={x: test_point})
-
-            # Ensure the evaluated function is a number
-            if not isinstance(evaluated_function, (float, int, sp.Float, sp.Integer)):
-                raise ValueError
+            user_function = parse_distributed_function(user_function_input,
+                                                       start_location, end_location)
 
             dist_info = {"start": start_location, "end": end_location, "function": user_function}
             # dist_info is a dictionary that stores the information for the interval
@@ -276,47 +287,151 @@ def distributed_load(inputted_length):
     return dist_loads
 
 
-# Pre: Accepts the inputtedLength, horizontal forces, vertical forces, and point moments
-#      (distributed loads will be programmed later) that the user already inputted
-# Post: This calculates the reaction forces present at the supports and returns an array.
-#       in RREF (which will be easy to extract the reaction values)
-#       Future versions should use the distance between point A and B.
-def solve_reaction_forces(h_forces, v_forces, moments, dist_loads, support_locations):
-    rxn = np.empty(shape=(3, 4))
-    # The following rows are hardcoded as that is always the form this system of equations
-    # will be in. What is missing is the 4th column which will be solved for.
-
+# Pre: Accepts a beam definition as a dictionary (the contents of a JSON or TOML file)
+#      It has "unit_system", "length", and optionally lists of "h_forces", "v_forces",
+#      and "moments" (each with a "location" and "magnitude") and "dist_loads" (each with a
+#      "start", "end", and "function").
+#       "support_locations" is an object with the "roller" and "pin" locations.
+# Post: This checks the definition the same way the prompts check the user input and returns
+#       the beam as a dictionary. A ValueError that explains the problem is raised if anything
+#       is invalid.
+def validate_beam_definition(definition):
+    if not isinstance(definition, dict):
+        raise ValueError("The beam definition must be an object")
+
+    unit_system = str(definition.get('unit_system', '')).strip().lower()
+    if unit_system not in ["metric", "imperial"]:
+        raise ValueError('unit_system must be "metric" or "imperial"')
+
+    inputted_length = definition_number(definition.get('length'), "length")
+    if inputted_length <= 0:
+        raise ValueError("length: Invalid input. Length must be a positive number.")
+
+    supports = definition.get('support_locations')
+    if not isinstance(supports, dict):
+        raise ValueError('support_locations must be an object with "roller" and "pin" locations')
+    roller_position = definition_number(supports.get('roller'), "support_locations roller")
+    if roller_position < 0 or roller_position > inputted_length:
+        raise ValueError("support_locations: The roller must be along the beam.")
+    pin_position = definition_number(supports.get('pin'), "support_locations pin")
+    if pin_position < 0 or pin_position > inputted_length:
+        raise ValueError("support_locations: The pin must be along the beam.")
+    if pin_position == roller_position:
+        raise ValueError("support_locations: The pin cannot be at the same location "
+                         "as the roller.")
+    support_locations = [roller_position, pin_position]
+
+    h_forces = point_definitions(definition.get('h_forces', []), "h_forces", inputted_length)
+    v_forces = point_definitions(definition.get('v_forces', []), "v_forces", inputted_length)
+    moments = point_definitions(definition.get('moments', []), "moments", inputted_length)
+
+    axle_train = None
+    if 'axle_train' in definition:
+        axle_train = axle_train_definition(definition['axle_train'], inputted_length)
+
+    dist_loads = []
+    for index, load in enumerate(definition.get('dist_loads', [])):
+        load_name = f"dist_loads[{index}]"
+        if not isinstance(load, dict):
+            raise ValueError(f"{load_name} must have a start, end, and function")
+        start_location = definition_number(load.get('start'), f"{load_name} start")
+        if not (0 <= start_location <= inputted_length):
+            raise ValueError(f"{load_name}: The location is not in the range of the beam.")
+        end_location = definition_number(load.get('end'), f"{load_name} end")
+        if end_location == start_location:
+            raise ValueError(f"{load_name}: The ending location cannot be the same as the "
+                             f"starting location.")
+        if not (start_location < end_location <= inputted_length):
+            raise ValueError(f"{load_name}: The location is not in the range of the beam or "
+                             f"is before the starting location.")
+        try:
+            user_function = parse_distributed_function(str(load.get('function')),
+                                                       start_location, end_location)
+        except (sp.SympifyError, ValueError):
+            raise ValueError(f"{load_name}: Invalid function. Please enter a valid "
+                             f"mathematical function that matplotlib can graph.") from None
+
+        dist_load = {"start": start_location, "end": end_location, "function": user_function}
+        if 'case' in load:
+            dist_load['case'] = str(load['case'])
+        dist_loads.append(dist_load)
+
+    stiffness = None
+    if 'EI' in definition:
+        stiffness = stiffness_definition(definition['EI'], inputted_length)
+
+    combinations = None
+    if 'combinations' in definition:
+        combinations = combination_definitions(
+            definition['combinations'], beam_load_cases(h_forces, v_forces, moments, dist_loads))
+
+    return {'unit_system': unit_system,
+            'inputted_length': inputted_length,
+            'support_locations': support_locations,
+            'h_forces': h_forces,
+            'v_forces': v_forces,
+            'moments': moments,
+            'dist_loads': dist_loads,
+            'axle_train': axle_train,
+            'stiffness': stiffness,
+            'combinations': combinations}
+
+
+# Pre: Accepts the path of a beam definition file. Files ending in .toml are read as TOML
+#      and every other file is read as JSON.
+# Post: This reads and validates the file and returns the beam as a dictionary.
+def load_beam_definition(file_path):
+    return validate_beam_definition(read_beam_definition(file_path))
+
+
+# Pre: Accepts support_locations
+# Post: This returns the left hand side of the system of equations for the reaction forces.
+#       The rows are hardcoded as that is always the form this system of equations will be in,
+#       so the same rows are reused for every load case on the beam.
+def reaction_lhs(support_locations, exact=False):
+    number = exact_number if exact else float
+    # number converts every value to an exact sympy number or to a float
     roller_location = support_locations[0]
     pin_location = support_locations[1]
     # support_location[0] is where the ROLLER support is located
     # support_location[1] is where the PIN support is located
 
-    row1_h = [1, 0, 0, 0]
-    row2_v = [0, 1, 1, 0]
-    row3_m = [0, roller_location, pin_location, 0]
+    row1_h = [1, 0, 0]
+    row2_v = [0, 1, 1]
+    row3_m = [0, number(roller_location), number(pin_location)]
+
+    return [row1_h, row2_v, row3_m]
+
+
+# Pre: Accepts the horizontal forces, vertical forces, point moments, and distributed loads
+# Post: This returns the right hand side (the 4th column) of the system of equations for the
+#       reaction forces. The sums are moved to the other side of the equations so their signs
+#       are flipped.
+def reaction_rhs(h_forces, v_forces, moments, dist_loads, exact=False):
+    number = exact_number if exact else float
+    # number converts every value to an exact sympy number or to a float
 
     # This finds the sum of the inputted horizontal forces and then flips the sign to
     # allow it to be inputted as the solution to the system of equations.
     h_sum = 0
     for force in h_forces:
-        h_sum += force['magnitude']
-    row1_h[3] = -h_sum
+        h_sum += number(force['magnitude'])
 
     # This finds the sum of the inputted vertical forces and then flips the sign to
     # allow it to be inputted as the solution to the system of equations.
     v_sum = 0
     for force in v_forces:
-        v_sum += force['magnitude']
+        v_sum += number(force['magnitude'])
 
     # This finds the sum of the inputted point moments
     m_sum = 0
     for moment in moments:
-        m_sum += moment['magnitude']
+        m_sum += number(moment['magnitude'])
 
     # This finds the moment about the LEFT most side of the beam
     force_cross_distance_sum = 0
     for f_x_d in v_forces:
-        force_cross_distance_sum += f_x_d['location'] * f_x_d['magnitude']
+        force_cross_distance_sum += number(f_x_d['location']) * number(f_x_d['magnitude'])
     total_moment = -m_sum - force_cross_distance_sum
     #  We add this together to find the total_moment
     #  They must be negative because they are moved
@@ -324,35 +439,100 @@ def solve_reaction_forces(h_forces, v_forces, moments, dist_loads, support_locat
 
     # This finds the vertical effect that the distributed loads have on the system.
     # They must be integrated one at a time and then added to the same row as the vertical forces
-    x = sp.symbols('x')
     dist_v_sum = 0
     for load in dist_loads:
-        dist_v_sum += sp.integrate(load['function'],
-                                  (x, load['start'], load['end']))
-    row2_v[3] = -v_sum + dist_v_sum
+        if exact:
+            dist_v_sum += exact_load_integrals(load)['resultant']
+        else:
+            dist_v_sum += prepare_load(load)['resultant']
 
     # This finds the moment effect that the distributed loads have about point A
     dist_m_sum = 0
     for load in dist_loads:
-        dist_m_sum += sp.integrate(load['function'] * x,
-                                   (x, load['start'], load['end']))
+        if exact:
+            dist_m_sum += exact_load_integrals(load)['first_moment']
+        else:
+            dist_m_sum += prepare_load(load)['first_moment']
     total_moment += dist_m_sum
-    row3_m[3] = total_moment
+
+    return [-h_sum, -v_sum + dist_v_sum, total_moment]
+
+
+# Pre: Accepts the inputtedLength, horizontal forces, vertical forces, and point moments
+#      (distributed loads will be programmed later) that the user already inputted
+# Post: This calculates the reaction forces present at the supports and returns an array.
+#       in RREF (which will be easy to extract the reaction values)
+#       The system is solved in float64 with numpy. If exact is True, it is solved with sympy
+#       using exact fractions instead and the array holds sympy numbers.
+#       Future versions should use the distance between point A and B.
+def solve_reaction_forces(h_forces, v_forces, moments, dist_loads, support_locations,
+                          exact=False):
+    rxn = np.empty(shape=(3, 4))
+    # The left hand side rows are always in the same form. What is missing is the 4th column
+    # which comes from the forces on the beam.
+    row1_h, row2_v, row3_m = reaction_lhs(support_locations, exact)
+    h_rhs, v_rhs, m_rhs = reaction_rhs(h_forces, v_forces, moments, dist_loads, exact)
+    row1_h.append(h_rhs)
+    row2_v.append(v_rhs)
+    row3_m.append(m_rhs)
+
+    if exact:
+        # Convert to a sympy Matrix of exact numbers and then to RREF
+        rxn_RREF = sp.Matrix([row1_h, row2_v, row3_m]).rref()[0]
+        return np.array(rxn_RREF.tolist(), dtype=object)
 
     rxn[0] = row1_h
     rxn[1] = row2_v
     rxn[2] = row3_m
 
-    # Convert to sympy Matrix
-    A = sp.Matrix(rxn)
+    # The first 3 columns are the coefficients of the reactions and the 4th column is the
+    # solution. Solving the system in float64 and placing the reactions next to the identity
+    # matrix gives the same array as the RREF, without rounding the reactions.
+    reactions = np.linalg.solve(rxn[:, :3], rxn[:, 3])
+    rxn_RREF_array = np.column_stack((np.eye(3), reactions))
 
-    # Convert to RREF
-    rxn_RREF = A.rref()[0]
+    return rxn_RREF_array
 
-    # Convert the sympy Matrix to a numpy array
-    rxn_RREF_array = np.array(rxn_RREF.evalf(4).tolist())
 
-    return rxn_RREF_array
+# Pre: Accepts a list of load cases. Each load case is a tuple of
+#      (h_forces, v_forces, moments, dist_loads) on the same beam.
+# Post: This stacks the right hand side of every load case into an (N, 3) array so that all
+#       of them can be solved at once by solve_reaction_forces_batch.
+def stack_load_cases(load_cases):
+    stacked_rhs = [reaction_rhs(h_forces, v_forces, moments, dist_loads)
+                   for h_forces, v_forces, moments, dist_loads in load_cases]
+    return np.array(stacked_rhs, dtype=float).reshape(-1, 3)
+
+
+# Pre: Accepts (N, k) arrays of vertical point force locations and magnitudes, where each row is
+#      one load case with k forces. Horizontal forces and point moments are optional (N, k)
+#      arrays of magnitudes.
+# Post: This builds the same (N, 3) right hand sides as stack_load_cases using only array
+#       operations, which is much faster for thousands of point load cases.
+def stack_point_load_cases(v_locations, v_magnitudes, h_magnitudes=None, m_magnitudes=None):
+    v_locations = np.atleast_2d(np.asarray(v_locations, dtype=float))
+    v_magnitudes = np.atleast_2d(np.asarray(v_magnitudes, dtype=float))
+    stacked_rhs = np.zeros((v_magnitudes.shape[0], 3))
+
+    if h_magnitudes is not None:
+        stacked_rhs[:, 0] = -np.atleast_2d(h_magnitudes).sum(axis=1)
+    stacked_rhs[:, 1] = -v_magnitudes.sum(axis=1)
+    stacked_rhs[:, 2] = -(v_locations * v_magnitudes).sum(axis=1)
+    if m_magnitudes is not None:
+        stacked_rhs[:, 2] -= np.atleast_2d(m_magnitudes).sum(axis=1)
+
+    return stacked_rhs
+
+
+# Pre: Accepts the stacked right hand sides of many load cases on this beam from
+#      stack_load_cases or stack_point_load_cases, and support_locations
+# Post: This solves the reaction forces of every load case with one np.linalg.solve call that
+#       reuses the fixed left hand side. It returns an (N, 3) array where each row holds
+#       pin_x, the roller reaction, and pin_y for one load case.
+def solve_reaction_forces_batch(stacked_rhs, support_locations):
+    lhs = np.array(reaction_lhs(support_locations), dtype=float)
+    stacked_rhs = np.asarray(stacked_rhs, dtype=float).reshape(-1, 3)
+    return np.linalg.solve(lhs, stacked_rhs.T).T
 
 
 # Pre: This accepts the array from solveReactionForces
@@ -411,71 +591,31 @@ def find_total_v_forces(v_forces, roller_rxn, support_locations, pin_y):
     return total_v_forces
 
 
-# Pre: Accepts variable x, h_forces, initial_axial_force
-# Post: This calculates the axial force at all points of x so that it can be plotted
-def axial_force_at_point(x, total_h_forces):
-    h = 0
-    for force in total_h_forces:
-        if x >= force["location"]:
-            h -= force["magnitude"]
-
-    return h
-
-
-# Pre: Accepts variable x, v_forces, initial_shear_force
-# Post: This calculates the shear force at all points of x so that it can be plotted
-def shear_force_at_point(x, total_v_forces, dist_loads):
-    V = 0
-    for force in total_v_forces:
-        if x >= force['location']:
-            V += force['magnitude']
-
-    # This was the previous version to handle constant functions only. I kept it
-    # as it is easy to understand and it can be a reference
-    # for load in dist_loads:
-    #     if load['start'] <= x <= load['end']:
-    #         V += -load['function'] * (x - load['start'])
-    #     elif x > load['end']:
-    #         V += -load['function'] * (load['end'] - load['start'])
-
-    # This evaluates the function for each value of x
-    for load in dist_loads:
-        load_function = sp.lambdify(sp.symbols('x'), load['function'], modules='numpy')
-        if load['start'] <= x <= load['end']:
-            V += -integrate.quad(load_function, load['start'], x)[0]
-        elif x > load['end']:
-            V += -integrate.quad(load_function, load['start'], load['end'])[0]
-
-    return V
-
-
-# Pre: Accepts variables x, total_v_forces, and moments.
-# Post: This calculates the vertical force's contribution to the moment at
-#       all points along the beam at position "x".
-#       This returns the moment at all point along the beam with variable "M".
-def moment_at_point(x, total_v_forces, moments):
-    M = 0
-    for force in total_v_forces:
-        if x > force['location']:
-            M += force['magnitude'] * (x - force['location'])
-    for moment in moments:
-        if x > moment['location']:
-            M -= moment['magnitude']
-            # We subtract here because moments do the 'opposite' of what we expect
-    return M
+# Pre: Accepts an elastic curve from elastic_curve and support_locations
+# Post: The deflection is 0 at the roller and at the pin. This sets the slope and deflection
+#       at x = 0 that make both of them 0 (the curve moves by rotation * x + offset) and
+#       returns the curve.
+def support_curve(curve, support_locations):
+    roller_position, pin_position = support_locations
+    roller_deflection = curve_deflection(curve, roller_position)
+    pin_deflection = curve_deflection(curve, pin_position)
+    curve['rotation'] = -(pin_deflection - roller_deflection) / (pin_position - roller_position)
+    curve['offset'] = -roller_deflection - curve['rotation'] * roller_position
+    return curve
 
 
 # Pre: Accepts inputtedLength, v_forces, initial_shear_force.
 # Post: This plots the axial force diagram based on what the user inputted for horizontal forces.
 #       It uses matplotlib for the graph.
-def axial_diagram(ax, inputted_length, h_forces, total_h_forces, unit_system):
+def axial_diagram(ax, inputted_length, h_forces, total_h_forces, unit_system,
+                  samples=None):
     length_unit = 'm' if unit_system == 'metric' else 'ft'
     force_unit = 'N' if unit_system == 'metric' else 'lb'
 
-    x_values = np.linspace(-1e-10, inputted_length, 1000)
-    # -1e-10 is here so that the initial jump is correctly displayed. If we started
-    # at x = 0, there will be no space to plot the initial jump
-    y_values = [axial_force_at_point(x, total_h_forces) for x in x_values]
+    if samples is None:
+        samples = sample_axial_diagram(inputted_length, total_h_forces)
+    x_values = samples['x_values']
+    y_values = samples['values']
 
     # This plots a vertical line for the horizontal point forces
     for force in h_forces:
@@ -489,12 +629,11 @@ def axial_diagram(ax, inputted_length, h_forces, total_h_forces, unit_system):
     location = pin_x['location']
     magnitude = pin_x['magnitude']
     ax.axvline(x=location, linestyle='--', color='red',
-               label=f'Horizontal Reaction Force at {location} m, {magnitude} N')
+               label=f'Horizontal Reaction Force at {location} m, {magnitude:.2f} N')
 
-    # Finds the maximum absolute value and its x value
-    max_index = np.argmax(np.abs(y_values))
-    max_x = x_values[max_index]
-    max_y = y_values[max_index]
+    # The maximum absolute value and its x value
+    max_x = samples['max_location']
+    max_y = samples['max_value']
 
     # Determine the vertical offset direction based on y position relative to the center
     # This finds whether to orient the annotation above or below the plotted line based on
@@ -529,14 +668,15 @@ def axial_diagram(ax, inputted_length, h_forces, total_h_forces, unit_system):
 # Pre: Accepts inputtedLength, v_forces, initial_shear_force.
 # Post: This plots the shear force diagram based on what the user inputted for vertical forces.
 #       It uses matplotlib for the graph.
-def shear_diagram(ax, inputted_length, v_forces, total_v_forces, dist_loads, unit_system):
+def shear_diagram(ax, inputted_length, v_forces, total_v_forces, dist_loads, unit_system,
+                  samples=None):
     length_unit = 'm' if unit_system == 'metric' else 'ft'
     force_unit = 'N' if unit_system == 'metric' else 'lb'
 
-    x_values = np.linspace(-1e-10, inputted_length, 1000)
-    # -1e-10 is here so that the initial jump is correctly displayed. If we started
-    # at x = 0, there will be no space to plot the initial jump
-    y_values = [shear_force_at_point(x, total_v_forces, dist_loads) for x in x_values]
+    if samples is None:
+        samples = sample_shear_diagram(inputted_length, total_v_forces, dist_loads)
+    x_values = samples['x_values']
+    y_values = samples['values']
 
     # This plots a vertical line for the point shear forces
     for force in v_forces:
@@ -551,7 +691,7 @@ def shear_diagram(ax, inputted_length, v_forces, total_v_forces, dist_loads, uni
         location = force['location']
         magnitude = force['magnitude']
         ax.axvline(x=location, linestyle='--', color='blue',
-                   label=f'Vertical Reaction Force at {location} m, {magnitude} N')
+                   label=f'Vertical Reaction Force at {location} m, {magnitude:.2f} N')
 
     # This plots a vertical line for the start and end of distributed loads
     for load in dist_loads:
@@ -565,10 +705,9 @@ def shear_diagram(ax, inputted_length, v_forces, total_v_forces, dist_loads, uni
                    label=f'Distributed Load end at {end} {length_unit}, '
                          f'{function} {force_unit}/{length_unit}')
 
-    # Finds the maximum absolute value and its x value
-    max_index = np.argmax(np.abs(y_values))
-    max_x = x_values[max_index]
-    max_y = y_values[max_index]
+    # The maximum absolute value and its x value
+    max_x = samples['max_location']
+    max_y = samples['max_value']
 
     # Determine the vertical offset direction based on y position relative to the center
     # This finds whether to orient the annotation above or below the plotted line based on
@@ -604,33 +743,24 @@ def shear_diagram(ax, inputted_length, v_forces, total_v_forces, dist_loads, uni
 # Post: This plots the moment diagram based on what the user inputted for vertical forces and
 #       moments. It uses matplotlib for the graph
 def moment_diagram(ax, inputted_length, total_v_forces, moments,
-                   v_forces, dist_loads, unit_system):
+                   v_forces, dist_loads, unit_system,
+                   samples=None):
     length_unit = 'm' if unit_system == 'metric' else 'ft'
     force_unit = 'N' if unit_system == 'metric' else 'lb'
     moment_unit = 'N*m' if unit_system == 'metric' else 'ft*lb'
 
-    x_values = np.linspace(-1e-10, inputted_length, 5000)
-    # -1e-10 is here so that the initial jump is correctly displayed. If we started
-    # at x = 0, there will be no space to plot the initial jump
-    y_values = np.array([shear_force_at_point(x, total_v_forces, dist_loads) for x in x_values])
-
-    # This gets the moment value at every point of x.
-    # The moment diagram is the integral of the shear diagram
-    moment_values = integrate.cumulative_trapezoid(y_values, x_values, initial=0)
-
-    # Include applied moments
-    for moment in moments:
-        if moment['location'] <= inputted_length:
-            idx = np.searchsorted(x_values, moment['location'])
-            moment_values[idx:] -= moment['magnitude']
+    if samples is None:
+        samples = sample_moment_diagram(inputted_length, total_v_forces, moments, dist_loads)
+    x_values = samples['x_values']
+    moment_values = samples['values']
 
     # This plots a vertical line for the point vertical forces
     for force in v_forces:
         location = force['location']
         magnitude = force['magnitude']
-        plt.axvline(x=location, linestyle='--',
-                    label=f'Shear Force at {location} {length_unit}, '
-                          f'{magnitude} {moment_unit}')
+        ax.axvline(x=location, linestyle='--',
+                   label=f'Shear Force at {location} {length_unit}, '
+                         f'{magnitude} {moment_unit}')
 
     # Plot the last two forces (roller and pin reactions)
     # The roller and pin reaction are appended to the end of the dictionary
@@ -638,7 +768,7 @@ def moment_diagram(ax, inputted_length, total_v_forces, moments,
         location = force['location']
         magnitude = force['magnitude']
         ax.axvline(x=location, linestyle='--', color='blue',
-                   label=f'Vertical Reaction Force at {location} m, {magnitude} N')
+                   label=f'Vertical Reaction Force at {location} m, {magnitude:.2f} N')
 
     # This plots a vertical line for the start and end of distributed loads
     for load in dist_loads:
@@ -656,14 +786,13 @@ def moment_diagram(ax, inputted_length, total_v_forces, moments,
     for moment in moments:
         location = moment['location']
         magnitude = moment['magnitude']
-        plt.axvline(x=location, linestyle='--', color='red',
-                    label=f'Moment at {location} {length_unit}, '
-                          f'{magnitude} {moment_unit}')
+        ax.axvline(x=location, linestyle='--', color='red',
+                   label=f'Moment at {location} {length_unit}, '
+                         f'{magnitude} {moment_unit}')
 
-    # Find the maximum absolute value and its corresponding x value
-    max_index = np.argmax(np.abs(moment_values))
-    max_x = x_values[max_index]
-    max_y = moment_values[max_index]
+    # The maximum absolute value and its corresponding x value
+    max_x = samples['max_location']
+    max_y = samples['max_value']
 
     # Determine the vertical offset direction based on y position relative to the center
     # This finds whether to orient the annotation above or below the plotted line based on
@@ -700,55 +829,13 @@ def moment_diagram(ax, inputted_length, total_v_forces, moments,
     ax.grid(True)
 
 
-# Pre: Accepts dist_loads and a variable indicating our desired range for graphing the functions
-#      We want the functions to be between [-2,2] in the y direction
-# Post: Finds the max value that any function reaches and scales all the functions down accordingly
-#       so that all the functions ranges are between [-2,2] while keeping relative heights
-#       the same
-def scale_functions(dist_loads, target_max=2):
-    max_values = []
-
-    if dist_loads == []:
-        scaled_loads = []
-        return scaled_loads
-
-    # Calculate max value for each function
-    for load in dist_loads:
-        start = load['start']
-        end = load['end']
-        function = load['function']
-        x = sp.Symbol('x')
-
-        # If the function is constant, use the value directly
-        if function.is_constant():
-            max_value = float(function)
-        else:
-            # Calculate the maximum value within the given interval
-            func = sp.lambdify(x, function, 'numpy')
-            x_vals = np.linspace(start, end, 100)
-            y_vals = func(x_vals)
-            max_value = max(y_vals)
-
-        max_values.append(max_value)
-
-    global_max = max(max_values)
-    scaling_factor = target_max / global_max
-
-    # Create a new list with scaled functions
-    scaled_loads = []
-    for load in dist_loads:
-        scaled_load = load.copy()
-        scaled_load['function'] = load['function'] * scaling_factor
-        scaled_loads.append(scaled_load)
-
-    return scaled_loads
-
-
 # Pre: Takes in h_forces, total_v_forces, moments, and inputtedLength
 # Post: Plots a FBD of the beam otherwise known as the load diagram. This does not consider
 #       loads yet. This is only a 1 dimensional representation
 def load_diagram(ax, total_h_forces, total_v_forces, moments, inputted_length,
                  scaled_loads, unit_system, dist_loads):
+    from matplotlib.patches import FancyArrowPatch
+
     length_unit = 'm' if unit_system == 'metric' else 'ft'
     force_unit = 'N' if unit_system == 'metric' else 'lb'
     moment_unit = 'N*m' if unit_system == 'metric' else 'ft*lb'
@@ -756,17 +843,23 @@ def load_diagram(ax, total_h_forces, total_v_forces, moments, inputted_length,
     # Draw the beam
     ax.plot([0, inputted_length], [0, 0], 'k-', lw=5)
 
+    # The arrows are collected as (x, y, dx, dy) and the point force arrows and distributed
+    # load arrows are each drawn as one quiver at the end. One artist for all of them keeps
+    # the layout and drawing time the same no matter how many arrows there are.
+    force_arrows = []
+    load_arrows = []
+
     for force in total_v_forces:
         location = force['location']
         magnitude = force['magnitude']
 
         if magnitude < 0:
-            ax.arrow(location, 0, 0, -1, head_width=0.1, head_length=0.1, fc='b', ec='b', zorder=2)
-            ax.text(location, -1.2, f"{abs(magnitude)} {force_unit}",
+            force_arrows.append((location, 0, 0, -1))
+            ax.text(location, -1.2, f"{abs(magnitude):.2f} {force_unit}",
                     ha='center', va='top', color='b', zorder=2)
         elif magnitude > 0:
-            ax.arrow(location, 0, 0, 1, head_width=0.1, head_length=0.1, fc='b', ec='b', zorder=2)
-            ax.text(location, 1.2, f"{magnitude} {force_unit}",
+            force_arrows.append((location, 0, 0, 1))
+            ax.text(location, 1.2, f"{magnitude:.2f} {force_unit}",
                     ha='center', va='bottom', color='b', zorder=2)
 
     for force in total_h_forces:
@@ -774,12 +867,12 @@ def load_diagram(ax, total_h_forces, total_v_forces, moments, inputted_length,
         magnitude = force['magnitude']
 
         if magnitude < 0:
-            ax.arrow(location, 0, -1, 0, head_width=0.1, head_length=0.1, fc='b', ec='b', zorder=2)
-            ax.text(location - 0.5, -0.2, f"{abs(magnitude)} {force_unit}",
+            force_arrows.append((location, 0, -1, 0))
+            ax.text(location - 0.5, -0.2, f"{abs(magnitude):.2f} {force_unit}",
                     ha='center', color='b', zorder=2)
         elif magnitude > 0:
-            ax.arrow(location, 0, 1, 0, head_width=0.1, head_length=0.1, fc='b', ec='b', zorder=2)
-            ax.text(location + 0.5, -0.2, f"{magnitude} {force_unit}",
+            force_arrows.append((location, 0, 1, 0))
+            ax.text(location + 0.5, -0.2, f"{magnitude:.2f} {force_unit}",
                     ha='center', color='b', zorder=2)
 
     # This make the moments
@@ -808,7 +901,7 @@ def load_diagram(ax, total_h_forces, total_v_forces, moments, inputted_length,
 
         # Add the arrow to the plot
         ax.add_patch(arrow)
-        ax.text(location, 0.5, f"{abs(magnitude)} {moment_unit}",
+        ax.text(location, 0.5, f"{abs(magnitude):.2f} {moment_unit}",
                 ha='center', va='top', color='b')
 
     # This creates the dist load graph
@@ -817,29 +910,36 @@ def load_diagram(ax, total_h_forces, total_v_forces, moments, inputted_length,
         end = load['end']
         function = load['function']
 
+        func = prepare_load(load)['function']
         x_vals = np.linspace(start, end, 100)
+        y_vals = func(x_vals)
 
-        if function.is_constant():
-            y_vals = np.full_like(x_vals, float(function))
-        else:
-            x = sp.Symbol('x')
-            func = sp.lambdify(x, function, 'numpy')
-            y_vals = func(x_vals)
-
-        # Add arrows. The arrows start on the function line and end on the beam (x-axis)
-        num_arrows = int((end - start) * 2)
+        # Add arrows. The arrows start on the function line and end on the beam (x-axis). There
+        # are 2 arrows per unit of length, but no more than 200 along the whole beam since
+        # closer arrows run together on a long beam.
+        num_arrows = int((end - start) * min(2, 200 / inputted_length))
         arrow_x_vals = np.linspace(start, end, num_arrows)
-        if function.is_constant():
-            arrow_y_vals = np.full_like(arrow_x_vals, float(function))
-        else:
-            arrow_y_vals = func(arrow_x_vals)
-
-        for x_arrow, y_arrow in zip(arrow_x_vals, arrow_y_vals):
-            ax.annotate('', xy=(x_arrow, 0), xytext=(x_arrow, y_arrow),
-                        arrowprops=dict(arrowstyle='->', color='red', lw=1))
+        arrow_y_vals = np.broadcast_to(func(arrow_x_vals), arrow_x_vals.shape)
+        load_arrows += [(x_arrow, y_arrow, 0, -y_arrow)
+                        for x_arrow, y_arrow in zip(arrow_x_vals, arrow_y_vals)]
 
         ax.plot(x_vals, y_vals, color='red', label=f'{function}')
 
+    # The arrows are in data units (scale_units='xy'), so each one has the same length as
+    # before. The width and heads are a fraction of the axes width, so the heads are the same
+    # size on every beam. minlength=0 leaves out the arrows where the load is 0.
+    if force_arrows:
+        x, y, dx, dy = np.array(force_arrows, dtype=float).T
+        # The point force arrows have a length of 1 plus a head of 0.1 like ax.arrow drew them
+        ax.quiver(x, y, dx * 1.1, dy * 1.1, angles='xy', scale_units='xy', scale=1, color='b',
+                  width=0.002, headwidth=5, headlength=8, headaxislength=7.5, minlength=0,
+                  zorder=2)
+    if load_arrows:
+        x, y, dx, dy = np.array(load_arrows, dtype=float).T
+        ax.quiver(x, y, dx, dy, angles='xy', scale_units='xy', scale=1, color='red',
+                  width=0.0015, headwidth=4, headlength=4, headaxislength=3.5, minlength=0,
+                  zorder=3)
+
     # This labels the dist load function
     for load in dist_loads:
         start = load['start']
@@ -860,65 +960,1095 @@ def load_diagram(ax, total_h_forces, total_v_forces, moments, inputted_length,
     # Hide the y-axis
     ax.get_yaxis().set_visible(False)
 
-    plt.grid(True)
-
+    ax.grid(True)
 
-def main():
-    unit_system = unit_system_type()
-    inputted_length = beam_length()  # This stores the return value for the length of the beam
-    support_locations = support_locations_input(inputted_length)
 
-    h_forces = point_horizontal_forces(inputted_length)  # This stores the return list for
-    # the horizontal forces.
-    
-    v_forces = point_vertical_forces(inputted_length)  # This stores the return list for
-    # the horizontal forces.
-    
-    moments = point_moments(inputted_length)
-    # This stores the return list for the horizontal forces.
-
-    dist_loads = distributed_load(inputted_length)
-    # This stores the return list for the distributed loads
-
-    rxn_RREF_array = solve_reaction_forces(h_forces, v_forces, moments, dist_loads,
-                                           support_locations)
-    # This stores the return list for the solved rxn forces
+# Pre: Accepts a beam dictionary and the array from solve_reaction_forces (or a row of
+#      solve_reaction_forces_batch in the same form)
+# Post: This reads the reactions out of the array and adds them to the forces of the beam. It
+#       returns a dictionary with the reactions and the total forces and moments on the beam.
+def beam_totals(beam, rxn_RREF_array):
+    support_locations = beam['support_locations']
 
     roller_rxn = find_roller_rxn(rxn_RREF_array)
     pin_x = find_pin_x_rxn(rxn_RREF_array)
     pin_y = find_pin_y_rxn(rxn_RREF_array)
 
-    total_v_forces = find_total_v_forces(v_forces, roller_rxn, support_locations, pin_y)
+    total_v_forces = find_total_v_forces(beam['v_forces'], roller_rxn, support_locations, pin_y)
     # This stores the return list for the total vertical forces
 
-    total_h_forces = find_total_h_forces(h_forces, pin_x, support_locations)
+    total_h_forces = find_total_h_forces(beam['h_forces'], pin_x, support_locations)
     # This stores the return list for the total h forces
 
+    return {'reactions': {'pin_x': float(pin_x), 'roller': float(roller_rxn),
+                          'pin_y': float(pin_y)},
+            'total_h_forces': total_h_forces,
+            'total_v_forces': total_v_forces,
+            'moments': beam['moments']}
+
+
+# Pre: Accepts a beam dictionary from prompt_beam_definition or validate_beam_definition
+# Post: This solves the reaction forces and samples the axial, shear, and moment diagrams
+#       without plotting anything, so matplotlib is never imported. If the beam has an EI, the
+#       slope and deflection diagrams are sampled too. It returns a dictionary with the
+#       reactions, the total forces and moments on the beam, and the samples of each diagram.
+def analyze_beam(beam):
+    inputted_length = beam['inputted_length']
+    support_locations = beam['support_locations']
+    h_forces = beam['h_forces']
+    v_forces = beam['v_forces']
+    moments = beam['moments']
+
+    dist_loads = prepare_loads(beam['dist_loads'])
+    # This stores the return list for the distributed loads after they are prepared
+
+    rxn_RREF_array = solve_reaction_forces(h_forces, v_forces, moments, dist_loads,
+                                           support_locations)
+    # This stores the return list for the solved rxn forces
+
+    totals = beam_totals(beam, rxn_RREF_array)
+    total_h_forces = totals['total_h_forces']
+    total_v_forces = totals['total_v_forces']
+    moments = totals['moments']
+
+    analysis = {'reactions': totals['reactions'],
+                'total_h_forces': total_h_forces,
+                'total_v_forces': total_v_forces,
+                'moments': moments,
+                'axial': sample_axial_diagram(inputted_length, total_h_forces),
+                'shear': sample_shear_diagram(inputted_length, total_v_forces, dist_loads),
+                'moment': sample_moment_diagram(inputted_length, total_v_forces,
+                                                moments, dist_loads)}
+
+    # The slope and deflection are only found if the EI of the beam was given
+    if beam.get('stiffness') is not None:
+        model = singularity_model(total_v_forces, moments, dist_loads)
+        events = shear_moment_events(total_v_forces, moments, dist_loads)
+        curve = support_curve(
+            elastic_curve(model, beam['stiffness'], inputted_length, events),
+            support_locations)
+        analysis['slope'] = sample_slope_diagram(inputted_length, curve, events)
+        analysis['deflection'] = sample_deflection_diagram(inputted_length, curve, events)
+
+    return analysis
+
+
+# Pre: Accepts the path of the cache database, or None to not use the cache
+# Post: This opens the result cache for this beam script. The results are stored under the
+#       version of the script and of beam_engine, so checkouts that share a cache do not read
+#       each other's results. None is returned if there is no path or the cache cannot be
+#       opened, and the beams are then analyzed without it.
+def open_result_cache(cache_path):
+    if cache_path is None:
+        return None
+    import result_cache
+    script_path = os.path.abspath(__file__)
+    try:
+        return result_cache.open_cache(
+            cache_path, beam_type=os.path.splitext(os.path.basename(script_path))[0],
+            version=result_cache.engine_version(script_path, beam_engine.__file__))
+    except result_cache.CACHE_ERRORS as error:
+        print(f"Could not open the result cache {cache_path}: {error}", file=sys.stderr)
+        return None
+
+
+# Pre: Accepts a beam dictionary and a cache from open_result_cache (or None)
+# Post: This returns the analysis of the beam from the cache if the same beam was analyzed
+#       before, and otherwise analyzes it with analyze_beam and stores the analysis in the
+#       cache. The beam is looked up before any load is integrated or any reaction is solved.
+#       The prepared loads are stored with the analysis and put back on the loads of a beam
+#       that is read back, so plotting and exporting it do not integrate the loads either.
+def cached_analyze_beam(beam, cache=None):
+    if cache is None:
+        return analyze_beam(beam)
+    import result_cache
+    key = result_cache.beam_key(cache['beam_type'], cache['version'], beam)
+    analysis = result_cache.cache_get(cache, key)
+    if analysis is None:
+        analysis = analyze_beam(beam)
+        analysis['loads'] = [prepared_load_record(load) for load in beam['dist_loads']]
+        result_cache.cache_put(cache, key, analysis)
+    else:
+        for load, record in zip(beam['dist_loads'], analysis['loads']):
+            restore_prepared_load(load, record)
+    return analysis
+
+
+# Pre: Accepts a beam dictionary with "combinations" and the number of points in each piece of
+#      the grid that every case is sampled on
+# Post: This solves every load case once (all of them in one solve_reaction_forces_batch call)
+#       and samples the axial force, shear, and moment of each case on one shared grid. Since
+#       the beam is linear, a combination is the sum of the cases times their factors, so the
+#       factor table (a row for each combination and a column for each case) times the stacked
+#       reactions and diagrams of the cases gives every combination in one matrix product. It
+#       returns the load cases, the combination names, the factor table, the reactions and
+#       diagrams of each combination, the exact extrema of each diagram of every combination
+#       (found on the loads of the combination from combination_totals), and the governing (max
+#       and min) combination at each x.
+def analyze_combinations(beam, points_per_piece=51):
+    inputted_length = beam['inputted_length']
+    load_cases = beam_load_cases(beam['h_forces'], beam['v_forces'], beam['moments'],
+                                 beam['dist_loads'])
+    case_beams = [case_beam(beam, case) for case in load_cases]
+
+    stacked_rhs = stack_load_cases([(case['h_forces'], case['v_forces'], case['moments'],
+                                     prepare_loads(case['dist_loads'])) for case in case_beams])
+    case_reactions = solve_reaction_forces_batch(stacked_rhs, beam['support_locations'])
+    case_totals = [beam_totals(case, np.column_stack((np.eye(3), reactions)))
+                   for case, reactions in zip(case_beams, case_reactions)]
+
+    # The grid has the breakpoints of every case so that no jump of any case is missed
+    event_locations = []
+    for case, totals in zip(case_beams, case_totals):
+        event_locations += [force['location'] for force in totals['total_h_forces']]
+        event_locations += shear_moment_events(totals['total_v_forces'], totals['moments'],
+                                               case['dist_loads'])
+    x_values, left = breakpoint_grid(inputted_length, event_locations, points_per_piece)
+
+    # Each row is one case: its 3 reactions and then its axial force, shear, and moment
+    case_values = []
+    for case, totals in zip(case_beams, case_totals):
+        model = singularity_model(totals['total_v_forces'], totals['moments'],
+                                  case['dist_loads'], totals['total_h_forces'])
+        case_values.append(np.concatenate((
+            list(totals['reactions'].values()),
+            evaluate_sides(lambda x, left=False: singularity_axial(model, x, left),
+                           x_values, left),
+            evaluate_sides(lambda x, left=False: singularity_shear(model, x, left),
+                           x_values, left),
+            evaluate_sides(lambda x, left=False: singularity_moment(model, x, left),
+                           x_values, left))))
+
+    combination_names = list(beam['combinations'])
+    factors = np.array([[beam['combinations'][name].get(case, 0.0) for case in load_cases]
+                        for name in combination_names])
+    combined = factors @ np.array(case_values)
+
+    reaction_names = list(case_totals[0]['reactions'])
+    points = len(x_values)
+    diagrams = {'axial': combined[:, 3:3 + points],
+                'shear': combined[:, 3 + points:3 + 2 * points],
+                'moment': combined[:, 3 + 2 * points:]}
+
+    # The grid can step over the largest value, so the extrema are found exactly like in
+    # analyze_beam
+    extrema = {}
+    for name, case_factors in zip(combination_names, factors):
+        totals = combination_totals(case_beams, case_totals, case_factors)
+        extrema[name] = {
+            'axial': sample_axial_diagram(inputted_length, totals['total_h_forces'])['extrema'],
+            'shear': sample_shear_diagram(inputted_length, totals['total_v_forces'],
+                                          totals['dist_loads'])['extrema'],
+            'moment': sample_moment_diagram(inputted_length, totals['total_v_forces'],
+                                            totals['moments'], totals['dist_loads'])['extrema']}
+
+    governing = {}
+    for diagram, values in diagrams.items():
+        governing[diagram] = {
+            'max': values.max(axis=0),
+            'max_combination': [combination_names[index] for index in values.argmax(axis=0)],
+            'min': values.min(axis=0),
+            'min_combination': [combination_names[index] for index in values.argmin(axis=0)]}
+
+    return {'load_cases': load_cases,
+            'combination_names': combination_names,
+            'factors': factors,
+            'reactions': {name: dict(zip(reaction_names, combined[index, :3].tolist()))
+                          for index, name in enumerate(combination_names)},
+            'x_values': x_values,
+            'diagrams': diagrams,
+            'extrema': extrema,
+            'governing': governing}
+
+
+# Pre: Accepts support_locations and an array of positions for a unit load
+# Post: This solves the reactions for a unit downward load at every position with one
+#       solve_reaction_forces_batch call. It returns a dictionary with the location of each
+#       support and its vertical reaction for every position (the influence line of the
+#       reaction). The horizontal reaction is always 0 for a vertical load so it is left out.
+def influence_reactions(support_locations, load_positions):
+    load_positions = np.asarray(load_positions, dtype=float)
+    stacked_rhs = stack_point_load_cases(load_positions[:, np.newaxis],
+                                         -np.ones((len(load_positions), 1)))
+    reactions = solve_reaction_forces_batch(stacked_rhs, support_locations)
+    return {'roller': {'location': float(support_locations[0]), 'values': reactions[:, 1]},
+            'pin_y': {'location': float(support_locations[1]), 'values': reactions[:, 2]}}
+
+
+# Pre: Accepts support_locations, an array of positions for a unit load, the locations of the
+#      sections to find the shear and moment at, and whether the value just to the left of
+#      each section is wanted (one value for every section or a value for each of them)
+# Post: This finds the influence lines of the reactions and of the shear and moment at every
+#       section for a unit downward load at every position, all in one pass. The shear at a
+#       section is the sum of the forces at or before it, and the moment is the sum of each of
+#       those forces times its distance to the section. The returned dictionary has the load
+#       positions, the reactions from influence_reactions, the section locations, and
+#       (sections, positions) arrays of the shear and moment. For the value to the left of a
+#       section, a support on the section does not count. The unit load on it still does, as
+#       that is the limit of the load coming from the left.
+def influence_lines(support_locations, load_positions, section_locations, left=False):
+    reactions = influence_reactions(support_locations, load_positions)
+    load_positions = np.asarray(load_positions, dtype=float)
+    section_locations = np.atleast_1d(np.asarray(section_locations, dtype=float))
+    sections = section_locations[:, np.newaxis]
+    left = np.broadcast_to(np.asarray(left, dtype=bool), section_locations.shape)[:, np.newaxis]
+
+    # The unit load itself
+    before_section = load_positions <= sections
+    shear = np.where(before_section, -1.0, 0.0)
+    moment = np.where(before_section, -(sections - load_positions), 0.0)
+
+    # The reactions, which change with the position of the unit load
+    for reaction in reactions.values():
+        support_before_section = np.where(left, reaction['location'] < sections,
+                                          reaction['location'] <= sections)
+        shear += np.where(support_before_section, reaction['values'], 0.0)
+        moment += np.where(support_before_section,
+                           reaction['values'] * (sections - reaction['location']), 0.0)
+
+    return {'load_positions': load_positions,
+            'reactions': reactions,
+            'section_locations': section_locations,
+            'shear': shear,
+            'moment': moment}
+
+
+# Pre: Accepts inputted_length, support_locations, the axle train from axle_train_definition,
+#      and the locations of the sections to find the envelopes at
+# Post: This moves the axle train across the beam one step at a time, from the first axle
+#       entering the beam until the last axle or the lane load leaves it, and finds the largest
+#       and smallest shear and moment at every section. The unit load influence lines are found
+#       once on a grid with the step of the train, so an axle is the influence line shifted by
+#       its offset (rounded to the grid) and scaled by its magnitude, and the whole train is the
+#       sum of these shifted lines for every section and train position at once. The lane load
+#       uses prefix sums (running integrals) of the influence lines, so the load under any
+#       stretch of the beam is the difference of two of them. The returned dictionary has the
+#       section locations and, for the shear and moment, the max and min envelope and the
+#       position of the first axle that causes each of them.
+def train_envelopes(inputted_length, support_locations, axle_train, section_locations):
+    inputted_length = float(inputted_length)
+    steps = int(np.ceil(inputted_length / axle_train['step']))
+    step = inputted_length / steps
+    load_positions = np.linspace(0, inputted_length, steps + 1)
+    # The shear is always 0 just past the right end of the beam, so the section there takes the
+    # value just to its left
+    section_locations = np.atleast_1d(np.asarray(section_locations, dtype=float))
+    influence = influence_lines(support_locations, load_positions, section_locations,
+                                section_locations >= inputted_length)
+
+    offsets = np.array([int(round(axle['offset'] / step)) for axle in axle_train['axles']])
+    magnitudes = np.array([axle['magnitude'] for axle in axle_train['axles']])
+    lane_load = axle_train['lane_load']
+    lane_steps = 0 if lane_load is None else int(round(lane_load['length'] / step))
+    train_steps = max(int(np.max(offsets)), lane_steps)
+    # The first axle is at (train position index) * step, from 0 until the whole train is off
+    positions = steps + train_steps + 1
+
+    envelopes = {'section_locations': influence['section_locations']}
+    for diagram in ['shear', 'moment']:
+        # Off the beam the influence lines are 0, so they are padded with 0 on both sides by
+        # the length of the train. Column j of padded is the load position (j - train_steps).
+        padded = np.zeros((len(influence['section_locations']), steps + 1 + 2 * train_steps))
+        padded[:, train_steps:train_steps + steps + 1] = influence[diagram]
+
+        # The influence lines are for a downward unit load (-1), so a force of magnitude P
+        # is -P times the influence line
+        response = np.zeros((padded.shape[0], positions))
+        for offset, magnitude in zip(offsets, magnitudes):
+            first_column = train_steps - offset
+            response -= magnitude * padded[:, first_column:first_column + positions]
+
+        if lane_load is not None:
+            # The running integral only adds up the beam itself. It is 0 before the beam and
+            # stays at the integral of the whole beam after it, so an influence line that is not
+            # 0 at an end of the beam is not ramped down to the padding.
+            on_beam = influence[diagram]
+            sections = influence['section_locations'][:, np.newaxis]
+            if diagram == 'shear':
+                # The unit load makes the shear influence line jump at the section, which the
+                # trapezoids cannot follow. Its part (-1 up to the section) is taken out here
+                # and added back exactly below.
+                on_beam = on_beam + (load_positions <= sections)
+            running_integral = np.zeros_like(padded)
+            running_integral[:, train_steps + 1:train_steps + steps + 1] = np.cumsum(
+                (on_beam[:, 1:] + on_beam[:, :-1]) / 2 * step, axis=1)
+            running_integral[:, train_steps + steps + 1:] = \
+                running_integral[:, train_steps + steps:train_steps + steps + 1]
+            under_lane = (running_integral[:, train_steps:train_steps + positions]
+                          - running_integral[:, train_steps - lane_steps:
+                                             train_steps - lane_steps + positions])
+            if diagram == 'shear':
+                lane_ends = np.arange(positions) * step
+                lane_starts = np.maximum(lane_ends - lane_steps * step, 0.0)
+                under_lane -= np.maximum(np.minimum(lane_ends, sections) - lane_starts, 0.0)
+            response += lane_load['magnitude'] * under_lane
+
+        envelopes[diagram] = {'max': response.max(axis=1),
+                              'min': response.min(axis=1),
+                              'max_position': response.argmax(axis=1) * step,
+                              'min_position': response.argmin(axis=1) * step}
+
+    return envelopes
+
+
+# Pre: Accepts a beam dictionary and the dictionary from analyze_beam
+# Post: This plots the load diagram and the axial, shear, and moment diagrams from the samples
+#       that were already computed. matplotlib is only imported once plotting is requested.
+#       It returns the figure of the load diagram, the figure of the other diagrams, and the
+#       figure of the slope and deflection diagrams (None if the beam does not have an EI).
+def plot_beam(beam, analysis):
+    import matplotlib.pyplot as plt
+
+    unit_system = beam['unit_system']
+    inputted_length = beam['inputted_length']
+    h_forces = beam['h_forces']
+    v_forces = beam['v_forces']
+    dist_loads = beam['dist_loads']
+    total_h_forces = analysis['total_h_forces']
+    total_v_forces = analysis['total_v_forces']
+    moments = analysis['moments']
+
     scaled_loads = scale_functions(dist_loads)
     # stores the scaled functions
 
-    fig, ax = plt.subplots(figsize=(12, 16))
+    load_fig, ax = plt.subplots(figsize=(12, 16))
     load_diagram(ax, total_h_forces, total_v_forces, moments, inputted_length,
                  scaled_loads, unit_system, dist_loads)
 
     if h_forces == []:
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 12))
-        shear_diagram(ax1, inputted_length, v_forces, total_v_forces, dist_loads, unit_system)
+        diagram_fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 12))
+        shear_diagram(ax1, inputted_length, v_forces, total_v_forces, dist_loads, unit_system,
+                      samples=analysis['shear'])
         moment_diagram(ax2, inputted_length, total_v_forces, moments,
-                       v_forces, dist_loads, unit_system)
+                       v_forces, dist_loads, unit_system, samples=analysis['moment'])
     # This only prints out the shear and moment graph if there are no axial forces.
     # If there are axial forces, all three graphs will be graphed
     else:
-        fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(12, 16))
-        axial_diagram(ax1, inputted_length, h_forces, total_h_forces, unit_system)
-        shear_diagram(ax2, inputted_length, v_forces, total_v_forces, dist_loads, unit_system)
+        diagram_fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(12, 16))
+        axial_diagram(ax1, inputted_length, h_forces, total_h_forces, unit_system,
+                      samples=analysis['axial'])
+        shear_diagram(ax2, inputted_length, v_forces, total_v_forces, dist_loads, unit_system,
+                      samples=analysis['shear'])
         moment_diagram(ax3, inputted_length, total_v_forces, moments,
-                       v_forces, dist_loads, unit_system)
+                       v_forces, dist_loads, unit_system, samples=analysis['moment'])
 
     # This avoids overlapping of text
-    plt.tight_layout(pad=3.0)
+    with stage_timing.stage('tight_layout'):
+        plt.tight_layout(pad=3.0)
+
+    deflection_fig = None
+    if 'deflection' in analysis:
+        deflection_fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 12))
+        slope_diagram(ax1, inputted_length, beam['stiffness'], unit_system,
+                      samples=analysis['slope'])
+        deflection_diagram(ax2, inputted_length, beam['stiffness'], unit_system,
+                           samples=analysis['deflection'])
+        with stage_timing.stage('tight_layout'):
+            plt.tight_layout(pad=3.0)
+
+    return load_fig, diagram_fig, deflection_fig
+
+
+# Pre: Accepts a beam dictionary, the folder to save the images in, the name that starts each
+#      file name, the file formats ("png", "svg", and/or "pdf"), and a cache from
+#      open_result_cache (or None)
+# Post: This plots the beam with the non-interactive Agg backend and saves the load diagram
+#       and the axial, shear, and moment diagrams in every format. The figures are closed
+#       afterwards and the paths of the saved files are returned.
+def render_beam(beam, output_directory, file_name, formats=('png',), cache=None):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    analysis = cached_analyze_beam(beam, cache)
+    load_fig, diagram_fig, deflection_fig = plot_beam(beam, analysis)
+
+    figures = [(load_fig, 'load'), (diagram_fig, 'diagrams')]
+    if deflection_fig is not None:
+        figures.append((deflection_fig, 'deflection'))
+    saved_files = save_figures(figures, output_directory, file_name, formats)
+
+    for figure, _ in figures:
+        plt.close(figure)
+    return saved_files
+
+
+# Pre: Accepts the path of a beam definition file, the output folder, the file formats, and
+#      the path of the result cache (or None to not use it)
+# Post: This loads one beam file and renders it with render_beam. The images are named after
+#       the beam file. This is what each worker process of render_beam_files runs, so each
+#       process opens its own connection to the cache.
+def render_beam_file(beam_file, output_directory, formats, cache_path=None):
+    beam = load_beam_definition(beam_file)
+    file_name = os.path.splitext(os.path.basename(beam_file))[0]
+    cache = open_result_cache(cache_path)
+    try:
+        return render_beam(beam, output_directory, file_name, formats, cache)
+    finally:
+        if cache is not None:
+            import result_cache
+            result_cache.close_cache(cache)
+
+
+# Pre: Accepts a list of beam definition files, the output folder, the file formats, the
+#      number of worker processes (every CPU is used when it is None), and the path of the
+#      result cache (or None to not use it)
+# Post: This renders every beam file across a pool of processes. Processes are used instead of
+#       threads because matplotlib is not thread-safe. It returns a dictionary with the list
+#       of saved files for each beam file, or the error if that beam could not be rendered.
+def render_beam_files(beam_files, output_directory, formats=('png',), max_workers=None,
+                      cache_path=None):
+    render_results = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {beam_file: executor.submit(render_beam_file, beam_file, output_directory,
+                                              tuple(formats), cache_path)
+                   for beam_file in beam_files}
+        for beam_file, future in futures.items():
+            try:
+                render_results[beam_file] = future.result()
+            except Exception as error:
+                # One bad beam should not stop the rest of the batch
+                render_results[beam_file] = error
+
+    return render_results
+
+
+# This keeps the beam of a sweep in each worker process (see start_sweep_worker)
+sweep_state = {}
+
+# The columns of the table from sweep_beams. The first 4 are the parameters of each layout.
+sweep_columns = ['inputted_length', 'roller_location', 'pin_location', 'load_scale', 'valid',
+                 'pin_x', 'roller', 'pin_y', 'max_axial_location', 'max_axial',
+                 'max_shear_location', 'max_shear', 'max_moment_location', 'max_moment']
+
+# The JSON header of a sweep result file is padded to a multiple of this many bytes, so the
+# array after it starts on a page boundary
+SWEEP_RESULT_ALIGNMENT = 4096
+
+
+# Pre: Accepts the path of the result file, the lists of lengths, roller locations, pin
+#      locations, and load factors of a sweep, the number of stations along each beam, and the
+#      unit system
+# Post: This writes the header of a sweep result file and makes the file big enough for the
+#       (cases, stations, 3) float64 array of the axial force, shear force, and moment after
+#       it. The header is one line of JSON padded with spaces. The cases are in the order of
+#       the rows of the table from sweep_beams (the load factor changes fastest) and the
+#       stations are evenly spaced from 0 to the length of each beam. The space is not written,
+#       so the file does not take up disk space until the workers fill it in.
+def create_sweep_results(result_path, inputted_lengths, roller_locations, pin_locations,
+                         load_scales, stations, unit_system):
+    parameters = {'inputted_length': inputted_lengths, 'roller_location': roller_locations,
+                  'pin_location': pin_locations, 'load_scale': load_scales}
+    parameters = {name: [float(value) for value in values] for name, values in parameters.items()}
+    cases = math.prod(len(values) for values in parameters.values())
+    header = {'dtype': '<f8', 'shape': [cases, stations, 3], 'values': ['N', 'V', 'M'],
+              'unit_system': unit_system, 'parameters': parameters}
+
+    header_line = json.dumps(header).encode('utf-8')
+    header_size = math.ceil((len(header_line) + 1) / SWEEP_RESULT_ALIGNMENT)
+    header_size *= SWEEP_RESULT_ALIGNMENT
+    with open(result_path, 'wb') as result_file:
+        result_file.write(header_line.ljust(header_size - 1) + b"\n")
+        result_file.truncate(header_size + cases * stations * 3 * 8)
+    return header
+
+
+# Pre: Accepts the path of a file from create_sweep_results and the mode of the memory map ("r"
+#      to read it or "r+" to write to it)
+# Post: This returns the header of the file and a (cases, stations, 3) np.memmap of the axial
+#       force, shear force, and moment of every case at every station. Nothing is read until
+#       it is used, so files much bigger than the memory can be opened. Invalid layouts are NaN.
+def open_sweep_results(result_path, mode='r'):
+    with open(result_path, 'rb') as result_file:
+        header_line = result_file.readline()
+    header = json.loads(header_line)
+    values = np.memmap(result_path, dtype=header['dtype'], mode=mode, offset=len(header_line),
+                       shape=tuple(header['shape']))
+    return header, values
+
+
+# Pre: Accepts a beam dictionary, its analysis from analyze_beam, and an array of x values
+# Post: This returns an (x values, 3) array of the axial force, shear force, and moment at each
+#       x value (the value at it, not just to its left)
+def station_values(beam, analysis, x_values):
+    model = singularity_model(analysis['total_v_forces'], analysis['moments'],
+                              prepare_loads(beam['dist_loads']), analysis['total_h_forces'])
+    return np.column_stack((singularity_axial(model, x_values),
+                            singularity_shear(model, x_values),
+                            singularity_moment(model, x_values)))
+
+
+# Pre: Accepts a beam dictionary and the path of a file from create_sweep_results (or None)
+# Post: This prepares the distributed loads of the beam and keeps it for every sweep_chunk call
+#       in this process. It is the initializer of each worker process of sweep_beams, so the
+#       loads are compiled and integrated once per process instead of once per layout.
+def start_sweep_worker(beam, result_path=None):
+    prepare_loads(beam['dist_loads'])
+    sweep_state['beam'] = beam
+    sweep_state['result_path'] = result_path
+
+
+# Pre: Accepts a beam dictionary, a beam length, and the locations of the roller and the pin
+# Post: This returns a copy of the beam with the new length and supports and without its EI.
+#       None is returned if the supports are at the same place or the supports or a load are
+#       not on the beam.
+def sweep_layout(beam, inputted_length, roller_position, pin_position):
+    if roller_position == pin_position:
+        return None
+
+    locations = [roller_position, pin_position]
+    for name in ['h_forces', 'v_forces', 'moments']:
+        locations += [load['location'] for load in beam[name]]
+    for load in beam['dist_loads']:
+        locations += [load['start'], load['end']]
+    if min(locations) < 0 or max(locations) > inputted_length:
+        return None
+
+    layout = dict(beam)
+    layout['inputted_length'] = inputted_length
+    layout['support_locations'] = [roller_position, pin_position]
+    # The EI pieces end at the old length, and the sweep only reports the reactions and the
+    # axial force, shear, and moment, so the elastic curve is not found
+    layout['stiffness'] = None
+    return layout
+
+
+# Pre: Accepts a list of (length, roller location, pin location) layouts of the beam kept by
+#      start_sweep_worker and the index of the first layout in the sweep
+# Post: This analyzes the beam with every layout and returns an array with a row for each
+#       layout. The row has whether the layout is valid, the 3 reactions, and the location and
+#       value of the max |value| of the axial force, shear, and moment. Rows of invalid
+#       layouts are NaN. If the sweep has a result file, the diagrams of these layouts at its
+#       stations (times each load factor) are written straight into the file by this process.
+def sweep_chunk(layouts, first_layout=0):
+    beam = sweep_state['beam']
+    results = None
+    if sweep_state.get('result_path') is not None:
+        header, results = open_sweep_results(sweep_state['result_path'], 'r+')
+        load_scales = np.array(header['parameters']['load_scale'])[:, np.newaxis, np.newaxis]
+        stations = np.linspace(0, 1, header['shape'][1])
+
+    rows = np.full((len(layouts), 10), np.nan)
+    for index, layout in enumerate(layouts):
+        layout_beam = sweep_layout(beam, *layout)
+        if results is not None:
+            first_case = (first_layout + index) * len(load_scales)
+            cases = slice(first_case, first_case + len(load_scales))
+        if layout_beam is None:
+            rows[index, 0] = 0
+            if results is not None:
+                results[cases] = np.nan
+            continue
+
+        analysis = analyze_beam(layout_beam)
+        if results is not None:
+            results[cases] = load_scales * station_values(
+                layout_beam, analysis, stations * layout_beam['inputted_length'])
+        rows[index, 0] = 1
+        rows[index, 1:4] = list(analysis['reactions'].values())
+        for column, diagram in zip([4, 6, 8], ['axial', 'shear', 'moment']):
+            rows[index, column] = analysis[diagram]['max_location']
+            rows[index, column + 1] = analysis[diagram]['max_value']
+
+    if results is not None:
+        results.flush()
+    return rows
+
+
+# Pre: Accepts a beam dictionary, lists of beam lengths, roller locations, pin locations, and
+#      factors that every load is multiplied by (the value of the beam is used for each one
+#      that is None), the number of worker processes (every CPU is used when it is None), the
+#      number of layouts each worker analyzes at a time, the path of a result file for the
+#      diagrams of every case (or None), and the number of stations along each beam in it
+# Post: This analyzes the beam for every combination of the values (the Cartesian product)
+#       and returns a table as a dictionary with an array for each name in sweep_columns. The
+#       layouts are split into chunks across a pool of processes. Since the beam is linear,
+#       each layout is only analyzed once and the reactions and max values are multiplied by
+#       each load factor (the locations of the max values do not change). A layout is not
+#       valid if its supports are at the same place or a support or load is off the beam.
+#       With a result path the axial force, shear force, and moment at the stations are also
+#       written to a file from create_sweep_results that can be opened with open_sweep_results.
+def sweep_beams(beam, inputted_lengths=None, roller_locations=None, pin_locations=None,
+                load_scales=None, max_workers=None, chunk_size=None, result_path=None,
+                stations=101):
+    if inputted_lengths is None:
+        inputted_lengths = [beam['inputted_length']]
+    if roller_locations is None:
+        roller_locations = [beam['support_locations'][0]]
+    if pin_locations is None:
+        pin_locations = [beam['support_locations'][1]]
+    if load_scales is None:
+        load_scales = [1.0]
+
+    layouts = list(itertools.product(inputted_lengths, roller_locations, pin_locations))
+    if result_path is not None:
+        create_sweep_results(result_path, inputted_lengths, roller_locations, pin_locations,
+                             load_scales, stations, beam['unit_system'])
+    # The prepared loads have compiled functions that cannot be sent to other processes
+    sweep_beam = dict(beam)
+    sweep_beam['dist_loads'] = [{key: value for key, value in load.items() if key != 'prepared'}
+                                for load in beam['dist_loads']]
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if chunk_size is None:
+        # A few chunks per worker keeps every worker busy until the end
+        chunk_size = max(1, math.ceil(len(layouts) / (4 * max_workers)))
+    first_layouts = range(0, len(layouts), chunk_size)
+    chunks = [layouts[index:index + chunk_size] for index in first_layouts]
+
+    if max_workers == 1:
+        start_sweep_worker(sweep_beam, result_path)
+        layout_rows = [sweep_chunk(chunk, index) for chunk, index in zip(chunks, first_layouts)]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=start_sweep_worker,
+                                 initargs=(sweep_beam, result_path)) as executor:
+            layout_rows = list(executor.map(sweep_chunk, chunks, first_layouts))
+    layout_rows = np.concatenate(layout_rows) if layout_rows else np.empty((0, 10))
+
+    # Every layout is repeated once for each load factor
+    load_scales = np.asarray(load_scales, dtype=float)
+    rows = np.repeat(layout_rows, len(load_scales), axis=0)
+    scales = np.tile(load_scales, len(layouts))
+    rows[:, [1, 2, 3, 5, 7, 9]] *= scales[:, np.newaxis]
+
+    parameters = np.repeat(np.array(layouts, dtype=float).reshape(-1, 3), len(load_scales),
+                           axis=0)
+    table = {name: parameters[:, index] for index, name in enumerate(sweep_columns[:3])}
+    table['load_scale'] = scales
+    table['valid'] = rows[:, 0] == 1
+    for index, name in enumerate(sweep_columns[5:]):
+        table[name] = rows[:, index + 1]
+    return table
+
+
+# Pre: Accepts the table from sweep_beams
+# Post: This returns the table as lists so it can be printed as JSON. The values of invalid
+#       layouts are null.
+def summarize_sweep(table):
+    return {name: [None if isinstance(value, float) and math.isnan(value) else value
+                   for value in table[name].tolist()]
+            for name in sweep_columns}
+
+
+# Pre: Accepts a beam dictionary with prepared distributed loads, the right hand side of its
+#      reaction solve from reaction_rhs, the roller and pin locations, and the objective
+#      ("moment" for the max |M| or "reaction" for the largest reaction magnitude)
+# Post: This solves the reactions with the supports at these locations and returns the value
+#       of the objective. The max |M| comes from the exact extrema of the moment diagram, so
+#       nothing is sampled or plotted.
+def support_objective(beam, rhs, roller_position, pin_position, objective):
+    support_locations = [roller_position, pin_position]
+    reactions = solve_reaction_forces_batch(rhs, support_locations)[0]
+    if objective == 'reaction':
+        pin_x, roller_rxn, pin_y = reactions
+        return max(abs(roller_rxn), math.hypot(pin_x, pin_y))
+
+    layout = dict(beam)
+    layout['support_locations'] = support_locations
+    totals = beam_totals(layout, np.column_stack((np.eye(3), reactions)))
+    model = singularity_model(totals['total_v_forces'], totals['moments'], beam['dist_loads'])
+    extrema = diagram_extrema(
+        lambda x, left=False: singularity_moment(model, x, left),
+        lambda x: singularity_shear(model, x), beam['inputted_length'],
+        shear_moment_events(totals['total_v_forces'], totals['moments'], beam['dist_loads']))
+    return abs(find_max_abs(extrema)[1])
+
+
+# Pre: Accepts a beam dictionary, the objective ("moment" or "reaction", see
+#      support_objective), the number of roller and pin locations on each side of the coarse
+#      grid, the number of the best grid layouts that are refined, and the closest the
+#      supports may be (inputted_length / 100 when it is None)
+# Post: This finds the roller and pin locations that make the objective smallest. The objective
+#       is piecewise-smooth, with kinks where a support passes a load or the largest moment
+#       moves to another place, so a coarse grid first finds the best regions and then a
+#       Nelder-Mead search, which does not need derivatives, refines each of them. This needs
+#       far fewer evaluations than a fine grid. It returns a dictionary with the objective,
+#       the optimal support_locations, the value of the objective there, the number of
+#       evaluations, the optimal beam, and the analysis of it from analyze_beam.
+def optimize_supports(beam, objective='moment', grid_points=9, starts=3, min_spacing=None):
+    from scipy.optimize import minimize
+
+    inputted_length = beam['inputted_length']
+    if min_spacing is None:
+        min_spacing = inputted_length / 100
+    dist_loads = prepare_loads(beam['dist_loads'])
+    rhs = np.array(reaction_rhs(beam['h_forces'], beam['v_forces'], beam['moments'],
+                                dist_loads), dtype=float)
+
+    evaluations = [0]
+
+    def evaluate(locations):
+        roller_position, pin_position = np.clip(locations, 0, inputted_length)
+        if abs(roller_position - pin_position) < min_spacing:
+            return math.inf
+        evaluations[0] += 1
+        return support_objective(beam, rhs, roller_position, pin_position, objective)
+
+    grid = np.linspace(0, inputted_length, grid_points)
+    grid_values = sorted((evaluate((roller_position, pin_position)),
+                          (roller_position, pin_position))
+                         for roller_position in grid for pin_position in grid)
+
+    best_value, best_locations = grid_values[0]
+    for value, locations in grid_values[:starts]:
+        if not math.isfinite(value):
+            break
+        result = minimize(evaluate, locations, method='Nelder-Mead',
+                          bounds=[(0, inputted_length)] * 2,
+                          options={'xatol': inputted_length * 1e-6, 'fatol': 1e-9,
+                                   'initial_simplex': [
+                                       locations,
+                                       np.add(locations, (grid[1] / 2, 0)),
+                                       np.add(locations, (0, grid[1] / 2))]})
+        if result.fun < best_value:
+            best_value, best_locations = result.fun, result.x
+
+    optimal_beam = dict(beam)
+    optimal_beam['support_locations'] = [float(location) for location in
+                                         np.clip(best_locations, 0, inputted_length)]
+    return {'objective': objective,
+            'support_locations': optimal_beam['support_locations'],
+            'value': float(best_value),
+            'evaluations': evaluations[0],
+            'beam': optimal_beam,
+            'analysis': analyze_beam(optimal_beam)}
+
+
+# Pre: Accepts the dictionary from optimize_supports
+# Post: This returns the optimal supports and the summary of the analysis of the optimal beam
+#       as plain numbers so they can be printed as JSON.
+def summarize_optimum(optimum):
+    roller_position, pin_position = optimum['support_locations']
+    summary = {'objective': optimum['objective'],
+               'support_locations': {'roller': roller_position, 'pin': pin_position},
+               'value': optimum['value'],
+               'evaluations': optimum['evaluations']}
+    summary.update(summarize_analysis(optimum['analysis']))
+    return summary
+
+
+# Pre: Accepts nothing.
+# Post: This prompts the user for the whole beam and returns it as a dictionary in the same
+#       form as validate_beam_definition.
+def prompt_beam_definition():
+    unit_system = unit_system_type()
+    inputted_length = beam_length()  # This stores the return value for the length of the beam
+
+    support_locations = support_locations_input(inputted_length)
+
+    h_forces = point_horizontal_forces(inputted_length)  # This stores the return list for
+    # the horizontal forces.
+
+    v_forces = point_vertical_forces(inputted_length)  # This stores the return list for
+    # the horizontal forces.
+
+    moments = point_moments(inputted_length)
+    # This stores the return list for the horizontal forces.
+
+    dist_loads = distributed_load(inputted_length)
+    # This stores the return list for the distributed loads
+
+    stiffness = section_stiffness(inputted_length)
+
+    return {'unit_system': unit_system,
+            'inputted_length': inputted_length,
+            'support_locations': support_locations,
+            'h_forces': h_forces,
+            'v_forces': v_forces,
+            'moments': moments,
+            'dist_loads': dist_loads,
+            'axle_train': None,
+            'stiffness': stiffness,
+            'combinations': None}
+
+
+# Pre: Accepts a list of command line arguments (sys.argv is used when it is None)
+# Post: This returns the parsed arguments.
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Generates the load, axial, shear, and moment diagrams of"
+                    " an overhanging beam.")
+    parser.add_argument('beam_files', nargs='*',
+                        help="JSON or TOML beam definition files. The beam is entered "
+                             "with prompts if these are left out.")
+    output_mode = parser.add_mutually_exclusive_group()
+    output_mode.add_argument('--compute-only', action='store_true',
+                             help="only print the reactions and the max |value| of each "
+                                  "diagram as JSON. Nothing is plotted and matplotlib is "
+                                  "not imported.")
+    output_mode.add_argument('--output-dir',
+                             help="save the diagrams to files in this folder instead of "
+                                  "showing them. Several beam files are rendered in parallel.")
+    output_mode.add_argument('--combinations', action='store_true',
+                             help="print the reactions and diagrams of every load combination "
+                                  "in the beam file and the governing combination along the "
+                                  "beam as JSON. Nothing is plotted.")
+    output_mode.add_argument('--export', choices=['csv', 'ndjson'],
+                             help="stream the axial force, shear force, and moment at evenly "
+                                  "spaced points along the beam to stdout as CSV or NDJSON "
+                                  "rows. Nothing is plotted.")
+    parser.add_argument('--export-points', type=int, default=10001,
+                        help="number of evenly spaced points used for --export, not counting "
+                             "the breakpoints (default: 10001)")
+    parser.add_argument('--format', dest='formats', nargs='+', default=['png'],
+                        choices=['png', 'svg', 'pdf'],
+                        help="file formats used with --output-dir (default: png)")
+    parser.add_argument('--workers', type=int,
+                        help="number of processes used to render beam files "
+                             "(default: one per CPU)")
+    parser.add_argument('--cache', action='store_true',
+                        help="read the results of beams that were analyzed before from the "
+                             "result cache and store the results of new beams in it")
+    parser.add_argument('--cache-path',
+                        help="SQLite file of the result cache, which also turns on --cache "
+                             "(default: results.sqlite in the user's cache folder)")
+    parser.add_argument('--timing', action='store_true',
+                        help="print the wall time and number of calls of each stage (input, "
+                             "sympify, integrate, reaction solve, each diagram, tight_layout, "
+                             "render, ...) to stderr when the program ends. The BEAM_TIMING "
+                             "environment variable turns this on too.")
+    parser.add_argument('--timing-format', choices=['table', 'json'],
+                        help="print the timing summary as a table or as JSON (default: table)")
+    parser.add_argument('--profile-stage', metavar='STAGE',
+                        help="also run this stage (like \"reaction solve\") under cProfile and "
+                             "save the profile to --profile-output")
+    parser.add_argument('--profile-output', metavar='FILE',
+                        help="file the profile of --profile-stage is saved to (default: the "
+                             "name of the stage with .prof)")
+    moving_loads = parser.add_mutually_exclusive_group()
+    moving_loads.add_argument('--influence-lines', type=float, nargs='+', metavar='SECTION',
+                              help="show the influence lines of the reactions and of the shear "
+                                   "and moment at these sections for a moving unit load instead "
+                                   "of the diagrams. The loads of the beam are not used.")
+    moving_loads.add_argument('--envelopes', action='store_true',
+                              help="show the max and min shear and moment envelopes for the "
+                                   "axle_train of the beam file moving across the beam instead "
+                                   "of the diagrams. The other loads of the beam are not used.")
+    moving_loads.add_argument('--optimize-supports', choices=['moment', 'reaction'],
+                              help="move the roller and pin to where the max |moment| or the "
+                                   "largest reaction is smallest and show the diagrams of the "
+                                   "beam with the supports there")
+    parser.add_argument('--load-positions', type=int, default=201,
+                        help="number of unit load positions used for --influence-lines "
+                             "(default: 201)")
+    parser.add_argument('--sections', type=int, default=101,
+                        help="number of evenly spaced sections used for --envelopes "
+                             "(default: 101)")
+    sweep = parser.add_argument_group(
+        'sweep', "analyze every combination of these values and print the reactions and the "
+                 "max |value| of each diagram for each of them as a JSON table. Each one takes "
+                 "START STOP COUNT.")
+    sweep.add_argument('--sweep-length', type=float, nargs=3, metavar=('START', 'STOP', 'COUNT'),
+                       help="lengths of the beam")
+    sweep.add_argument('--sweep-roller', type=float, nargs=3, metavar=('START', 'STOP', 'COUNT'),
+                       help="locations of the roller support")
+    sweep.add_argument('--sweep-pin', type=float, nargs=3, metavar=('START', 'STOP', 'COUNT'),
+                       help="locations of the pin support")
+    sweep.add_argument('--sweep-load-scale', type=float, nargs=3,
+                       metavar=('START', 'STOP', 'COUNT'),
+                       help="factors that every load is multiplied by")
+    sweep.add_argument('--chunk-size', type=int,
+                       help="number of layouts each process analyzes at a time")
+    sweep.add_argument('--sweep-output', metavar='FILE',
+                       help="also write the axial force, shear force, and moment of every case "
+                            "at evenly spaced stations to this file (a JSON header line and "
+                            "then a float64 array that can be memory-mapped)")
+    sweep.add_argument('--sweep-stations', type=int, default=101,
+                       help="number of stations along each beam in --sweep-output "
+                            "(default: 101)")
+    arguments = parser.parse_args(argv)
+
+    arguments.sweep = any(values is not None for values in [
+        arguments.sweep_length, arguments.sweep_roller, arguments.sweep_pin,
+        arguments.sweep_load_scale, arguments.sweep_output])
+    if arguments.sweep and (arguments.output_dir is not None or arguments.combinations
+                            or arguments.export is not None
+                            or arguments.influence_lines is not None or arguments.envelopes
+                            or arguments.optimize_supports is not None):
+        parser.error("the --sweep options only print JSON and cannot be used with --output-dir, "
+                     "--combinations, --export, --influence-lines, --envelopes, or "
+                     "--optimize-supports")
+    if arguments.export_points < 2:
+        parser.error("--export-points must be at least 2")
+    if arguments.sweep_stations < 2:
+        parser.error("--sweep-stations must be at least 2")
+    if arguments.sweep_output is not None and len(arguments.beam_files) > 1:
+        parser.error("--sweep-output can only be used with one beam file")
+    if arguments.export is not None and (arguments.influence_lines is not None
+                                         or arguments.envelopes):
+        parser.error("--export cannot be used with --influence-lines or --envelopes")
+    return arguments
+
+
+# Pre: Accepts the START STOP COUNT of a --sweep option, or None
+# Post: This returns COUNT evenly spaced values from START to STOP, or None if the option was
+#       not given.
+def sweep_values(sweep_range):
+    if sweep_range is None:
+        return None
+    start, stop, count = sweep_range
+    return np.linspace(start, stop, max(1, int(count)))
+
+
+# Pre: Accepts a list of command line arguments (sys.argv is used when it is None)
+# Post: This parses the arguments and runs the beams with run_beams. With --timing the stages
+#       are timed for this run only and the summary is printed when it ends.
+def main(argv=None):
+    arguments = parse_arguments(argv)
+    # The shared functions call each other inside beam_engine, so it is timed too
+    with stage_timing.timed_run([globals(), vars(beam_engine)], TIMED_STAGES, arguments.timing,
+                                arguments.timing_format, arguments.profile_stage,
+                                arguments.profile_output):
+        return run_beams(arguments)
+
+
+# Pre: Accepts the command line arguments from parse_arguments
+# Post: This reads the beams from the beam definition files if any are given and prompts the
+#       user for one otherwise. The reaction forces are then solved and the diagrams are shown
+#       or saved to files, or only the results are printed in compute only mode.
+def run_beams(arguments):
+    # Beams that were analyzed before are read back from the result cache if it is turned on
+    cache_path = None
+    if arguments.cache or arguments.cache_path is not None:
+        import result_cache
+        cache_path = arguments.cache_path or result_cache.default_cache_path()
+
+    # Beam files that are saved to files are rendered in parallel. They are rendered one by
+    # one in this process when the stages are timed, so the times of every stage are kept.
+    if (arguments.output_dir is not None and arguments.beam_files
+            and not stage_timing.timing_state['enabled']
+            and arguments.influence_lines is None and not arguments.envelopes
+            and arguments.optimize_supports is None):
+        render_results = render_beam_files(arguments.beam_files, arguments.output_dir,
+                                           arguments.formats, arguments.workers,
+                                           cache_path)
+        failed = False
+        for beam_file, result in render_results.items():
+            if isinstance(result, Exception):
+                print(f"Could not render {beam_file}: {result}")
+                failed = True
+            else:
+                print("\n".join(result))
+        if failed:
+            sys.exit(1)
+        return
+
+    if not arguments.beam_files:
+        beams = {'beam': prompt_beam_definition()}
+    else:
+        beams = {}
+        for beam_file in arguments.beam_files:
+            try:
+                beams[beam_file] = load_beam_definition(beam_file)
+            except (OSError, ValueError) as error:
+                sys.exit(f"Could not load the beam definition file {beam_file}: {error}")
+
+    # matplotlib is only imported when the diagrams are shown or saved
+    if not (arguments.compute_only or arguments.combinations or arguments.sweep
+            or arguments.export is not None):
+        if arguments.output_dir is not None:
+            import matplotlib
+            matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+
+    cache = open_result_cache(cache_path)
+    summaries = {}
+    for beam_index, (beam_name, beam) in enumerate(beams.items()):
+        if arguments.sweep:
+            summaries[beam_name] = summarize_sweep(sweep_beams(
+                beam, sweep_values(arguments.sweep_length), sweep_values(arguments.sweep_roller),
+                sweep_values(arguments.sweep_pin), sweep_values(arguments.sweep_load_scale),
+                arguments.workers, arguments.chunk_size, arguments.sweep_output,
+                arguments.sweep_stations))
+            continue
+
+        if arguments.combinations:
+            if not beam['combinations']:
+                sys.exit(f"{beam_name} does not have any load combinations.")
+            summaries[beam_name] = summarize_combinations(analyze_combinations(beam))
+            continue
+
+        if arguments.influence_lines is not None or arguments.envelopes:
+            if arguments.influence_lines is not None:
+                section_locations = arguments.influence_lines
+                if any(not 0 <= location <= beam['inputted_length']
+                       for location in section_locations):
+                    sys.exit("The sections for the influence lines must be on the beam.")
+                load_positions = np.linspace(0, beam['inputted_length'],
+                                             arguments.load_positions)
+                # A section at the right end takes the value just to its left like in
+                # train_envelopes
+                results = influence_lines(beam['support_locations'], load_positions,
+                                          section_locations,
+                                          np.array(section_locations)
+                                          >= beam['inputted_length'])
+                summarize, plot, diagram_name = (summarize_influence_lines,
+                                                 plot_influence_lines, 'influence_lines')
+            else:
+                if beam['axle_train'] is None:
+                    sys.exit(f"{beam_name} does not have an axle_train for the envelopes.")
+                section_locations = np.linspace(0, beam['inputted_length'], arguments.sections)
+                results = train_envelopes(beam['inputted_length'], beam['support_locations'],
+                                    beam['axle_train'], section_locations)
+                summarize, plot, diagram_name = summarize_envelopes, plot_envelopes, 'envelopes'
+
+            if arguments.compute_only:
+                summaries[beam_name] = summarize(results)
+                continue
+
+            figure = plot(results, beam['unit_system'])
+            if arguments.output_dir is None:
+                plt.show()
+                continue
+
+            file_name = os.path.splitext(os.path.basename(beam_name))[0]
+            print("\n".join(save_figures([(figure, diagram_name)], arguments.output_dir,
+                                         file_name, arguments.formats)))
+            plt.close(figure)
+            continue
+
+        if arguments.optimize_supports is not None:
+            optimum = optimize_supports(beam, arguments.optimize_supports)
+            if arguments.compute_only:
+                summaries[beam_name] = summarize_optimum(optimum)
+                continue
+            roller_position, pin_position = optimum['support_locations']
+            # The exported rows are the only thing printed to stdout
+            print(f"{beam_name}: roller at {roller_position:.4f}, pin at {pin_position:.4f} "
+                  f"(max |{arguments.optimize_supports}| = {optimum['value']:.4f})",
+                  file=sys.stderr if arguments.export is not None else sys.stdout)
+            beam = optimum['beam']
+
+        if arguments.output_dir is not None:
+            file_name = os.path.splitext(os.path.basename(beam_name))[0]
+            print("\n".join(render_beam(beam, arguments.output_dir, file_name,
+                                        arguments.formats, cache)))
+            continue
+
+        analysis = cached_analyze_beam(beam, cache)
+        if arguments.export is not None:
+            # The beam is only named in each row when there are several beams
+            write_diagram_rows(diagram_chunks(beam, analysis, arguments.export_points),
+                               sys.stdout, arguments.export,
+                               beam_name if len(beams) > 1 else None, beam_index == 0)
+            continue
+        if arguments.compute_only:
+            summaries[beam_name] = summarize_analysis(analysis)
+            continue
+
+        plot_beam(beam, analysis)
+        plt.show()
+
+    if cache is not None:
+        import result_cache
+        result_cache.close_cache(cache)
 
-    plt.show()
+    if arguments.compute_only or arguments.combinations or arguments.sweep:
+        # One beam prints its summary and several beams print a summary for each file
+        if len(summaries) == 1:
+            summaries = summaries.popitem()[1]
+        print(json.dumps(summaries, indent=4))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,161 @@
+# This is an on-disk cache of solved beams that every beam script shares. A beam is turned into
+# a canonical hash of everything that changes its results (the length, supports, loads, and
+# the sympified functions of the distributed loads), and the analysis of the beam is stored in
+# a SQLite database under that hash. The next run with the same beam reads the analysis back
+# instead of integrating the loads, solving the reactions, and sampling the diagrams again. The
+# results are stored as JSON, so reading a cache file never runs any code from it.
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+import numpy as np
+import sympy as sp
+
+# This is part of every key. Changing it (or the source of a beam script or beam_engine) makes
+# every result that was stored before unreachable. They are never read again, and the least
+# recently used results are removed once the cache is full.
+ENGINE_VERSION = "1"
+
+# The cache removes the least recently used results once it is bigger than this
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# These keys of a beam dictionary do not change what analyze_beam returns
+IGNORED_KEYS = {'prepared', 'case', 'combinations', 'axle_train'}
+
+# These are the errors of a cache that cannot be opened (like a folder that cannot be written)
+CACHE_ERRORS = (OSError, sqlite3.Error)
+
+
+# Pre: Accepts nothing.
+# Post: This returns the path of the cache database in the user's cache folder
+def default_cache_path():
+    cache_directory = os.environ.get('XDG_CACHE_HOME',
+                                     os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(cache_directory, 'load_axial_shear_moment_diagrams', 'results.sqlite')
+
+
+# Pre: Accepts a value from a beam dictionary
+# Post: This returns the value in a form that json can write the same way every time. Numbers
+#       become floats (so 2 and 2.0 are the same), sympy expressions become their srepr (which
+#       does not depend on how the function was typed, like "2*x" and "x * 2"), and keys that
+#       do not change the results are left out.
+def canonical_value(value):
+    if isinstance(value, dict):
+        return {str(key): canonical_value(item) for key, item in value.items()
+                if key not in IGNORED_KEYS}
+    if isinstance(value, (list, tuple)):
+        return [canonical_value(item) for item in value]
+    if isinstance(value, sp.Basic):
+        return sp.srepr(value)
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    return float(value)
+
+
+# Pre: Accepts the paths of a beam script and of the modules it uses to analyze beams
+# Post: This returns the engine version of the script, which is ENGINE_VERSION and a hash of
+#       the source of the files. Any change to one of them gives a new version.
+def engine_version(*source_paths):
+    source_hash = hashlib.sha256()
+    for source_path in source_paths:
+        with open(source_path, 'rb') as source_file:
+            source_hash.update(source_file.read())
+    return f"{ENGINE_VERSION}:{source_hash.hexdigest()[:16]}"
+
+
+# Pre: Accepts the results of a beam (dictionaries, lists, numbers, strings, and numpy arrays)
+# Post: This returns the results in a form json can write. A numpy array becomes a dictionary
+#       with its values and dtype so decode_value can turn it back into the same array.
+def encode_value(value):
+    if isinstance(value, dict):
+        return {str(key): encode_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [encode_value(item) for item in value]
+    if isinstance(value, np.ndarray):
+        return {'__ndarray__': value.tolist(), 'dtype': value.dtype.str}
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+# Pre: Accepts results that were read back with json
+# Post: This turns the arrays that encode_value wrote back into numpy arrays
+def decode_value(value):
+    if isinstance(value, dict):
+        if '__ndarray__' in value:
+            return np.array(value['__ndarray__'], dtype=value['dtype'])
+        return {key: decode_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [decode_value(item) for item in value]
+    return value
+
+
+# Pre: Accepts the name of the beam type, the engine version from engine_version, and a beam
+#      dictionary
+# Post: This returns the canonical hash of the beam, which is the key of its results
+def beam_key(beam_type, version, beam):
+    canonical = json.dumps({'beam_type': beam_type, 'version': version,
+                            'beam': canonical_value(beam)}, sort_keys=True)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+# Pre: Accepts the path of the cache database (default_cache_path when it is None), the
+#      largest size of the cache in bytes, the name of the beam type, and its engine version
+# Post: This opens (or creates) the cache and returns it as a dictionary. The results of other
+#       engine versions are kept, since another checkout of the scripts can share the cache.
+def open_cache(cache_path=None, max_bytes=DEFAULT_MAX_BYTES, beam_type=None, version=None):
+    if cache_path is None:
+        cache_path = default_cache_path()
+    if os.path.dirname(cache_path):
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+
+    # Several processes can render beams at once, so they wait for each other's writes
+    connection = sqlite3.connect(cache_path, timeout=30)
+    connection.execute("CREATE TABLE IF NOT EXISTS results ("
+                       "key TEXT PRIMARY KEY, beam_type TEXT, version TEXT, "
+                       "value BLOB, size INTEGER, last_used REAL)")
+    connection.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+
+    return {'connection': connection, 'path': cache_path, 'max_bytes': max_bytes,
+            'beam_type': beam_type, 'version': version}
+
+
+# Pre: Accepts a cache from open_cache and a key from beam_key
+# Post: This returns the stored results and marks them as just used, or None if there are none
+def cache_get(cache, key):
+    connection = cache['connection']
+    row = connection.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+    if row is None:
+        return None
+    with connection:
+        connection.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+    return decode_value(json.loads(row[0]))
+
+
+# Pre: Accepts a cache from open_cache, a key from beam_key, and the results to store
+# Post: This stores the results and then removes the least recently used results until the
+#       cache is no bigger than its max_bytes
+def cache_put(cache, key, value):
+    connection = cache['connection']
+    data = json.dumps(encode_value(value)).encode('utf-8')
+    with connection:
+        connection.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                           (key, cache['beam_type'], cache['version'], data, len(data),
+                            time.time()))
+        total_size = connection.execute("SELECT COALESCE(SUM(size), 0) FROM results"
+                                        ).fetchone()[0]
+        for old_key, size in connection.execute(
+                "SELECT key, size FROM results ORDER BY last_used").fetchall():
+            if total_size <= cache['max_bytes']:
+                break
+            connection.execute("DELETE FROM results WHERE key = ?", (old_key,))
+            total_size -= size
+
+
+# Pre: Accepts a cache from open_cache
+# Post: This closes the database of the cache
+def close_cache(cache):
+    cache['connection'].close()
@@ -0,0 +1,190 @@
+# This times the stages of a run of a beam script. Nothing is timed unless it is turned on with
+# the --timing option of a beam script or the BEAM_TIMING environment variable. Then every
+# function in the TIMED_STAGES of the script is wrapped for the run, so each call adds to the
+# call count and wall time of its stage. The summary is printed to stderr when the run ends, so
+# the JSON and exported rows on stdout do not change. One stage can also be run under cProfile.
+
+import atexit
+import contextlib
+import cProfile
+import functools
+import json
+import os
+import sys
+import time
+
+timing_state = {'enabled': False, 'format': 'table', 'stages': {}, 'depth': {},
+                'profile_stage': None, 'profile_output': None, 'profiler': None}
+
+
+# Pre: Accepts whether timing was turned on by an option, the format of the summary ("table"
+#      or "json"), the stage to profile (or None), and the file to save its profile in
+# Post: This turns timing on if it was asked for by the arguments or by the BEAM_TIMING,
+#       BEAM_PROFILE_STAGE, and BEAM_PROFILE_OUTPUT environment variables (BEAM_TIMING can be
+#       "json" for the JSON summary). Profiling a stage turns timing on too. The summary is
+#       printed when the program exits. It returns whether timing is on.
+def start_timing(enabled=False, output_format=None, profile_stage=None, profile_output=None):
+    environment_timing = os.environ.get('BEAM_TIMING', '').strip().lower()
+    if environment_timing in ('', '0', 'false', 'no', 'off'):
+        environment_timing = None
+    profile_stage = profile_stage or os.environ.get('BEAM_PROFILE_STAGE') or None
+    profile_output = profile_output or os.environ.get('BEAM_PROFILE_OUTPUT') or None
+
+    if not (enabled or environment_timing or profile_stage):
+        return False
+    if timing_state['enabled']:
+        return True
+
+    if output_format is None:
+        output_format = 'json' if environment_timing == 'json' else 'table'
+    timing_state.update({'enabled': True, 'format': output_format,
+                         'profile_stage': profile_stage})
+    if profile_stage is not None:
+        timing_state['profile_output'] = (profile_output
+                                          or profile_stage.replace(' ', '_') + '.prof')
+        timing_state['profiler'] = cProfile.Profile()
+    atexit.register(report_timing)
+    return True
+
+
+# Pre: Accepts the name of a stage
+# Post: This counts a call of the stage and returns the time it started, or None if the stage
+#       is already running (a stage that calls itself is only timed once)
+def begin_stage(name):
+    record = timing_state['stages'].setdefault(name, {'calls': 0, 'seconds': 0.0})
+    record['calls'] += 1
+    depth = timing_state['depth'].get(name, 0)
+    timing_state['depth'][name] = depth + 1
+    if depth:
+        return None
+
+    if name == timing_state['profile_stage']:
+        timing_state['profiler'].enable()
+    return time.perf_counter()
+
+
+# Pre: Accepts the name of a stage and the time from begin_stage
+# Post: This adds the wall time since the start to the stage
+def end_stage(name, start):
+    timing_state['depth'][name] -= 1
+    if start is None:
+        return
+
+    timing_state['stages'][name]['seconds'] += time.perf_counter() - start
+    if name == timing_state['profile_stage']:
+        timing_state['profiler'].disable()
+
+
+# Pre: Accepts the name of a stage
+# Post: This times the code in the with block as one call of the stage. It does nothing when
+#       timing is off.
+@contextlib.contextmanager
+def stage(name):
+    if not timing_state['enabled']:
+        yield
+        return
+
+    start = begin_stage(name)
+    try:
+        yield
+    finally:
+        end_stage(name, start)
+
+
+# Pre: Accepts a function and the name of its stage
+# Post: This returns a function that times every call of the function as the stage
+def timed_function(function, name):
+    @functools.wraps(function)
+    def timed(*args, **kwargs):
+        with stage(name):
+            return function(*args, **kwargs)
+
+    timed.timed_stage = name
+    return timed
+
+
+# Pre: Accepts the globals of a beam script and a dictionary with the stage of each function
+# Post: This replaces every function of the dictionary in the globals with a timed version.
+#       The functions call each other through the globals, so the calls inside the script are
+#       timed too. A function that is already timed is left as it is. It returns the functions
+#       that were replaced so they can be put back with namespace.update.
+def instrument(namespace, stages):
+    originals = {}
+    for function_name, stage_name in stages.items():
+        function = namespace.get(function_name)
+        if function is not None and not hasattr(function, 'timed_stage'):
+            originals[function_name] = function
+            namespace[function_name] = timed_function(function, stage_name)
+    return originals
+
+
+# Pre: Accepts nothing.
+# Post: This prints the summary of the timed run and turns timing off again, so a later run in
+#       the same process (like another beam script run by beam_select) starts from nothing
+def stop_timing():
+    atexit.unregister(report_timing)
+    report_timing()
+    timing_state.update({'enabled': False, 'format': 'table', 'stages': {}, 'depth': {},
+                         'profile_stage': None, 'profile_output': None, 'profiler': None})
+
+
+# Pre: Accepts the globals of the modules to time, the stage of each function, and the timing
+#      arguments of start_timing
+# Post: This times the code in the with block as one run. When timing is turned on, the
+#       functions are wrapped with instrument at the start and the original functions are put
+#       back at the end, where the summary is printed. A run inside a run that is already timed
+#       adds to the outer summary instead.
+@contextlib.contextmanager
+def timed_run(namespaces, stages, enabled=False, output_format=None, profile_stage=None,
+              profile_output=None):
+    outer_run = timing_state['enabled']
+    if not start_timing(enabled, output_format, profile_stage, profile_output):
+        yield
+        return
+
+    replaced = [instrument(namespace, stages) for namespace in namespaces]
+    try:
+        yield
+    finally:
+        for namespace, originals in zip(namespaces, replaced):
+            namespace.update(originals)
+        if not outer_run:
+            stop_timing()
+
+
+# Pre: Accepts nothing.
+# Post: This returns the number of calls, the total wall time, and the time per call of every
+#       stage in the order they first ran. Stages include the stages they call, like the
+#       sympify stage inside the input stage.
+def timing_summary():
+    return {name: {'calls': record['calls'], 'seconds': record['seconds'],
+                   'seconds_per_call': record['seconds'] / record['calls']}
+            for name, record in timing_state['stages'].items()}
+
+
+# Pre: Accepts the file to print to (stderr when it is None)
+# Post: This prints the timing summary as a table or as JSON and saves the profile of the
+#       profiled stage
+def report_timing(stream=None):
+    if stream is None:
+        stream = sys.stderr
+    summary = timing_summary()
+
+    if timing_state['format'] == 'json':
+        print(json.dumps({'stages': summary}, indent=4), file=stream)
+    else:
+        print(f"{'stage':<24}{'calls':>8}{'total (ms)':>14}{'per call (ms)':>16}", file=stream)
+        for name, record in summary.items():
+            print(f"{name:<24}{record['calls']:>8}{record['seconds'] * 1000:>14.2f}"
+                  f"{record['seconds_per_call'] * 1000:>16.3f}", file=stream)
+
+    profile_stage = timing_state['profile_stage']
+    if profile_stage is None:
+        return
+    if profile_stage not in summary:
+        print(f"The stage {profile_stage} never ran, so it was not profiled. The stages are: "
+              f"{', '.join(summary)}", file=stream)
+        return
+    timing_state['profiler'].dump_stats(timing_state['profile_output'])
+    print(f"Saved the profile of {profile_stage} to {timing_state['profile_output']}",
+          file=stream)
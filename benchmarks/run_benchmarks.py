@@ -0,0 +1,252 @@
+# This is the benchmark suite of the beam scripts. Every beam in the beams folder (which has a
+# folder for each beam type) goes through the same steps as a run of its beam script, and the
+# hot paths are timed on their own: the reaction solve, the shear force over a full grid of
+# points, the moment diagram, the scaling of the distributed loads, the load diagram, and
+# drawing the load diagram. The times are saved as JSON, and --compare checks them against the
+# JSON of another version so regressions show up.
+
+import argparse
+import datetime
+import glob
+import importlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+BENCHMARK_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+REPOSITORY_DIRECTORY = os.path.dirname(BENCHMARK_DIRECTORY)
+CORPUS_DIRECTORY = os.path.join(BENCHMARK_DIRECTORY, 'beams')
+
+# The beam scripts are imported the same way they import each other when run as scripts
+sys.path.insert(0, os.path.join(REPOSITORY_DIRECTORY, 'beam_types'))
+
+BEAM_TYPES = ['simply_supported_beam', 'cantilever_beam', 'overhanging_beam', 'continuous_beam']
+
+# The timed steps in the order a beam script runs them
+STAGES = ['solve_reaction_forces', 'shear_force_at_point', 'moment_diagram', 'scale_functions',
+          'load_diagram', 'render']
+
+
+# Pre: Accepts a dictionary of times, the name of a stage, a function, and its arguments
+# Post: This calls the function, stores how long it took under the name of the stage, and
+#       returns what the function returned
+def timed(times, stage, function, *arguments):
+    start = time.perf_counter()
+    result = function(*arguments)
+    times[stage] = time.perf_counter() - start
+    return result
+
+
+# Pre: Accepts a beam module, the name of its beam type, and a beam dictionary
+# Post: This solves the reaction forces the same way analyze_beam of the beam script does. The
+#       arguments of solve_reaction_forces are not the same for every beam type, and the
+#       continuous beam solves its supports with solve_support_reactions instead.
+def solve_reactions(beam_module, beam_type, beam):
+    if beam_type == 'continuous_beam':
+        return beam_module.solve_support_reactions(beam)
+    loads = [beam['h_forces'], beam['v_forces'], beam['moments'], beam['dist_loads']]
+    if beam_type == 'simply_supported_beam':
+        return beam_module.solve_reaction_forces(beam['inputted_length'], *loads)
+    if beam_type == 'overhanging_beam':
+        return beam_module.solve_reaction_forces(*loads, beam['support_locations'])
+    return beam_module.solve_reaction_forces(*loads)
+
+
+# Pre: Accepts a beam module, the name of its beam type, the axes to plot on, a beam
+#      dictionary, its totals from beam_totals, and the loads from scale_functions
+# Post: This plots the load diagram the same way plot_beam of the beam script does
+def plot_load_diagram(beam_module, beam_type, ax, beam, totals, scaled_loads):
+    if beam_type in ['overhanging_beam', 'continuous_beam']:
+        beam_module.load_diagram(ax, totals['total_h_forces'], totals['total_v_forces'],
+                                 totals['moments'], beam['inputted_length'], scaled_loads,
+                                 beam['unit_system'], beam['dist_loads'])
+    else:
+        beam_module.load_diagram(ax, beam['h_forces'], totals['total_v_forces'],
+                                 totals['moments'], beam['inputted_length'],
+                                 totals['reactions']['A_x'], scaled_loads,
+                                 beam['unit_system'], beam['dist_loads'])
+
+
+# Pre: Accepts a beam module, the name of its beam type, the path of a beam definition file, and
+#      the number of points in the grid of the shear force
+# Post: This runs every stage once for the beam and returns how long each stage took in
+#       seconds. The beam file is loaded again for every run, so the distributed loads are
+#       integrated and compiled in every reaction solve like they are in a new run of the
+#       script (sympy keeps its own cache, so the first run is still the slowest).
+def run_beam(beam_module, beam_type, beam_file, grid_points):
+    import matplotlib.pyplot as plt
+
+    # The shear force and load scaling are the same for every beam type
+    import beam_engine
+
+    beam = beam_module.load_beam_definition(beam_file)
+    inputted_length = beam['inputted_length']
+    times = {}
+
+    rxn_RREF_array = timed(times, 'solve_reaction_forces', solve_reactions,
+                           beam_module, beam_type, beam)
+    totals = beam_module.beam_totals(beam, rxn_RREF_array)
+
+    x_values = np.linspace(0, inputted_length, grid_points)
+    timed(times, 'shear_force_at_point', beam_engine.shear_force_at_point,
+          x_values, totals['total_v_forces'], beam['dist_loads'])
+
+    figure, ax = plt.subplots(figsize=(12, 6))
+    timed(times, 'moment_diagram', beam_module.moment_diagram, ax, inputted_length,
+          totals['total_v_forces'], totals['moments'], beam['v_forces'], beam['dist_loads'],
+          beam['unit_system'])
+    plt.close(figure)
+
+    scaled_loads = timed(times, 'scale_functions', beam_engine.scale_functions,
+                         beam['dist_loads'])
+
+    figure, ax = plt.subplots(figsize=(12, 16))
+    timed(times, 'load_diagram', plot_load_diagram, beam_module, beam_type, ax, beam, totals,
+          scaled_loads)
+    timed(times, 'render', figure.canvas.draw)
+    plt.close(figure)
+
+    return times
+
+
+# Pre: Accepts a list of the times of one stage in seconds
+# Post: This returns the time of the first run, the min, the median, and every run
+def summarize_times(times):
+    return {'first': times[0], 'min': min(times), 'median': statistics.median(times),
+            'runs': times}
+
+
+# Pre: Accepts nothing.
+# Post: This returns the git commit of the repository, or None if it is not a git repository
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=REPOSITORY_DIRECTORY,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# Pre: Accepts the parsed arguments
+# Post: This returns what the results depend on besides the code: the machine, the versions of
+#       Python and the libraries, and the settings of the run
+def benchmark_metadata(arguments):
+    import matplotlib
+    import scipy
+    import sympy
+
+    return {'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'numpy': np.__version__,
+            'sympy': sympy.__version__,
+            'scipy': scipy.__version__,
+            'matplotlib': matplotlib.__version__,
+            'repeats': arguments.repeats,
+            'grid_points': arguments.grid_points}
+
+
+# Pre: Accepts the results of an older run and of this run, and the ratio of the medians that
+#      counts as a change
+# Post: This prints the median of every stage in both runs and marks the stages that got
+#       slower or faster by more than the threshold. It returns the number that got slower.
+def compare_results(old_results, new_results, threshold):
+    slower = 0
+    print(f"{'beam':<45}{'stage':<24}{'old (ms)':>10}{'new (ms)':>10}{'ratio':>8}")
+    for beam_name, stages in new_results.items():
+        for stage, times in stages.items():
+            if stage not in old_results.get(beam_name, {}):
+                continue
+            old_median = old_results[beam_name][stage]['median']
+            ratio = times['median'] / old_median if old_median > 0 else float('inf')
+            change = ''
+            if ratio > threshold:
+                change = '  slower'
+                slower += 1
+            elif ratio < 1 / threshold:
+                change = '  faster'
+            print(f"{beam_name:<45}{stage:<24}{old_median * 1000:>10.2f}"
+                  f"{times['median'] * 1000:>10.2f}{ratio:>8.2f}{change}")
+    return slower
+
+
+# Pre: Accepts a list of command line arguments (sys.argv is used when it is None)
+# Post: This returns the parsed arguments.
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Times the reaction solve, shear force, moment diagram, load scaling, and "
+                    "load diagram of every beam in the benchmark corpus.")
+    parser.add_argument('--beam-types', nargs='+', choices=BEAM_TYPES, default=BEAM_TYPES,
+                        help="beam types to benchmark (default: all of them)")
+    parser.add_argument('--repeats', type=int, default=5,
+                        help="number of times each beam is run (default: 5)")
+    parser.add_argument('--grid-points', type=int, default=100001,
+                        help="number of points the shear force is found at (default: 100001)")
+    parser.add_argument('--output',
+                        help="JSON file to save the results to (default: a file named after "
+                             "the time in benchmarks/results)")
+    parser.add_argument('--compare', metavar='OLD_RESULTS',
+                        help="JSON results of another version to compare the medians with")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="ratio of the medians that is reported as slower or faster "
+                             "(default: 1.25)")
+    arguments = parser.parse_args(argv)
+
+    if arguments.repeats < 1:
+        parser.error("--repeats must be at least 1")
+    return arguments
+
+
+# Pre: Accepts a list of command line arguments (sys.argv is used when it is None)
+# Post: This benchmarks every beam of the chosen beam types, prints the median of each stage,
+#       and saves the results as JSON. With --compare, the medians are compared with the older
+#       results and the program exits with 1 if any stage got slower than the threshold.
+def main(argv=None):
+    arguments = parse_arguments(argv)
+
+    # Nothing is shown, so the figures are drawn without a display
+    import matplotlib
+    matplotlib.use('Agg')
+
+    metadata = benchmark_metadata(arguments)
+    results = {}
+    for beam_type in arguments.beam_types:
+        beam_module = importlib.import_module(beam_type)
+        for beam_file in sorted(glob.glob(os.path.join(CORPUS_DIRECTORY, beam_type, '*.json'))):
+            beam_name = f"{beam_type}/{os.path.splitext(os.path.basename(beam_file))[0]}"
+            runs = [run_beam(beam_module, beam_type, beam_file, arguments.grid_points)
+                    for _ in range(arguments.repeats)]
+            results[beam_name] = {stage: summarize_times([run[stage] for run in runs])
+                                  for stage in STAGES}
+            print(beam_name)
+            for stage in STAGES:
+                print(f"    {stage:<24}{results[beam_name][stage]['median'] * 1000:>10.2f} ms")
+
+    output_path = arguments.output
+    if output_path is None:
+        file_name = metadata['timestamp'].replace(':', '-') + '.json'
+        output_path = os.path.join(BENCHMARK_DIRECTORY, 'results', file_name)
+    if os.path.dirname(output_path):
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, 'w') as output_file:
+        json.dump({'metadata': metadata, 'results': results}, output_file, indent=4)
+    print(f"Saved the results to {output_path}")
+
+    if arguments.compare is not None:
+        with open(arguments.compare) as old_file:
+            old_report = json.load(old_file)
+        print()
+        print(f"Compared with {arguments.compare} (commit {old_report['metadata']['commit']})")
+        if compare_results(old_report['results'], results, arguments.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
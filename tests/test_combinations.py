@@ -0,0 +1,81 @@
+# These check that the reactions and exact extrema of every load combination, which are found
+# by superposition of the load cases, are the same as analyzing the factored beam on its own.
+
+import copy
+import os
+import sys
+
+import pytest
+
+# The beam scripts are imported the same way they import each other when run as scripts
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'beam_types'))
+
+import cantilever_beam
+import overhanging_beam
+import simply_supported_beam
+
+# Loads in three cases that are not symmetric, so the extrema move between the combinations
+COMBINATION_LOADS = {
+    'unit_system': 'metric',
+    'length': 10,
+    'h_forces': [{'location': 3, 'magnitude': 5, 'case': 'D'},
+                 {'location': 7, 'magnitude': -8, 'case': 'W'}],
+    'v_forces': [{'location': 2, 'magnitude': -10, 'case': 'D'},
+                 {'location': 6.5, 'magnitude': -25, 'case': 'L'},
+                 {'location': 9, 'magnitude': 6, 'case': 'W'}],
+    'moments': [{'location': 5, 'magnitude': 12, 'case': 'L'}],
+    'dist_loads': [{'start': 0, 'end': 10, 'function': "3", 'case': 'D'},
+                   {'start': 1, 'end': 5, 'function': "2 * (x - 1)", 'case': 'L'},
+                   {'start': 4, 'end': 10, 'function': "-sqrt(x)", 'case': 'W'}],
+    'combinations': {'1.4D': {'D': 1.4},
+                     '1.2D + 1.6L': {'D': 1.2, 'L': 1.6},
+                     '0.9D + 1.0W': {'D': 0.9, 'W': 1.0},
+                     '1.2D + 1.0L - 1.0W': {'D': 1.2, 'L': 1.0, 'W': -1.0}}}
+
+BEAMS = [(simply_supported_beam, COMBINATION_LOADS),
+         (cantilever_beam, COMBINATION_LOADS),
+         (overhanging_beam, dict(COMBINATION_LOADS, support_locations={'roller': 2.5, 'pin': 8})),
+         (simply_supported_beam, os.path.join(ROOT, 'examples', 'load_combinations.json'))]
+
+
+# Pre: Accepts a beam definition with load cases and the factor of each case in a combination
+# Post: This returns the definition of the factored beam, which only has the loads of the cases
+#       in the combination, each times the factor of its case, and no cases or combinations
+def factored_definition(definition, case_factors):
+    factored = {key: value for key, value in copy.deepcopy(definition).items()
+                if key not in ['combinations', 'h_forces', 'v_forces', 'moments', 'dist_loads']}
+    for name in ['h_forces', 'v_forces', 'moments']:
+        factored[name] = [{'location': load['location'],
+                           'magnitude': case_factors[load['case']] * load['magnitude']}
+                          for load in definition.get(name, [])
+                          if case_factors.get(load['case'], 0) != 0]
+    factored['dist_loads'] = [{'start': load['start'], 'end': load['end'],
+                               'function': f"{case_factors[load['case']]} * ({load['function']})"}
+                              for load in definition.get('dist_loads', [])
+                              if case_factors.get(load['case'], 0) != 0]
+    return factored
+
+
+@pytest.mark.parametrize('beam_module, definition', BEAMS)
+def test_combinations_match_factored_beam(beam_module, definition):
+    if isinstance(definition, str):
+        definition = beam_module.read_beam_definition(definition)
+    beam = beam_module.validate_beam_definition(copy.deepcopy(definition))
+
+    combinations = beam_module.analyze_combinations(beam)
+
+    for name, case_factors in definition['combinations'].items():
+        factored_beam = beam_module.validate_beam_definition(
+            factored_definition(definition, case_factors))
+        analysis = beam_module.analyze_beam(factored_beam)
+
+        assert combinations['reactions'][name] == pytest.approx(analysis['reactions'],
+                                                                abs=1e-9)
+        for diagram, extrema in combinations['extrema'][name].items():
+            expected = analysis[diagram]['extrema']
+            assert [point['type'] for point in extrema] == [point['type'] for point in expected]
+            assert [point['location'] for point in extrema] == pytest.approx(
+                [point['location'] for point in expected], abs=1e-9)
+            assert [point['value'] for point in extrema] == pytest.approx(
+                [point['value'] for point in expected], abs=1e-9)
@@ -0,0 +1,75 @@
+# These are regression checks of the direct stiffness solve of continuous_beam.py against
+# textbook reactions. The beams have a constant EI, so the reactions only depend on the loads
+# and the supports.
+
+import os
+import sys
+
+import pytest
+
+# The beam scripts are imported the same way they import each other when run as scripts
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'beam_types'))
+
+import continuous_beam
+
+
+# Pre: Accepts the length of the beam, the list of supports (each a location and type), and
+#      optionally the vertical point forces and distributed loads of a beam definition
+# Post: This checks the beam like a beam definition file and returns the reactions of every
+#       support from solve_support_reactions
+def support_reactions(length, supports, v_forces=(), dist_loads=()):
+    beam = continuous_beam.validate_beam_definition({
+        'unit_system': 'metric',
+        'length': length,
+        'supports': [{'location': location, 'type': support_type}
+                     for location, support_type in supports],
+        'v_forces': list(v_forces),
+        'dist_loads': list(dist_loads)})
+    return continuous_beam.solve_support_reactions(beam)['reactions']
+
+
+# Two equal spans under a uniform load w: 3wL/8, 10wL/8, and 3wL/8
+def test_two_equal_spans_uniform_load():
+    w, span = 2.0, 5.0
+    reactions = support_reactions(2 * span, [(0, 'pin'), (span, 'roller'), (2 * span, 'roller')],
+                                  dist_loads=[{'start': 0, 'end': 2 * span, 'function': str(w)}])
+
+    assert [reaction['y'] for reaction in reactions] == pytest.approx(
+        [3 * w * span / 8, 10 * w * span / 8, 3 * w * span / 8])
+    assert reactions[0]['x'] == pytest.approx(0.0, abs=1e-12)
+
+
+# A beam fixed at both ends under a uniform load w: wL/2 at each end and end moments of wL^2/12
+def test_fixed_fixed_uniform_load():
+    w, span = 2.0, 6.0
+    reactions = support_reactions(span, [(0, 'fixed'), (span, 'fixed')],
+                                  dist_loads=[{'start': 0, 'end': span, 'function': str(w)}])
+
+    assert [reaction['y'] for reaction in reactions] == pytest.approx([w * span / 2] * 2)
+    assert [reaction['m'] for reaction in reactions] == pytest.approx(
+        [w * span ** 2 / 12, -w * span ** 2 / 12])
+
+
+# A beam fixed at both ends with a point load P in the middle: P/2 at each end and end moments
+# of PL/8
+def test_fixed_fixed_center_point_load():
+    load, span = 1000.0, 8.0
+    reactions = support_reactions(span, [(0, 'fixed'), (span, 'fixed')],
+                                  v_forces=[{'location': span / 2, 'magnitude': -load}])
+
+    assert [reaction['y'] for reaction in reactions] == pytest.approx([load / 2] * 2)
+    assert [reaction['m'] for reaction in reactions] == pytest.approx(
+        [load * span / 8, -load * span / 8])
+
+
+# A propped cantilever under a uniform load w: 5wL/8 and a moment of wL^2/8 at the fixed end and
+# 3wL/8 at the roller
+def test_propped_cantilever_uniform_load():
+    w, span = 2.0, 6.0
+    reactions = support_reactions(span, [(0, 'fixed'), (span, 'roller')],
+                                  dist_loads=[{'start': 0, 'end': span, 'function': str(w)}])
+
+    assert [reaction['y'] for reaction in reactions] == pytest.approx(
+        [5 * w * span / 8, 3 * w * span / 8])
+    assert reactions[0]['m'] == pytest.approx(w * span ** 2 / 8)
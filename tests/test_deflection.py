@@ -0,0 +1,73 @@
+# These check the slope and deflection diagrams against the closed form elastic curves of
+# textbook beams with a constant EI.
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# The beam scripts are imported the same way they import each other when run as scripts
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'beam_types'))
+
+import cantilever_beam
+import simply_supported_beam
+
+
+# Pre: Accepts a beam script, the length and EI of the beam, and optionally the vertical point
+#      forces and distributed loads of a beam definition
+# Post: This checks the beam like a beam definition file and returns its analysis
+def analyze(beam_module, length, stiffness, v_forces=(), dist_loads=()):
+    beam = beam_module.validate_beam_definition({'unit_system': 'metric', 'length': length,
+                                                 'EI': stiffness, 'v_forces': list(v_forces),
+                                                 'dist_loads': list(dist_loads)})
+    return beam_module.analyze_beam(beam)
+
+
+# A simply supported beam under a uniform load w deflects 5wL^4/384EI at midspan, its end
+# slopes are wL^3/24EI, and the whole curve is -wx(L^3 - 2Lx^2 + x^3)/24EI
+def test_simply_supported_uniform_load():
+    w, span, stiffness = 3.0, 6.0, 2.0e4
+    analysis = analyze(simply_supported_beam, span, stiffness,
+                       dist_loads=[{'start': 0, 'end': span, 'function': str(w)}])
+
+    deflection = analysis['deflection']
+    assert deflection['max_location'] == pytest.approx(span / 2)
+    assert deflection['max_value'] == pytest.approx(-5 * w * span ** 4 / (384 * stiffness))
+    x_values = deflection['x_values']
+    assert deflection['values'] == pytest.approx(
+        -w * x_values * (span ** 3 - 2 * span * x_values ** 2 + x_values ** 3)
+        / (24 * stiffness), abs=1e-12)
+
+    slope_extrema = analysis['slope']['extrema']
+    assert [extremum['value'] for extremum in slope_extrema] == pytest.approx(
+        [-w * span ** 3 / (24 * stiffness), w * span ** 3 / (24 * stiffness)])
+    assert [extremum['location'] for extremum in slope_extrema] == pytest.approx([0, span])
+
+
+# A cantilever with a point load P at its tip deflects PL^3/3EI and turns PL^2/2EI there
+def test_cantilever_tip_point_load():
+    load, span, stiffness = 10.0, 4.0, 2.0e4
+    analysis = analyze(cantilever_beam, span, stiffness,
+                       v_forces=[{'location': span, 'magnitude': -load}])
+
+    assert analysis['deflection']['max_location'] == pytest.approx(span)
+    assert analysis['deflection']['max_value'] == pytest.approx(
+        -load * span ** 3 / (3 * stiffness))
+    assert analysis['slope']['max_value'] == pytest.approx(-load * span ** 2 / (2 * stiffness))
+    x_values = analysis['deflection']['x_values']
+    assert analysis['deflection']['values'] == pytest.approx(
+        -load * x_values ** 2 * (3 * span - x_values) / (6 * stiffness), abs=1e-12)
+
+
+# A cantilever under a uniform load w deflects wL^4/8EI at its tip
+def test_cantilever_uniform_load():
+    w, span, stiffness = 2.5, 5.0, 3.0e4
+    analysis = analyze(cantilever_beam, span, stiffness,
+                       dist_loads=[{'start': 0, 'end': span, 'function': str(w)}])
+
+    assert analysis['deflection']['max_location'] == pytest.approx(span)
+    assert analysis['deflection']['max_value'] == pytest.approx(
+        -w * span ** 4 / (8 * stiffness))
+    assert np.all(np.diff(analysis['deflection']['values']) <= 1e-15)
@@ -0,0 +1,68 @@
+# These check the exact extrema of the axial, shear, and moment diagrams of the example beams
+# against the diagrams evaluated on a dense grid.
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# The beam scripts are imported the same way they import each other when run as scripts
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'beam_types'))
+
+import beam_engine
+import cantilever_beam
+import continuous_beam
+import overhanging_beam
+import simply_supported_beam
+
+BEAMS = [(simply_supported_beam, 'simply_supported_beam.json'),
+         (cantilever_beam, 'cantilever_beam.json'),
+         (overhanging_beam, 'overhanging_beam.toml'),
+         (continuous_beam, 'continuous_beam.json'),
+         (simply_supported_beam, 'load_combinations.json')]
+
+DIAGRAMS = {'axial': beam_engine.singularity_axial,
+            'shear': beam_engine.singularity_shear,
+            'moment': beam_engine.singularity_moment}
+
+
+@pytest.mark.parametrize('beam_module, file_name', BEAMS)
+def test_extrema_match_dense_grid(beam_module, file_name):
+    beam = beam_module.load_beam_definition(os.path.join(ROOT, 'examples', file_name))
+    analysis = beam_module.analyze_beam(beam)
+    model = beam_engine.singularity_model(analysis['total_v_forces'], analysis['moments'],
+                                          beam['dist_loads'], analysis['total_h_forces'])
+    events = (beam_engine.shear_moment_events(analysis['total_v_forces'], analysis['moments'],
+                                              beam['dist_loads'])
+              + [force['location'] for force in analysis['total_h_forces']])
+    # Both sides of every breakpoint are on the grid. The value before the beam starts and the
+    # value past its end are left out, like in diagram_extrema.
+    x_values, left = beam_engine.breakpoint_grid(beam['inputted_length'], events, 20001)
+    x_values, left = x_values[1:-1], left[1:-1]
+
+    for diagram, singularity_diagram in DIAGRAMS.items():
+        values = beam_engine.evaluate_sides(
+            lambda x, left=False: singularity_diagram(model, x, left), x_values, left)
+        extrema = analysis[diagram]['extrema']
+        extreme_values = [extremum['value'] for extremum in extrema]
+        scale = max(np.abs(values).max(), 1.0)
+        tolerance = 1e-7 * scale
+
+        # The largest and smallest extrema are the largest and smallest values on the grid. The
+        # grid can only miss a peak between two of its points, so it is never past them.
+        assert max(extreme_values) == pytest.approx(values.max(), abs=tolerance)
+        assert min(extreme_values) == pytest.approx(values.min(), abs=tolerance)
+        assert values.max() <= max(extreme_values) + 1e-12 * scale
+        assert values.min() >= min(extreme_values) - 1e-12 * scale
+
+        # Every extremum is a value of the diagram at its location, and no point of the grid
+        # next to a local max is above it (or next to a local min below it)
+        for extremum in extrema:
+            near = np.abs(x_values - extremum['location']) <= beam['inputted_length'] * 1e-3
+            assert np.min(np.abs(values[near] - extremum['value'])) <= tolerance
+            if extremum['type'] == 'max':
+                assert values[near].max() <= extremum['value'] + tolerance
+            elif extremum['type'] == 'min':
+                assert values[near].min() >= extremum['value'] - tolerance
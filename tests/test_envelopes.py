@@ -0,0 +1,96 @@
+# These check the shear and moment envelopes of a moving axle train against a brute force pass
+# that places the train at every position and solves the simply supported beam by statics.
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# The beam scripts are imported the same way they import each other when run as scripts
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'beam_types'))
+
+import simply_supported_beam
+
+
+# Pre: Accepts the length of a simply supported beam, its axle train, and the position of the
+#      first axle
+# Post: This returns the reaction of the roller at the right end with the train at that
+#       position. Axles and the part of the lane load that are off the beam do not count.
+def right_reaction(inputted_length, axle_train, position):
+    moment_about_left = 0.0
+    for axle in axle_train['axles']:
+        location = position - axle['offset']
+        if 0 <= location <= inputted_length:
+            moment_about_left -= axle['magnitude'] * location
+    lane_load = axle_train['lane_load']
+    if lane_load is not None:
+        start = min(max(position - lane_load['length'], 0.0), inputted_length)
+        end = min(max(position, 0.0), inputted_length)
+        moment_about_left += lane_load['magnitude'] * (end ** 2 - start ** 2) / 2
+    return moment_about_left / inputted_length
+
+
+# The shear just to the left of the right support is -B_y for every position of the train, so
+# its min envelope is the largest B_y of all positions: the two heavy axles at 15.7 and 20 with
+# the lane load from 4.3 to 20
+def test_bridge_girder_shear_at_right_end():
+    beam = simply_supported_beam.load_beam_definition(
+        os.path.join(ROOT, 'examples', 'bridge_girder.json'))
+    inputted_length = beam['inputted_length']
+    axle_train = beam['axle_train']
+
+    envelopes = simply_supported_beam.train_envelopes(inputted_length, axle_train,
+                                                      [inputted_length])
+
+    train_length = max([axle['offset'] for axle in axle_train['axles']]
+                       + [axle_train['lane_load']['length']])
+    steps = int(round(inputted_length / axle_train['step']))
+    step = inputted_length / steps
+    positions = np.arange(int(round((inputted_length + train_length) / step)) + 1) * step
+    brute_force = np.array([-right_reaction(inputted_length, axle_train, position)
+                            for position in positions])
+
+    assert envelopes['shear']['min'][0] == pytest.approx(brute_force.min())
+    assert envelopes['shear']['min_position'][0] == pytest.approx(
+        positions[brute_force.argmin()])
+    assert envelopes['shear']['max'][0] == pytest.approx(brute_force.max(), abs=1e-6)
+    assert envelopes['shear']['min'][0] == pytest.approx(
+        -(145000 * (20 + 15.7) / 20 + 9300 * (20 ** 2 - 4.3 ** 2) / 2 / 20))
+    assert round(envelopes['shear']['min'][0]) == -347526
+
+
+# The moment envelopes at sections along the girder match the brute force pass too
+def test_bridge_girder_moment_envelopes():
+    beam = simply_supported_beam.load_beam_definition(
+        os.path.join(ROOT, 'examples', 'bridge_girder.json'))
+    inputted_length = beam['inputted_length']
+    axle_train = beam['axle_train']
+    section_locations = np.linspace(0, inputted_length, 11)
+
+    envelopes = simply_supported_beam.train_envelopes(inputted_length, axle_train,
+                                                      section_locations)
+
+    lane_load = axle_train['lane_load']
+    steps = int(round(inputted_length / axle_train['step']))
+    step = inputted_length / steps
+    positions = np.arange(int(round((inputted_length + lane_load['length']) / step)) + 1) * step
+    brute_force = np.zeros((len(section_locations), len(positions)))
+    for column, position in enumerate(positions):
+        right = right_reaction(inputted_length, axle_train, position)
+        for row, section in enumerate(section_locations):
+            # The moment at a section is the moment of everything to its right
+            moment = right * (inputted_length - section)
+            for axle in axle_train['axles']:
+                location = position - axle['offset']
+                if section < location <= inputted_length:
+                    moment += axle['magnitude'] * (location - section)
+            start = min(max(position - lane_load['length'], section), inputted_length)
+            end = min(max(position, section), inputted_length)
+            moment -= lane_load['magnitude'] * ((end - section) ** 2
+                                                - (start - section) ** 2) / 2
+            brute_force[row, column] = moment
+
+    assert envelopes['moment']['max'] == pytest.approx(brute_force.max(axis=1), abs=1e-6)
+    assert envelopes['moment']['min'] == pytest.approx(brute_force.min(axis=1), abs=1e-6)
@@ -0,0 +1,82 @@
+# These check that the CSV and NDJSON rows of the exported diagrams read back to exactly the
+# values of diagram_chunks.
+
+import csv
+import io
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# The beam scripts are imported the same way they import each other when run as scripts
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'beam_types'))
+
+import beam_engine
+import overhanging_beam
+import simply_supported_beam
+
+BEAMS = [(simply_supported_beam, 'simply_supported_beam.json'),
+         (overhanging_beam, 'overhanging_beam.toml')]
+
+
+# Pre: Accepts a beam script and the name of an example beam file
+# Post: This returns the stacked columns of every chunk of the beam (one row for each of x, N,
+#       V, and M) and a function that makes the chunks again. The chunks are small, so the
+#       beam is split into several of them.
+def example_chunks(beam_module, file_name):
+    beam = beam_module.load_beam_definition(os.path.join(ROOT, 'examples', file_name))
+    analysis = beam_module.analyze_beam(beam)
+
+    def chunks():
+        return beam_engine.diagram_chunks(beam, analysis, points=1001, chunk_size=128)
+
+    return np.hstack([np.array(chunk) for chunk in chunks()]), chunks
+
+
+# Pre: Accepts the rows that were read back as dictionaries
+# Post: This returns their values as one row for each of x, N, V, and M
+def row_columns(rows):
+    return np.array([[float(row[column]) for row in rows]
+                     for column in beam_engine.EXPORT_COLUMNS])
+
+
+@pytest.mark.parametrize('beam_module, file_name', BEAMS)
+def test_csv_round_trip(beam_module, file_name):
+    values, chunks = example_chunks(beam_module, file_name)
+    stream = io.StringIO()
+    beam_engine.write_diagram_rows(chunks(), stream, 'csv')
+
+    rows = list(csv.DictReader(io.StringIO(stream.getvalue())))
+    assert list(rows[0]) == beam_engine.EXPORT_COLUMNS
+    np.testing.assert_array_equal(row_columns(rows), values)
+
+
+@pytest.mark.parametrize('beam_module, file_name', BEAMS)
+def test_ndjson_round_trip(beam_module, file_name):
+    values, chunks = example_chunks(beam_module, file_name)
+    stream = io.StringIO()
+    beam_engine.write_diagram_rows(chunks(), stream, 'ndjson')
+
+    rows = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert list(rows[0]) == beam_engine.EXPORT_COLUMNS
+    np.testing.assert_array_equal(row_columns(rows), values)
+
+
+# The name of the beam is read back as is, even with a comma, a quote, or a % in it
+@pytest.mark.parametrize('file_format', ['csv', 'ndjson'])
+def test_beam_name_column(file_format):
+    values, chunks = example_chunks(simply_supported_beam, 'simply_supported_beam.json')
+    beam_name = 'beams/"a, b" 100%.json'
+    stream = io.StringIO()
+    beam_engine.write_diagram_rows(chunks(), stream, file_format, beam_name)
+
+    if file_format == 'csv':
+        rows = list(csv.DictReader(io.StringIO(stream.getvalue())))
+    else:
+        rows = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert list(rows[0]) == ['beam'] + beam_engine.EXPORT_COLUMNS
+    assert {row['beam'] for row in rows} == {beam_name}
+    np.testing.assert_array_equal(row_columns(rows), values)
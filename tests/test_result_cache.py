@@ -0,0 +1,77 @@
+# These check that the result cache gives back exactly what analyze_beam stored and that a beam
+# is only found again when it is the same beam.
+
+import copy
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# The beam scripts are imported the same way they import each other when run as scripts
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'beam_types'))
+
+import cantilever_beam
+import continuous_beam
+import overhanging_beam
+import result_cache
+import simply_supported_beam
+
+BEAMS = [(simply_supported_beam, 'simply_supported_beam.json'),
+         (cantilever_beam, 'cantilever_beam.json'),
+         (overhanging_beam, 'overhanging_beam.toml'),
+         (continuous_beam, 'continuous_beam.json')]
+
+
+# Pre: Accepts two values made of dictionaries, lists, numbers, strings, and numpy arrays
+# Post: This checks that they have the same structure, that arrays have the same dtype and
+#       shape, and that every number is the same
+def assert_same(stored, read_back):
+    if isinstance(stored, np.ndarray):
+        assert isinstance(read_back, np.ndarray)
+        assert read_back.dtype == stored.dtype
+        np.testing.assert_array_equal(read_back, stored)
+    elif isinstance(stored, dict):
+        assert set(read_back) == set(stored)
+        for key in stored:
+            assert_same(stored[key], read_back[key])
+    elif isinstance(stored, (list, tuple)):
+        assert len(read_back) == len(stored)
+        for stored_item, read_item in zip(stored, read_back):
+            assert_same(stored_item, read_item)
+    else:
+        assert read_back == stored
+
+
+# The analysis read back from the cache is the analysis that was stored
+@pytest.mark.parametrize('beam_module, file_name', BEAMS)
+def test_round_trip(tmp_path, beam_module, file_name):
+    beam = beam_module.load_beam_definition(os.path.join(ROOT, 'examples', file_name))
+    analysis = beam_module.analyze_beam(beam)
+    cache = beam_module.open_result_cache(str(tmp_path / 'results.sqlite'))
+    key = result_cache.beam_key(cache['beam_type'], cache['version'], beam)
+
+    assert result_cache.cache_get(cache, key) is None
+    result_cache.cache_put(cache, key, analysis)
+    assert_same(analysis, result_cache.cache_get(cache, key))
+    result_cache.close_cache(cache)
+
+
+# A changed load gives a new key, and the same function written another way does not
+@pytest.mark.parametrize('beam_module, file_name', BEAMS)
+def test_beam_key(beam_module, file_name):
+    definition = beam_module.read_beam_definition(os.path.join(ROOT, 'examples', file_name))
+    key = result_cache.beam_key(beam_module.__name__, '1',
+                                beam_module.validate_beam_definition(copy.deepcopy(definition)))
+
+    changed_definition = copy.deepcopy(definition)
+    changed_definition['v_forces'][0]['magnitude'] *= 2
+    assert result_cache.beam_key(beam_module.__name__, '1',
+                                 beam_module.validate_beam_definition(changed_definition)) != key
+
+    rewritten_definition = copy.deepcopy(definition)
+    load = rewritten_definition['dist_loads'][0]
+    load['function'] = f"1 * ({load['function']})"
+    assert result_cache.beam_key(beam_module.__name__, '1',
+                                 beam_module.validate_beam_definition(rewritten_definition)) == key
@@ -0,0 +1,119 @@
+# These check the piecewise polynomial tables of the singularity model against the axial force,
+# shear, and moment added up directly from the loads, on both sides of every breakpoint.
+
+import os
+import sys
+
+import numpy as np
+import pytest
+from scipy.integrate import quad
+
+# The beam scripts are imported the same way they import each other when run as scripts
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'beam_types'))
+
+import beam_engine
+import cantilever_beam
+import continuous_beam
+import overhanging_beam
+import simply_supported_beam
+
+# Only polynomial loads, so the tables alone give the whole diagram
+POLYNOMIAL_BEAM = {
+    'unit_system': 'metric',
+    'length': 10,
+    'h_forces': [{'location': 3, 'magnitude': 5}, {'location': 7, 'magnitude': -8}],
+    'v_forces': [{'location': 2, 'magnitude': -10}, {'location': 6.5, 'magnitude': 4}],
+    'moments': [{'location': 5, 'magnitude': 12}, {'location': 6.5, 'magnitude': -3}],
+    'dist_loads': [{'start': 0, 'end': 4, 'function': "3"},
+                   {'start': 1, 'end': 6.5, 'function': "2 * (x - 1)"},
+                   {'start': 5, 'end': 10, 'function': "0.1 * x**3 - x + 2"}]}
+
+BEAMS = [(simply_supported_beam, 'simply_supported_beam.json'),
+         (cantilever_beam, 'cantilever_beam.json'),
+         (overhanging_beam, 'overhanging_beam.toml'),
+         (continuous_beam, 'continuous_beam.json')]
+
+
+# Pre: Accepts a position, the totals from analyze_beam, the distributed loads, and whether the
+#      value just to the left of the position is wanted
+# Post: This returns the axial force, shear, and moment at the position by adding up every
+#       load before it, with the distributed loads integrated numerically. A point load on the
+#       position counts unless left is True.
+def direct_values(x, analysis, dist_loads, left):
+    def before(location):
+        return location < x if left else location <= x
+
+    N = -sum(force['magnitude'] for force in analysis['total_h_forces']
+             if before(force['location']))
+    V = sum(force['magnitude'] for force in analysis['total_v_forces']
+            if before(force['location']))
+    M = (sum(force['magnitude'] * (x - force['location'])
+             for force in analysis['total_v_forces'] if before(force['location']))
+         - sum(moment['magnitude'] for moment in analysis['moments']
+               if before(moment['location'])))
+    for load in dist_loads:
+        function = beam_engine.prepare_load(load)['function']
+        end = min(x, load['end'])
+        if end <= load['start']:
+            continue
+        V -= quad(lambda t: float(function(t)), load['start'], end, epsabs=1e-13)[0]
+        M -= quad(lambda t: float(function(t)) * (x - t), load['start'], end, epsabs=1e-13)[0]
+    return N, V, M
+
+
+# Pre: Accepts a beam dictionary and its analysis
+# Post: This returns the positions to check: both sides of every breakpoint and points just
+#       next to them, and a few positions inside the pieces
+def check_positions(beam, analysis):
+    events = (beam_engine.shear_moment_events(analysis['total_v_forces'], analysis['moments'],
+                                              beam['dist_loads'])
+              + [force['location'] for force in analysis['total_h_forces']])
+    breakpoints = beam_engine.diagram_breakpoints(beam['inputted_length'], events)
+    nudge = 1e-7 * beam['inputted_length']
+    positions = [(location, left) for location in breakpoints for left in [True, False]]
+    positions += [(location + shift, False) for location in breakpoints
+                  for shift in [-nudge, nudge] if 0 < location + shift < beam['inputted_length']]
+    positions += [(location, False) for location in
+                  np.linspace(0, beam['inputted_length'], 13)[1:-1]]
+    return positions
+
+
+# Pre: Accepts the value from the model, the value added up directly, and the beam
+# Post: This checks that they are the same up to the error of the numeric integration
+def assert_close(value, direct_value, analysis):
+    scale = max([abs(force['magnitude']) for force in analysis['total_v_forces']]
+                + [abs(moment['magnitude']) for moment in analysis['moments']] + [1.0])
+    assert value == pytest.approx(direct_value, abs=1e-8 * scale)
+
+
+# evaluate_table on the tables of a beam with only polynomial loads is the whole diagram
+def test_evaluate_table_polynomial_loads():
+    beam = simply_supported_beam.validate_beam_definition(dict(POLYNOMIAL_BEAM))
+    analysis = simply_supported_beam.analyze_beam(beam)
+    model = beam_engine.singularity_model(analysis['total_v_forces'], analysis['moments'],
+                                          beam['dist_loads'], analysis['total_h_forces'])
+    assert model['other_loads'] == []
+
+    for x, left in check_positions(beam, analysis):
+        direct = direct_values(x, analysis, beam['dist_loads'], left)
+        for table, direct_value in zip(['axial', 'shear', 'moment'], direct):
+            value = float(beam_engine.evaluate_table(model[table], np.array([x]), left)[0])
+            assert_close(value, direct_value, analysis)
+
+
+# The example beams also have loads that are not polynomials, which the model adds to the tables
+@pytest.mark.parametrize('beam_module, file_name', BEAMS)
+def test_singularity_model_examples(beam_module, file_name):
+    beam = beam_module.load_beam_definition(os.path.join(ROOT, 'examples', file_name))
+    analysis = beam_module.analyze_beam(beam)
+    model = beam_engine.singularity_model(analysis['total_v_forces'], analysis['moments'],
+                                          beam['dist_loads'], analysis['total_h_forces'])
+
+    for x, left in check_positions(beam, analysis):
+        direct = direct_values(x, analysis, beam['dist_loads'], left)
+        values = [beam_engine.singularity_axial(model, x, left),
+                  beam_engine.singularity_shear(model, x, left),
+                  beam_engine.singularity_moment(model, x, left)]
+        for value, direct_value in zip(values, direct):
+            assert_close(value, direct_value, analysis)
@@ -0,0 +1,107 @@
+# These check the memory-mapped result file of the overhanging beam parameter sweep: its header,
+# the shape of its array, the NaN cases of invalid layouts, and the values of the valid ones.
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# The beam scripts are imported the same way they import each other when run as scripts
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'beam_types'))
+
+import beam_engine
+import overhanging_beam
+
+# The roller at 8 is on the pin and the roller at 11 is off the 10 m beam, so those layouts are
+# not valid
+ROLLER_LOCATIONS = [0.0, 2.0, 8.0, 11.0]
+PIN_LOCATIONS = [6.0, 8.0]
+LOAD_SCALES = [1.0, -0.5, 2.0]
+STATIONS = 11
+
+
+# Pre: Accepts the folder to save the result file in and the number of worker processes
+# Post: This sweeps the example overhanging beam and returns the beam, the table from
+#       sweep_beams, and the path of the result file
+def example_sweep(folder, max_workers=1):
+    beam = overhanging_beam.load_beam_definition(
+        os.path.join(ROOT, 'examples', 'overhanging_beam.toml'))
+    result_path = str(folder / 'sweep.bin')
+    table = overhanging_beam.sweep_beams(beam, roller_locations=ROLLER_LOCATIONS,
+                                         pin_locations=PIN_LOCATIONS, load_scales=LOAD_SCALES,
+                                         max_workers=max_workers, chunk_size=3,
+                                         result_path=result_path, stations=STATIONS)
+    return beam, table, result_path
+
+
+def test_header_and_shape(tmp_path):
+    beam, table, result_path = example_sweep(tmp_path)
+    header, values = overhanging_beam.open_sweep_results(result_path)
+
+    cases = len(ROLLER_LOCATIONS) * len(PIN_LOCATIONS) * len(LOAD_SCALES)
+    assert header['dtype'] == '<f8'
+    assert header['shape'] == [cases, STATIONS, 3]
+    assert header['values'] == ['N', 'V', 'M']
+    assert header['unit_system'] == beam['unit_system']
+    assert header['parameters'] == {'inputted_length': [beam['inputted_length']],
+                                    'roller_location': ROLLER_LOCATIONS,
+                                    'pin_location': PIN_LOCATIONS,
+                                    'load_scale': LOAD_SCALES}
+    assert values.shape == (cases, STATIONS, 3)
+    assert values.dtype == np.float64
+    assert values.offset % overhanging_beam.SWEEP_RESULT_ALIGNMENT == 0
+    assert os.path.getsize(result_path) == values.offset + cases * STATIONS * 3 * 8
+    assert len(table['valid']) == cases
+
+
+# The cases are in the order of the rows of the table. Invalid layouts are NaN, and valid ones
+# are the diagrams of the layout at the stations times the load factor.
+def test_case_values(tmp_path):
+    beam, table, result_path = example_sweep(tmp_path)
+    _, values = overhanging_beam.open_sweep_results(result_path)
+
+    assert not table['valid'].all() and table['valid'].any()
+    for case in range(len(table['valid'])):
+        if not table['valid'][case]:
+            assert np.isnan(values[case]).all()
+            continue
+
+        layout = overhanging_beam.sweep_layout(beam, table['inputted_length'][case],
+                                               table['roller_location'][case],
+                                               table['pin_location'][case])
+        analysis = overhanging_beam.analyze_beam(layout)
+        model = beam_engine.singularity_model(analysis['total_v_forces'], analysis['moments'],
+                                              layout['dist_loads'], analysis['total_h_forces'])
+        x_values = np.linspace(0, layout['inputted_length'], STATIONS)
+        expected = table['load_scale'][case] * np.column_stack((
+            beam_engine.singularity_axial(model, x_values),
+            beam_engine.singularity_shear(model, x_values),
+            beam_engine.singularity_moment(model, x_values)))
+        assert values[case] == pytest.approx(expected, abs=1e-9)
+
+
+# Worker processes write their own cases into the file, which gives the same file as one process
+def test_workers_write_same_file(tmp_path):
+    os.makedirs(tmp_path / 'one')
+    os.makedirs(tmp_path / 'two')
+    _, _, one_worker_path = example_sweep(tmp_path / 'one')
+    _, _, two_worker_path = example_sweep(tmp_path / 'two', max_workers=2)
+
+    with open(one_worker_path, 'rb') as one_worker_file:
+        with open(two_worker_path, 'rb') as two_worker_file:
+            assert one_worker_file.read() == two_worker_file.read()
+
+
+# The EI pieces of the beam end at its own length, so a layout with another length has no EI
+def test_layout_drops_stiffness():
+    beam = overhanging_beam.validate_beam_definition({
+        'unit_system': 'metric', 'length': 10, 'support_locations': {'roller': 2, 'pin': 8},
+        'EI': [{'start': 0, 'end': 5, 'EI': 2.0e4}, {'start': 5, 'end': 10, 'EI': 4.0e4}],
+        'v_forces': [{'location': 3, 'magnitude': -20}]})
+
+    layout = overhanging_beam.sweep_layout(beam, 14.0, 2.0, 8.0)
+    assert layout['stiffness'] is None
+    assert 'deflection' not in overhanging_beam.analyze_beam(layout)
+    assert beam['stiffness'][-1]['end'] == 10